@@ -1,7 +1,13 @@
 """
-Hashings module - provides cryptographically secure random number generation.
+Hashings module - provides cryptographically secure random number generation
+and a registry of interchangeable random backends.
 """
 
+from .base_random import BaseRandom
 from .secure_random import SecureRandom, get_secure_random
+from .fast_random import FastRandom, get_fast_random
+from .counting_random import CountingRandom, TimedRandom
+from .backends import register_backend, available_backends, get_random, derive_seed
 
-__all__ = ['SecureRandom', 'get_secure_random']
+__all__ = ['BaseRandom', 'SecureRandom', 'get_secure_random', 'FastRandom', 'get_fast_random', 'CountingRandom', 'TimedRandom',
+           'register_backend', 'available_backends', 'get_random', 'derive_seed']
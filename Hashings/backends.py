@@ -0,0 +1,60 @@
+"""
+Registry of random backends.
+Every backend exposes the SecureRandom interface, so any instance can be passed
+as the rng= argument of the generators.
+"""
+
+import hashlib
+
+from .secure_random import get_secure_random
+from .fast_random import get_fast_random
+
+DEFAULT_BACKEND='secure'
+SEEDED_BACKEND='fast'
+
+# name -> (factory, seedable)
+_BACKENDS={}
+
+
+def register_backend(name, factory, seedable=False):
+    """
+    Register a backend factory under name.
+    Seedable factories are called as factory(seed), the others as factory().
+    """
+    _BACKENDS[name]=(factory, seedable)
+
+
+def available_backends():
+    """Return the registered backend names."""
+    return sorted(_BACKENDS)
+
+
+def get_random(backend=None, seed=None):
+    """
+    Build a random instance from the registry.
+    Without a backend name, seeded requests use the fast backend and the rest the secure one.
+    """
+    if backend is None:
+        backend=SEEDED_BACKEND if seed is not None else DEFAULT_BACKEND
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown random backend '{backend}' (available: {', '.join(available_backends())})")
+    factory,seedable=_BACKENDS[backend]
+    if seedable:
+        return factory(seed)
+    if seed is not None:
+        raise ValueError(f"Random backend '{backend}' cannot be seeded")
+    return factory()
+
+
+def derive_seed(seed, *key):
+    """
+    Child seed for (seed, *key), e.g. derive_seed(master, case_index).
+    Children are a 128-bit hash of the master seed and the key, so every case gets its
+    own statistically independent stream that does not depend on which worker draws it.
+    """
+    data=repr((seed,)+key).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=16, person=b'cpstress-seed').digest(), 'little')
+
+
+register_backend('secure', get_secure_random)
+register_backend('fast', get_fast_random, seedable=True)
@@ -0,0 +1,138 @@
+"""
+Common interface shared by every random backend.
+Scalar draws are delegated to a random.Random instance, batch draws read
+fixed width words from the backend's byte source (randbytes).
+"""
+
+from itertools import chain
+
+RECIP_BPF=2.0**-53
+WORD=1<<64
+# bounds handled per randbelows() round, keeps the temporary word buffer small
+BATCH=1<<16
+
+# memoryview typecodes for unsigned word widths, smallest first
+_WIDTHS=((1,'B'),(2,'H'),(4,'I'),(8,'Q'))
+_BITS=tuple(tuple((b>>i)&1 for i in range(8)) for b in range(256))
+
+
+class BaseRandom:
+    """
+    Base class for random backends.
+    Subclasses set self._rng to a random.Random (sub)instance and implement randbytes().
+    """
+
+    _rng=None
+
+    def randint(self, a, b):
+        """Return a random integer N such that a <= N <= b."""
+        return self._rng.randint(a, b)
+
+    def uniform(self, a, b):
+        """Return a random floating point number N such that a <= N <= b."""
+        return self._rng.uniform(a, b)
+
+    def choice(self, seq):
+        """Return a random element from the non-empty sequence."""
+        return self._rng.choice(seq)
+
+    def choices(self, population, weights=None, k=1):
+        """Return a k sized list of elements chosen from the population with replacement."""
+        return self._rng.choices(population, weights=weights, k=k)
+
+    def shuffle(self, x):
+        """Shuffle list x in place (Fisher-Yates with batched index draws)."""
+        n=len(x)
+        for hi in range(n, 1, -BATCH):
+            lo=max(hi-BATCH, 1)
+            for i,j in zip(range(hi-1, lo-1, -1), self.randbelows(range(hi, lo, -1))):
+                x[i],x[j]=x[j],x[i]
+
+    def random(self):
+        """Return random float in [0.0, 1.0)."""
+        return self._rng.random()
+
+    def getrandbits(self, k):
+        """Return a non-negative integer with k random bits."""
+        return self._rng.getrandbits(k)
+
+    def randbytes(self, n):
+        """Return n random bytes."""
+        raise NotImplementedError
+
+    # ==================== BATCH DRAWS ====================
+
+    def randints(self, l, r, k):
+        """
+        Return a list of k random integers N such that l <= N <= r.
+        Values are read as fixed width words from randbytes(); words at or above
+        the largest multiple of the range size are rejected, so the result is unbiased.
+        """
+        if k<=0:
+            return []
+        if l>r:
+            raise ValueError("empty range for randints")
+        n=r-l+1
+        if n==1:
+            return [l]*k
+        for width,code in _WIDTHS:
+            full=1<<(8*width)
+            if full>=n:
+                break
+        else:
+            rng=self._rng
+            return [l+rng._randbelow(n) for _ in range(k)]
+        limit=full-full%n
+        out=[]
+        need=k
+        while need>0:
+            # over-draw by the expected rejection rate so one round is almost always enough
+            words=memoryview(self.randbytes((need*full//limit+8)*width)).cast(code)
+            if limit==full:
+                out.extend([l+x%n for x in words])
+            else:
+                out.extend([l+x%n for x in words if x<limit])
+            need=k-len(out)
+        if need<0:
+            del out[k:]
+        return out
+
+    def randbelows(self, bounds):
+        """
+        Return a list with one random integer in [0, b) for each positive b in bounds.
+        Each value reduces one 64-bit word; the rare words above the largest multiple of b
+        are redrawn, so every value is exactly uniform.
+        """
+        if not isinstance(bounds, (list, range)):
+            bounds=list(bounds)
+        if not bounds:
+            return []
+        top=max(bounds)
+        if top>WORD:
+            rng=self._rng
+            return [rng._randbelow(b) for b in bounds]
+        words=memoryview(self.randbytes(8*len(bounds))).cast('Q')
+        out=[x%b for x,b in zip(words, bounds)]
+        if max(words)>=WORD-top:
+            rng=self._rng
+            for i,x in enumerate(words):
+                b=bounds[i]
+                if x>=WORD-WORD%b:
+                    out[i]=rng._randbelow(b)
+        return out
+
+    def uniforms(self, a, b, k):
+        """Return a list of k random floats N such that a <= N <= b (same formula as uniform())."""
+        if k<=0:
+            return []
+        d=b-a
+        words=memoryview(self.randbytes(8*k)).cast('Q')
+        return [a+d*((x>>11)*RECIP_BPF) for x in words]
+
+    def random_bits(self, k):
+        """Return a list of k independent fair bits (0 or 1)."""
+        if k<=0:
+            return []
+        bits=list(chain.from_iterable(map(_BITS.__getitem__, self.randbytes((k+7)//8))))
+        del bits[k:]
+        return bits
@@ -0,0 +1,102 @@
+"""
+Counting wrapper around any random backend.
+Draws are forwarded unchanged (same values as the wrapped instance would give) while the
+number of requests and random bytes consumed is recorded. Used for benchmarking and
+profiling; the plain backends carry no counters, so they pay nothing for this.
+"""
+
+import random
+from time import perf_counter
+
+from .base_random import BaseRandom
+
+
+class _CountingSource(random.Random):
+    """random.Random whose random()/getrandbits() come from the wrapped backend."""
+
+    def __init__(self, owner):
+        self._owner=owner
+        super().__init__()
+
+    def seed(self, *args, **kwds):
+        """Stub method. Entropy comes from the wrapped backend."""
+        return None
+
+    def random(self):
+        owner=self._owner
+        owner.calls+=1
+        owner.bytes_drawn+=7
+        return owner.inner.random()
+
+    def getrandbits(self, k):
+        owner=self._owner
+        owner.calls+=1
+        owner.bytes_drawn+=(k+7)//8
+        return owner.inner.getrandbits(k)
+
+
+class CountingRandom(BaseRandom):
+    """
+    Wraps a backend instance and counts what is drawn from it.
+    calls is the number of entropy requests, bytes_drawn the bytes they consumed
+    (random() counts as the 7 bytes holding its 53 bits).
+    """
+
+    name='counting'
+
+    def __init__(self, inner):
+        self.inner=inner
+        self.calls=0
+        self.bytes_drawn=0
+        self._rng=_CountingSource(self)
+
+    def randbytes(self, n):
+        """Return n random bytes."""
+        self.calls+=1
+        self.bytes_drawn+=n
+        return self.inner.randbytes(n)
+
+    def reset_counts(self):
+        self.calls=0
+        self.bytes_drawn=0
+
+
+class _TimedSource(_CountingSource):
+    """_CountingSource that also adds the time spent in the backend to owner.seconds."""
+
+    def random(self):
+        start=perf_counter()
+        x=_CountingSource.random(self)
+        self._owner.seconds+=perf_counter()-start
+        return x
+
+    def getrandbits(self, k):
+        start=perf_counter()
+        x=_CountingSource.getrandbits(self, k)
+        self._owner.seconds+=perf_counter()-start
+        return x
+
+
+class TimedRandom(CountingRandom):
+    """
+    CountingRandom that also measures the time spent producing entropy (seconds).
+    Two clock reads per request: meant for profiling runs, not for benchmarks.
+    """
+
+    name='timed'
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self.seconds=0.0
+        self._rng=_TimedSource(self)
+
+    def randbytes(self, n):
+        """Return n random bytes."""
+        start=perf_counter()
+        data=CountingRandom.randbytes(self, n)
+        self.seconds+=perf_counter()-start
+        return data
+
+    def reset_counts(self):
+        super().reset_counts()
+        self.seconds=0.0
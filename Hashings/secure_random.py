@@ -1,43 +1,108 @@
 """
 Cryptographically secure random number generator.
-Uses secrets.SystemRandom() instead of Python's pseudo-random Random class.
-This ensures unpredictability and cannot be easily determined.
+Uses OS entropy (the same source as secrets.SystemRandom()) instead of Python's
+pseudo-random Random class. This ensures unpredictability and cannot be easily determined.
+
+Entropy is pulled from the OS in large blocks and served from a shared buffer,
+so generating many values does not cost one os.urandom syscall per value.
 """
 
-import secrets
+import os
+import random
+import threading
+
+from .base_random import BaseRandom, RECIP_BPF
+
+POOL_BLOCK=1<<16
+
 
-class SecureRandom:
+class _EntropyPool:
     """
-    Wrapper around secrets.SystemRandom() to provide cryptographically secure randomness.
+    Shared buffer of OS entropy.
+    Small requests are sliced out of one POOL_BLOCK sized os.urandom() read,
+    requests of a block or more go straight to the OS.
+    """
+
+    def __init__(self, block=POOL_BLOCK):
+        self._block=block
+        self._buf=b''
+        self._pos=0
+        self._lock=threading.Lock()
+
+    def take(self, n):
+        """Return n fresh random bytes; no byte is ever handed out twice."""
+        if n>=self._block:
+            return os.urandom(n)
+        with self._lock:
+            pos=self._pos
+            if pos+n>len(self._buf):
+                self._buf=os.urandom(self._block)
+                pos=0
+            self._pos=pos+n
+            return self._buf[pos:pos+n]
+
+    def reset(self):
+        """Drop buffered bytes (called in forked children so they never share entropy)."""
+        self._lock=threading.Lock()
+        self._buf=b''
+        self._pos=0
+
+
+_POOL=_EntropyPool()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_POOL.reset)
+
+
+class _PooledRandom(random.Random):
+    """
+    random.Random driven by the entropy pool instead of MT19937.
+    Only random() and getrandbits() are overridden, every other method
+    (randint, choice, shuffle, choices, ...) is derived from them.
+    """
+
+    def __init__(self, pool):
+        self._pool=pool
+        super().__init__()
+
+    def seed(self, *args, **kwds):
+        """Stub method. Not used for an OS entropy source."""
+        return None
+
+    def random(self):
+        return (int.from_bytes(self._pool.take(7), 'big')>>3)*RECIP_BPF
+
+    def getrandbits(self, k):
+        if k<0:
+            raise ValueError("number of bits must be non-negative")
+        if k==0:
+            return 0
+        n=(k+7)//8
+        return int.from_bytes(self._pool.take(n), 'big')>>(n*8-k)
+
+    def randbytes(self, n):
+        return self._pool.take(n)
+
+    def _notimplemented(self, *args, **kwds):
+        raise NotImplementedError("OS entropy source has no state")
+
+    getstate=setstate=_notimplemented
+
+
+class SecureRandom(BaseRandom):
+    """
+    Cryptographically secure randomness backed by buffered OS entropy.
     This replaces Python's standard Random class which uses MT19937 (predictable).
     """
-    
+
+    name='secure'
+
     def __init__(self):
-        self._rng=secrets.SystemRandom()
-    
-    def randint(self, a, b):
-        """Return a random integer N such that a <= N <= b."""
-        return self._rng.randint(a, b)
-    
-    def uniform(self, a, b):
-        """Return a random floating point number N such that a <= N <= b."""
-        return self._rng.uniform(a, b)
-    
-    def choice(self, seq):
-        """Return a random element from the non-empty sequence."""
-        return self._rng.choice(seq)
-    
-    def choices(self, population, weights=None, k=1):
-        """Return a k sized list of elements chosen from the population with replacement."""
-        return self._rng.choices(population, weights=weights, k=k)
-    
-    def shuffle(self, x):
-        """Shuffle list x in place."""
-        return self._rng.shuffle(x)
-    
-    def random(self):
-        """Return random float in [0.0, 1.0)."""
-        return self._rng.random()
+        self._pool=_POOL
+        self._rng=_PooledRandom(self._pool)
+
+    def randbytes(self, n):
+        """Return n random bytes."""
+        return self._pool.take(n)
 
 
 def get_secure_random():
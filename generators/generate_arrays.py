@@ -1,8 +1,158 @@
+import math
 import sys
+from itertools import accumulate,chain,compress
+from math import expm1,log1p
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from Hashings.secure_random import get_secure_random
+from generators.sampling import WeightedSampler, sample_unique
+
+# number of values per chunk yielded by the iter_* generators
+CHUNK_SIZE=1<<16
+# bounded uniform compositions with at most this many parts are sampled exactly
+EXACT_PARTS=24
+# pair resampling sweeps smoothing the sum correction of larger bounded compositions
+GIBBS_SWEEPS=1
+
+
+def _binom(n: int,r: int)->int:
+    """C(n, r), 0 when n < r or n < 0."""
+    if n<r or n<0 or r<0:
+        return 0
+    if hasattr(math,'comb'):
+        return math.comb(n,r)
+    r=min(r,n-r)
+    v=1
+    for i in range(r):
+        v=v*(n-i)//(i+1)
+    return v
+
+
+def _weak_composition(m: int,k: int,rng)->list:
+    """Uniform composition of m into k parts >= 0: stars and bars over k-1 sorted distinct cut points."""
+    n=m+k-1
+    cuts=sample_unique(0,n-1,k-1,rng,ordered=False)
+    if n<=64*k:
+        # dense cuts: marking them in a bitmap lists them in order faster than sorting
+        mark=bytearray(n)
+        for i in cuts:
+            mark[i]=1
+        cuts=list(compress(range(n),mark))
+    else:
+        cuts.sort()
+    return [b-a-1 for a,b in zip(chain((-1,),cuts),chain(cuts,(n,)))]
+
+
+def _count_first_at_most(m: int,k: int,c: int,t: int)->int:
+    """Compositions of m into k parts in [0, c] whose first part is <= t (inclusion-exclusion)."""
+    total=0
+    for j in range(k):
+        a=m-j*(c+1)
+        if a<0:
+            break
+        term=_binom(k-1,j)*(_binom(a+k-1,k-1)-_binom(a-t+k-2,k-1))
+        total+=-term if j&1 else term
+    return total
+
+
+def _exact_bounded(m: int,k: int,c: int,rng)->list:
+    """Exactly uniform composition of m into k parts in [0, c], one part at a time by inverse CDF."""
+    out=[]
+    while k>1:
+        lo,hi=max(0,m-(k-1)*c),min(c,m)
+        u=rng.randint(0,_count_first_at_most(m,k,c,hi)-1)
+        while lo<hi:
+            mid=(lo+hi)//2
+            if _count_first_at_most(m,k,c,mid)>u:
+                hi=mid
+            else:
+                lo=mid+1
+        out.append(lo)
+        m-=lo
+        k-=1
+    out.append(m)
+    return out
+
+
+def _tilted_mean(lam: float,c: int)->float:
+    """E[X] for P(X=x) ~ exp(-lam*x) on [0, c]."""
+    t=lam*(c+1)
+    return 1/expm1(lam)-((c+1)/expm1(t) if t<700 else 0.0)
+
+
+def _tilt(mean: float,c: int)->float:
+    """Rate lam >= 0 with E[X]=mean for P(X=x) ~ exp(-lam*x) on [0, c] (mean <= c/2)."""
+    hi=1.0
+    while _tilted_mean(hi,c)>mean:
+        hi*=2
+    lo=0.0
+    for _ in range(200):
+        mid=(lo+hi)/2
+        if mid*(c+1)<1e-9 or _tilted_mean(mid,c)>mean:
+            lo=mid
+        else:
+            hi=mid
+    return hi
+
+
+def _bounded_composition(m: int,k: int,c: int,rng)->list:
+    """
+    Near-uniform composition of m into k parts in [0, c] for large k, O(k):
+    i.i.d. parts with P(x) ~ exp(-lam*x) conditioned on their sum are exactly uniform (exp(-lam*m)
+    is the same for every composition), so draw them with the mean m/k, move the few units
+    needed to hit m exactly onto random parts, then resample random pairs (x_i, x_j) given
+    x_i+x_j, a move that keeps the uniform distribution and washes out the correction.
+    """
+    if 2*m>k*c:
+        # x -> c-x maps compositions of k*c-m onto those of m
+        return [c-x for x in _bounded_composition(k*c-m,k,c,rng)]
+    lam=_tilt(m/k,c)
+    if lam*(c+1)<1e-6:
+        # practically flat: uniform parts, the correction below absorbs the difference
+        x=rng.randints(0,c,k)
+    else:
+        q=expm1(-lam*(c+1)) if lam*(c+1)<700 else -1.0
+        inv=-1/lam
+        x=[min(int(log1p(q*u)*inv),c) for u in rng.uniforms(0.0,1.0,k)]
+    d=m-sum(x)
+    while d:
+        step=max(1,abs(d)//k)
+        for i in rng.randints(0,k-1,min(abs(d)//step+16,k)):
+            t=min(d,step,c-x[i]) if d>0 else -min(-d,step,x[i])
+            x[i]+=t
+            d-=t
+            if not d:
+                break
+    h=k//2
+    for _ in range(GIBBS_SWEEPS):
+        o=rng.randint(0,k-1)
+        x=x[o:]+x[:o]
+        sums=[a+b for a,b in zip(x[:h],x[h:2*h])]
+        low=[s-c if s>c else 0 for s in sums]
+        a=[l+u for l,u in zip(low,rng.randbelows([min(c,s)-l+1 for s,l in zip(sums,low)]))]
+        x=a+[s-v for s,v in zip(sums,a)]+x[2*h:]
+    return x
+
+
+def _uniform_composition(total: int,k: int,lo: int,hi: int,rng)->list:
+    """Uniform (near-uniform for more than EXACT_PARTS bounded parts) k parts in [lo, hi] summing to total."""
+    if k<=0:
+        return []
+    m=total-lo*k
+    c=hi-lo
+    if m>c*k or m<0:
+        raise ValueError("Sum out of possible range")
+    if m<=c:
+        # the upper bound cannot bind: plain stars and bars
+        parts=_weak_composition(m,k,rng)
+    elif k<=EXACT_PARTS:
+        parts=_exact_bounded(m,k,c,rng)
+        rng.shuffle(parts)
+    else:
+        parts=_bounded_composition(m,k,c,rng)
+    return [p+lo for p in parts] if lo else parts
+
 
 class gen_arrays:
     
@@ -13,16 +163,21 @@ class gen_arrays:
         if unique:
             if len_>r-l+1:
                 raise ValueError("Cannot generate unique values: not enough numbers in range")
-            v=set()
-            while len(v)<len_:
-                v.add(rng.randint(l,r))
-            v=list(v)
+            v=sample_unique(l,r,len_,rng,ordered=not sorted_)
         else:
-            v=[rng.randint(l,r) for _ in range(len_)]
+            v=rng.randints(l,r,len_)
         if sorted_:
             v.sort()
         return v
 
+    @staticmethod
+    def iter_random(len_: int,l: int,r: int,rng=None,chunk: int=CHUNK_SIZE):
+        """Same values as random(), yielded as lists of at most chunk values."""
+        if rng is None:
+            rng=get_secure_random()
+        for start in range(0,len_,chunk):
+            yield rng.randints(l,r,min(chunk,len_-start))
+
     @staticmethod
     def permutation(n: int,rng=None):
         if rng is None:
@@ -35,20 +190,22 @@ class gen_arrays:
     def matrix(rows: int,cols: int,l: int,r: int,rng=None,unique_rows: bool=False,sorted_rows: bool=False):
         if rng is None:
             rng=get_secure_random()
-        return [gen_arrays.random(cols,l,r,rng,unique=unique_rows,sorted_=sorted_rows) for _ in range(rows)]
+        if unique_rows or sorted_rows:
+            return [gen_arrays.random(cols,l,r,rng,unique=unique_rows,sorted_=sorted_rows) for _ in range(rows)]
+        if cols<=0:
+            return [[] for _ in range(rows)]
+        flat=rng.randints(l,r,rows*cols)
+        return [flat[i:i+cols] for i in range(0,rows*cols,cols)]
 
     @staticmethod
     def pairs(len_: int,l1: int,r1: int,l2: int,r2: int,rng=None,ordered: bool=False):
         if rng is None:
             rng=get_secure_random()
-        v=[]
-        for _ in range(len_):
-            a=rng.randint(l1,r1)
-            b=rng.randint(l2,r2)
-            if ordered and a>b:
-                a,b=b,a
-            v.append((a,b))
-        return v
+        a=rng.randints(l1,r1,len_)
+        b=rng.randints(l2,r2,len_)
+        if ordered:
+            return [(x,y) if x<=y else (y,x) for x,y in zip(a,b)]
+        return list(zip(a,b))
 
     @staticmethod
     def subset(l: int,r: int,k: int,rng=None,sorted_: bool=False):
@@ -56,22 +213,24 @@ class gen_arrays:
             rng=get_secure_random()
         if k>r-l+1:
             raise ValueError("Subset size larger than range")
-        v=set()
-        while len(v)<k:
-            v.add(rng.randint(l,r))
-        v=list(v)
+        v=sample_unique(l,r,k,rng,ordered=not sorted_)
         if sorted_:
             v.sort()
-        else:
-            rng.shuffle(v)
         return v
 
     @staticmethod
-    def partition(sum_: int,k: int,min_val: int,max_val: int,rng=None):
+    def partition(sum_: int,k: int,min_val: int,max_val: int,rng=None,uniform: bool=False):
+        """
+        k parts in [min_val, max_val] summing to sum_. The default hands out the remainder
+        part by part (many parts stay at min_val); uniform=True samples uniformly among
+        all such compositions (see _uniform_composition).
+        """
         if rng is None:
             rng=get_secure_random()
         if sum_<min_val*k or sum_>max_val*k:
             raise ValueError("Sum out of possible range")
+        if uniform:
+            return _uniform_composition(sum_,k,min_val,max_val,rng)
         parts=[min_val]*k
         remaining=sum_-min_val*k
         for i in range(k):
@@ -107,7 +266,16 @@ class gen_arrays:
     def bit_array(len_: int,prob_one: float=0.5,rng=None):
         if rng is None:
             rng=get_secure_random()
-        return [1 if rng.random()<prob_one else 0 for _ in range(len_)]
+        if prob_one==0.5:
+            return rng.random_bits(len_)
+        return [1 if x<prob_one else 0 for x in rng.uniforms(0.0,1.0,len_)]
+
+    @staticmethod
+    def weighted(len_: int,values,weights,rng=None):
+        """len_ draws from values, value i with probability weights[i]/sum(weights) (one alias table)."""
+        if rng is None:
+            rng=get_secure_random()
+        return WeightedSampler(weights,values).sample(len_,rng)
 
     @staticmethod
     def shuffled(v,rng=None):
@@ -121,30 +289,27 @@ class gen_arrays:
     def strictly_increasing(len_: int,start: int,step_min: int,step_max: int,rng=None):
         if rng is None:
             rng=get_secure_random()
-        v=[start]
-        cur=start
-        for _ in range(1,len_):
-            cur+=rng.randint(step_min,step_max)
-            v.append(cur)
-        return v
+        if len_<=0:
+            return []
+        return list(accumulate(chain((start,),rng.randints(step_min,step_max,len_-1))))
 
     @staticmethod
     def strictly_decreasing(len_: int,start: int,step_min: int,step_max: int,rng=None):
         if rng is None:
             rng=get_secure_random()
-        v=[start]
-        cur=start
-        for _ in range(1,len_):
-            cur-=rng.randint(step_min,step_max)
-            v.append(cur)
-        return v
+        if len_<=0:
+            return []
+        return list(accumulate(chain((start,),rng.randints(-step_max,-step_min,len_-1))))
 
     @staticmethod
-    def random_with_sum(len_: int,sum_: int,min_val: int,max_val: int,rng=None):
+    def random_with_sum(len_: int,sum_: int,min_val: int,max_val: int,rng=None,uniform: bool=False):
+        """Like partition(); uniform=True samples uniformly among all arrays with this sum."""
         if rng is None:
             rng=get_secure_random()
         if sum_<min_val*len_ or sum_>max_val*len_:
             raise ValueError("Sum out of possible range")
+        if uniform:
+            return _uniform_composition(sum_,len_,min_val,max_val,rng)
         v=[min_val]*len_
         remaining=sum_-min_val*len_
         for i in range(len_):
@@ -3,157 +3,574 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from Hashings.secure_random import get_secure_random
-from typing import List, Tuple
+from generators.graph_buffer import GraphBuffer, index_array
+from generators.retries import count_retries
+from generators.sampling import WeightedSampler, isqrt, iter_sorted_sample, sample_unique, unrank_pair
+from heapq import heapify, heappop, heappush
+from itertools import accumulate, chain, compress, filterfalse, islice, repeat
+from operator import eq, ne, sub
+from typing import Iterator, List, Tuple
+
+# number of edges per chunk yielded by the iter_* generators
+CHUNK_SIZE=1<<16
+# random partners tried for one bad edge before the pairing is given up (Havel-Hakimi fallback)
+REPAIR_TRIES=1000
+# mixing rounds (m switch attempts each) applied to a Havel-Hakimi fallback graph
+FALLBACK_ROUNDS=10
+
+
+def _recursive_tree(n: int, rng, base: int=1):
+    """
+    Random recursive tree in compact form: node v>0 hangs off parent[v]<v and is printed
+    as labels[v] (a random permutation of base..base+n-1). Same distribution as tree().
+    """
+    labels=index_array(n+base, range(base,n+base))
+    rng.shuffle(labels)
+    parent=index_array(n, (0,))
+    for start in range(1,n,CHUNK_SIZE):
+        parent.extend(rng.randbelows(range(start,min(start+CHUNK_SIZE,n))))
+    return labels,parent
+
+
+def _shape_tree(n: int, parent, base: int, rng)->GraphBuffer:
+    """
+    Tree with edges (v, parent[v-1]) for v=1..n-1 over shape ids 0..n-1, handed out under a
+    random labelling and in random edge order, so the shape cannot be read off the ids.
+    """
+    labels=index_array(n+base, range(base,n+base))
+    rng.shuffle(labels)
+    buf=GraphBuffer(n,base,labels[1:],map(labels.__getitem__,parent))
+    buf.shuffle(rng)
+    return buf
+
+
+def _prufer_parents(n: int, seq, base: int=0):
+    """
+    Decode a Prufer sequence over nodes base..base+n-1 in O(n): returns parent with parent[v]
+    the neighbour v is removed towards (the tree is rooted at base+n-1, parent[:base] unused).
+    The smallest leaf is tracked with a forward pointer: a node that becomes a leaf below the
+    pointer is removed right away, so every node is scanned once.
+    """
+    degree=[1]*(n+base)
+    for x in seq:
+        degree[x]+=1
+    parent=[0]*(n+base)
+    ptr=leaf=degree.index(1,base)
+    for v in seq:
+        parent[leaf]=v
+        degree[v]-=1
+        if v<ptr and degree[v]==1:
+            leaf=v
+        else:
+            ptr+=1
+            while degree[ptr]!=1:
+                ptr+=1
+            leaf=ptr
+    parent[leaf]=n-1+base
+    return parent
+
+
+def _non_tree_pair(idx: int, parent):
+    """
+    Unrank idx among the pairs (u, v), u < v, that are not tree edges (u != parent[v]).
+    Row v holds v-1 such pairs, so this is triangular unranking shifted past the parent.
+    """
+    off,w=unrank_pair(idx)
+    v=w+1
+    return (off if off<parent[v] else off+1),v
+
+
+def _is_graphic(degrees)->bool:
+    """Erdos-Gallai test; only the last index of each run of equal degrees needs checking."""
+    d=sorted(degrees,reverse=True)
+    n=len(d)
+    if not n:
+        return True
+    if d[-1]<0 or d[0]>=n or sum(d)%2:
+        return False
+    prefix=[0,*accumulate(d)]
+    # p = number of degrees >= k, non-increasing in k
+    p=n
+    for k in range(1,n+1):
+        if k<n and d[k-1]==d[k]:
+            continue
+        while p and d[p-1]<k:
+            p-=1
+        q=max(p,k)
+        if prefix[k]>k*(k-1)+k*(q-k)+prefix[n]-prefix[q]:
+            return False
+    return True
+
+
+def _edge_keys(us, vs, N: int):
+    return [a*N+b if a<b else b*N+a for a,b in zip(us,vs)]
+
+
+def _repair(us, vs, N: int, rng):
+    """
+    Make the pairing (us[i], vs[i]) simple in place and return the set of its edge keys.
+    Every self-loop or repeated edge (a, b) is switched against a random edge (c, d) into
+    (a, c), (b, d), accepted only when both new edges are new and not loops, so degrees are
+    kept and the number of bad edges only goes down. None when some bad edge finds no
+    partner in REPAIR_TRIES attempts (possible only for very skewed degrees).
+    """
+    m=len(us)
+    keys=_edge_keys(us,vs,N)
+    # the last copy of every key is kept, the earlier copies and all loops are bad
+    last=dict(zip(keys,range(m)))
+    loops=list(compress(range(m),map(eq,us,vs)))
+    bad=set(compress(range(m),map(ne,map(last.__getitem__,keys),range(m))))
+    bad.update(loops)
+    seen=set(last)
+    seen.difference_update(map(keys.__getitem__,loops))
+    del keys,last
+    retries=0
+    while bad:
+        i=bad.pop()
+        a,b=us[i],vs[i]
+        for _ in range(REPAIR_TRIES):
+            retries+=1
+            j=rng.randint(0,m-1)
+            c,d=(vs[j],us[j]) if rng.getrandbits(1) else (us[j],vs[j])
+            if j==i or a==c or b==d:
+                continue
+            k1=a*N+c if a<c else c*N+a
+            k2=b*N+d if b<d else d*N+b
+            if k1==k2 or k1 in seen or k2 in seen:
+                continue
+            retries-=1
+            if j in bad:
+                bad.remove(j)
+            else:
+                seen.remove(c*N+d if c<d else d*N+c)
+            seen.add(k1)
+            seen.add(k2)
+            us[i],vs[i],us[j],vs[j]=a,c,b,d
+            break
+        else:
+            count_retries('gen_graphs.repair',retries)
+            return None
+    if retries:
+        count_retries('gen_graphs.repair',retries)
+    return seen
+
+
+def _mix(us, vs, seen, N: int, count: int, rng):
+    """count random double edge switches (a, b), (c, d) -> (a, c), (b, d) keeping the graph simple."""
+    m=len(us)
+    if m<2:
+        return
+    done=0
+    for start in range(0,count,CHUNK_SIZE):
+        k=min(CHUNK_SIZE,count-start)
+        for i,j,flip in zip(rng.randints(0,m-1,k),rng.randints(0,m-1,k),rng.random_bits(k)):
+            a,b=us[i],vs[i]
+            c,d=(vs[j],us[j]) if flip else (us[j],vs[j])
+            if a==c or b==d:
+                continue
+            # a new edge equal to an old one (including i==j) is already in seen
+            k1=a*N+c if a<c else c*N+a
+            k2=b*N+d if b<d else d*N+b
+            if k1 in seen or k2 in seen:
+                continue
+            seen.remove(a*N+b if a<b else b*N+a)
+            seen.remove(c*N+d if c<d else d*N+c)
+            seen.add(k1)
+            seen.add(k2)
+            us[i],vs[i],us[j],vs[j]=a,c,b,d
+            done+=1
+    if count>done:
+        count_retries('gen_graphs.mix',count-done)
+
+
+def _havel_hakimi(degrees, base: int):
+    """Deterministic realisation of a graphic sequence: the largest degree links to the next largest."""
+    heap=[(-d,v) for v,d in enumerate(degrees,base) if d]
+    heapify(heap)
+    us,vs=[],[]
+    while heap:
+        d,v=heappop(heap)
+        if len(heap)<-d:
+            raise ValueError("Degree sequence is not graphic")
+        taken=[heappop(heap) for _ in range(-d)]
+        for e,w in taken:
+            us.append(v)
+            vs.append(w)
+            if e+1:
+                heappush(heap,(e+1,w))
+    return us,vs
+
+
+def _sparse_degree_graph(degrees, base: int, rng, rounds: int):
+    """Configuration model pairing, switch repair, then rounds*m mixing switches; (us, vs, keys)."""
+    N=len(degrees)+base
+    stubs=list(chain.from_iterable(map(repeat,range(base,N),degrees)))
+    rng.shuffle(stubs)
+    us,vs=stubs[0::2],stubs[1::2]
+    del stubs
+    seen=_repair(us,vs,N,rng)
+    if seen is None:
+        us,vs=_havel_hakimi(degrees,base)
+        seen=set(_edge_keys(us,vs,N))
+        rounds=max(rounds,FALLBACK_ROUNDS)
+    _mix(us,vs,seen,N,rounds*len(us),rng)
+    return us,vs,seen
+
+
+def _degree_graph(degrees, base: int, rng, rounds: int)->GraphBuffer:
+    """
+    Random simple graph where node base+i has degree degrees[i] (the sequence must be graphic).
+    A shuffled pairing already lists its edges in random order and orientation. More than
+    half full graphs are built as the complement of the sparser complementary sequence,
+    where pairings have few collisions and repairs find partners.
+    """
+    n=len(degrees)
+    N=n+base
+    if 2*sum(degrees)<=n*(n-1):
+        us,vs,_=_sparse_degree_graph(degrees,base,rng,rounds)
+        return GraphBuffer(n,base,us,vs)
+    _,_,seen=_sparse_degree_graph([n-1-d for d in degrees],base,rng,rounds)
+    us,vs=[],[]
+    for a in range(base,N):
+        row=a*N
+        before=len(vs)
+        vs.extend(k-row for k in filterfalse(seen.__contains__,range(row+a+1,row+N)))
+        us.extend(repeat(a,len(vs)-before))
+    buf=GraphBuffer(n,base,us,vs)
+    buf.shuffle(rng)
+    buf.flip(rng)
+    return buf
+
+
+def _result(buf: GraphBuffer, as_buffer: bool):
+    """Generators return a GraphBuffer when asked for one, a list of tuples otherwise."""
+    return buf if as_buffer else buf.to_list()
 
 class gen_graphs:
     
     @staticmethod
-    def tree(n: int,zero_based=False,rng=None)->List[Tuple[int,int]]:
+    def tree(n: int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
         if rng is None:
             rng=get_secure_random()
-        nodes=list(range(1,n+1))
-        rng.shuffle(nodes)
-        edges=[]
-        for i in range(1,n):
-            u=nodes[i]
-            v=nodes[rng.randint(0,i-1)]
-            edges.append((u,v) if not zero_based else (u-1,v-1))
-            # edges.append((u, v))
+        base=0 if zero_based else 1
+        labels,parent=_recursive_tree(n,rng,base)
+        # edge of node v: (v, its parent), in shuffled label space
+        buf=GraphBuffer(n,base,labels[1:],map(labels.__getitem__,parent[1:]))
+        buf.shuffle(rng)
+        return _result(buf,as_buffer)
 
-        rng.shuffle(edges)
-        return edges
+    @staticmethod
+    def iter_tree(n: int,zero_based=False,rng=None,chunk: int=CHUNK_SIZE)->Iterator[List[Tuple[int,int]]]:
+        """
+        Same distribution as tree(), yielded as lists of at most chunk edges.
+        Node state is kept in compact int arrays (about 12 bytes per node), no edge list is built.
+        """
+        if rng is None:
+            rng=get_secure_random()
+        if n<2:
+            return
+        labels,parent=_recursive_tree(n,rng,0 if zero_based else 1)
+        order=index_array(n,range(1,n))
+        rng.shuffle(order)
+        for start in range(0,n-1,chunk):
+            yield [(labels[v],labels[parent[v]]) for v in order[start:start+chunk]]
 
     @staticmethod
-    def simple_graph(n: int,m: int,zero_based=False,rng=None)->List[Tuple[int,int]]:
+    def iter_simple_graph(n: int,m: int,zero_based=False,rng=None,chunk: int=CHUNK_SIZE)->Iterator[List[Tuple[int,int]]]:
+        """
+        Connected simple graph like simple_graph(), yielded as lists of at most chunk edges.
+        The spanning tree comes first; the remaining edges are drawn as a sorted stream of
+        distinct non-tree pair indices, so memory stays O(n) compact ints whatever m is.
+        Edges are shuffled within each chunk, not across the whole graph.
+        """
         if rng is None:
             rng=get_secure_random()
+        if m>n*(n-1)//2:
+            raise ValueError("Too many edges for a simple graph")
+        if n<2:
+            return
+        labels,parent=_recursive_tree(n,rng,0 if zero_based else 1)
+
+        def edge(a,b):
+            a,b=labels[a],labels[b]
+            return (a,b) if a<b else (b,a)
+
+        for start in range(1,n,chunk):
+            part=[edge(v,parent[v]) for v in range(start,min(start+chunk,n))]
+            rng.shuffle(part)
+            yield part
+        part=[]
+        for idx in iter_sorted_sample((n-1)*(n-2)//2,max(m-(n-1),0),rng):
+            part.append(edge(*_non_tree_pair(idx,parent)))
+            if len(part)==chunk:
+                rng.shuffle(part)
+                yield part
+                part=[]
+        if part:
+            rng.shuffle(part)
+            yield part
 
-        edges=gen_graphs.tree(n, rng)
-        edge_set=set(tuple(sorted(e)) for e in edges)
-        while len(edge_set)<m:
-            u=rng.randint(1,n)
-            v=rng.randint(1,n)
-            if u!=v:
-                # print(u,v)
-                edge_set.add(tuple(sorted((u,v) if not zero_based else (u-1,v-1))))
-        return list(edge_set)
+    @staticmethod
+    def simple_graph(n: int,m: int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
+        if rng is None:
+            rng=get_secure_random()
+        if m>n*(n-1)//2:
+            raise ValueError("Too many edges for a simple graph")
+        base=0 if zero_based else 1
+        labels,parent=_recursive_tree(n,rng,base)
+        a,b=labels[1:],list(map(labels.__getitem__,parent[1:]))
+        us,vs=list(map(min,a,b)),list(map(max,a,b))
+        # remaining edges: distinct indices among the non-tree pairs, unranked in O(1) each
+        # (inlined _non_tree_pair, this loop dominates dense graphs)
+        for idx in sample_unique(0,(n-1)*(n-2)//2-1,max(m-(n-1),0),rng,ordered=False):
+            w=(1+isqrt(8*idx+1))//2
+            u=idx-w*(w-1)//2
+            if u>=parent[w+1]:
+                u+=1
+            a,b=labels[u],labels[w+1]
+            if a>b:
+                a,b=b,a
+            us.append(a)
+            vs.append(b)
+        buf=GraphBuffer(n,base,us,vs)
+        buf.shuffle(rng)
+        return _result(buf,as_buffer)
 
     @staticmethod
-    def weighted_graph(n: int, m: int, min_w:int, max_w:int, zero_based=False,rng=None):
+    def weighted_graph(n: int, m: int, min_w:int, max_w:int, zero_based=False,rng=None,as_buffer=False):
         if rng is None:
             rng=get_secure_random()
 
-        edges=gen_graphs.simple_graph(n, m, zero_based, rng)
-        return [(u,v,(rng.randint(min_w, max_w) if not zero_based else (rng.randint(min_w, max_w)))) for u,v in edges]
+        buf=gen_graphs.simple_graph(n, m, zero_based, rng, as_buffer=True)
+        buf.set_weights(rng.randints(min_w, max_w, len(buf)))
+        return _result(buf,as_buffer)
 
     @staticmethod
-    def directed_graph(n: int,m: int,zero_based=False,rng=None)->List[Tuple[int,int]]:
+    def weighted_graph_dist(n: int, m: int, values, weights, zero_based=False,rng=None,as_buffer=False):
+        """Simple graph whose edge weights are drawn from values with the given weights (alias table)."""
         if rng is None:
             rng=get_secure_random()
-        edge_set=set()
-        while len(edge_set)<m:
-            u=rng.randint(1,n)
-            v=rng.randint(1,n)
-            if u!=v:
-                edge_set.add((u, v) if not zero_based else (u-1,v-1))
-        return list(edge_set)
+        sampler=WeightedSampler(weights,values)
+        buf=gen_graphs.simple_graph(n, m, zero_based, rng, as_buffer=True)
+        buf.set_weights(sampler.sample(len(buf),rng))
+        return _result(buf,as_buffer)
 
     @staticmethod
-    def dag(n: int,m: int,zero_based=False,rng=None)->List[Tuple[int, int]]:
+    def directed_graph(n: int,m: int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
         if rng is None:
             rng=get_secure_random()
+        if m>n*(n-1):
+            raise ValueError("Too many edges for a directed graph")
+        base=0 if zero_based else 1
+        us,vs=[],[]
+        for idx in sample_unique(0,n*(n-1)-1,m,rng,ordered=False):
+            u,v=divmod(idx,n-1)
+            if v>=u:
+                v+=1
+            us.append(u+base)
+            vs.append(v+base)
+        buf=GraphBuffer(n,base,us,vs)
+        buf.shuffle(rng)
+        return _result(buf,as_buffer)
 
-        nodes=list(range(1,n+1))
-        rng.shuffle(nodes)
-        edge_set=set()
-        while len(edge_set)<m:
-            u=rng.randint(0,n-2)
-            v=rng.randint(u+1,n-1)
-            edge_set.add((nodes[u], nodes[v]) if not zero_based else (nodes[u]-1,nodes[v]-1))
+    @staticmethod
+    def dag(n: int,m: int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int, int]]:
+        if rng is None:
+            rng=get_secure_random()
+        if m>n*(n-1)//2:
+            raise ValueError("Too many edges for a DAG")
 
-        return list(edge_set)
+        base=0 if zero_based else 1
+        nodes=list(range(base,n+base))
+        rng.shuffle(nodes)
+        us,vs=[],[]
+        # pair (u, v) with u < v in the shuffled topological order
+        for idx in sample_unique(0,n*(n-1)//2-1,m,rng,ordered=False):
+            u,v=unrank_pair(idx)
+            us.append(nodes[u])
+            vs.append(nodes[v])
+        buf=GraphBuffer(n,base,us,vs)
+        buf.shuffle(rng)
+        return _result(buf,as_buffer)
 
     @staticmethod
-    def bipartite(n1: int,n2: int,m: int,zero_based=False,rng=None)->List[Tuple[int,int]]:
+    def bipartite(n1: int,n2: int,m: int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
         if rng is None:
             rng=get_secure_random()
-        edge_set=set()
-        while len(edge_set)<m:
-            u=rng.randint(1,n1)
-            v=rng.randint(1,n2)+n1
-            edge_set.add((u,v) if not zero_based else (u-1,v-1))
-        return list(edge_set)
+        if m>n1*n2:
+            raise ValueError("Too many edges for a bipartite graph")
+        base=0 if zero_based else 1
+        us,vs=[],[]
+        for idx in sample_unique(0,n1*n2-1,m,rng,ordered=False):
+            u,v=divmod(idx,n2)
+            us.append(u+base)
+            vs.append(v+n1+base)
+        buf=GraphBuffer(n1+n2,base,us,vs)
+        buf.shuffle(rng)
+        return _result(buf,as_buffer)
 
     @staticmethod
-    def star(n:int,center:int=1,zero_based=False,rng=None)->List[Tuple[int,int]]:
+    def star(n:int,center:int=1,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
         if rng is None:
             rng=get_secure_random()
-        edges=[]
-        for i in range(1,n+1):
-            if i!=center:
-                edges.append((center,i) if not zero_based else (center-1,i-1))
-        rng.shuffle(edges)
-        return edges
+        shift=1 if zero_based else 0
+        leaves=[i-shift for i in range(1,n+1) if i!=center]
+        buf=GraphBuffer(n,1-shift,[center-shift]*len(leaves),leaves)
+        buf.shuffle(rng)
+        return _result(buf,as_buffer)
 
     @staticmethod
-    def cycle(n:int,zero_based=False,rng=None)->List[Tuple[int,int]]:
+    def cycle(n:int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
         if rng is None:
             rng=get_secure_random()
-        nodes=list(range(1,n+1))
+        base=0 if zero_based else 1
+        nodes=list(range(base,n+base))
         rng.shuffle(nodes)
-        if zero_based:
-            return [(nodes[i]-1,nodes[(i+1)%n]-1) for i in range(n)]
-        return [(nodes[i],nodes[(i+1)%n]) for i in range(n)]
+        return _result(GraphBuffer(n,base,nodes,nodes[1:]+nodes[:1]),as_buffer)
     
     @staticmethod
-    def complete(n:int,zero_based=False)->List[Tuple[int,int]]:
-        if zero_based:
-            return [(i,j) for i in range(n) for j in range(i+1,n)]
-        return [(i,j) for i in range(1,n+1) for j in range(i+1,n+1)]
+    def complete(n:int,zero_based=False,as_buffer=False)->List[Tuple[int,int]]:
+        base=0 if zero_based else 1
+        us=[i for i in range(base,n+base) for _ in range(i+1,n+base)]
+        vs=[j for i in range(base,n+base) for j in range(i+1,n+base)]
+        return _result(GraphBuffer(n,base,us,vs),as_buffer)
 
     @staticmethod
-    def regular(n:int,d:int,zero_based=False,rng=None)->List[Tuple[int,int]]:
+    def regular(n:int,d:int,zero_based=False,rng=None,as_buffer=False,rounds:int=0)->List[Tuple[int,int]]:
+        """
+        Random simple d-regular graph (empty when n*d is odd or d>=n). Stubs are paired at
+        random and self-loops or repeated edges are removed by degree preserving switches,
+        which takes O(n*d) expected time. rounds adds rounds*m random switches on top for
+        mixing closer to uniform (the repaired pairing is already close for small d).
+        """
         if rng is None:
             rng=get_secure_random()
+        base=0 if zero_based else 1
         if (n*d)%2!=0 or d>=n:
-            return []
-        nodes=[]
-        for i in range(1,n+1):
-            nodes.extend([i]*d)
-        rng.shuffle(nodes)
-        edges=[]
-        for i in range(0,len(nodes),2):
-            if nodes[i]==nodes[i+1]:
-                return []
-            u,v=nodes[i],nodes[i+1]
-            edges.append((u,v) if not zero_based else (u-1,v-1))
-        return edges
+            return _result(GraphBuffer(n,base),as_buffer)
+        return _result(_degree_graph([d]*n,base,rng,rounds),as_buffer)
+
+    @staticmethod
+    def degree_sequence(degrees,zero_based=False,rng=None,as_buffer=False,rounds:int=0)->List[Tuple[int,int]]:
+        """
+        Random simple graph in which node i (i-th in degrees, counted from 0 or 1) has degree
+        degrees[i]; same pairing and switch repair as regular(). Raises ValueError when no
+        simple graph has these degrees (Erdos-Gallai).
+        """
+        if rng is None:
+            rng=get_secure_random()
+        degrees=list(degrees)
+        if not _is_graphic(degrees):
+            raise ValueError("Degree sequence is not graphic")
+        base=0 if zero_based else 1
+        return _result(_degree_graph(degrees,base,rng,rounds),as_buffer)
 
     @staticmethod
-    def tree_with_diameter(n:int,diameter:int,zero_based=False,rng=None)->List[Tuple[int,int]]:
+    def tree_with_diameter(n:int,diameter:int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
         if rng is None:
             rng=get_secure_random()
+        base=0 if zero_based else 1
         diameter=min(diameter,n-1)
-        path=list(range(1,diameter+2))
+        path=list(range(base,diameter+1+base))
         rng.shuffle(path)
-        edges=[]
-        for i in range(diameter):
-            a,b=path[i],path[i+1]
-            edges.append((a,b) if not zero_based else (a-1,b-1))
-        next_node=diameter+2
-        while len(edges)<n-1:
-            attach=rng.randint(0,diameter)
-            a,b=path[attach],next_node
-            edges.append((a,b) if not zero_based else (a-1,b-1))
-            next_node+=1
-        rng.shuffle(edges)
-        return edges
+        us,vs=path[:-1],path[1:]
+        # remaining nodes hang off random path nodes
+        us+=map(path.__getitem__,rng.randints(0,diameter,max(n-1-diameter,0)))
+        vs+=range(diameter+1+base,n+base)
+        buf=GraphBuffer(n,base,us,vs)
+        buf.shuffle(rng)
+        return _result(buf,as_buffer)
     
     @staticmethod
-    def chain_tree(n:int,zero_based=False)->List[Tuple[int,int]]:
-        if zero_based:
-            return [(i-2,i-1) for i in range(2,n+1)]
-        return [(i-1,i) for i in range(2,n+1)]
+    def uniform_tree(n:int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
+        """
+        Uniformly random labelled tree (each of the n^(n-2) trees equally likely), decoded from a
+        random Prufer sequence in O(n). Unlike tree() (random recursive, O(log n) depth), the
+        depth is about sqrt(n).
+        """
+        if rng is None:
+            rng=get_secure_random()
+        base=0 if zero_based else 1
+        if n<2:
+            return _result(GraphBuffer(n,base),as_buffer)
+        parent=_prufer_parents(n,rng.randints(base,n-1+base,n-2),base)
+        buf=GraphBuffer(n,base,range(base,n-1+base),islice(parent,base,n-1+base))
+        buf.shuffle(rng)
+        return _result(buf,as_buffer)
+
+    @staticmethod
+    def caterpillar(n:int,spine:int=None,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
+        """Path of spine nodes (default n//2) with every other node a leaf on a random spine node."""
+        if rng is None:
+            rng=get_secure_random()
+        spine=min(max(spine if spine is not None else n//2,1),n)
+        parent=index_array(n,range(spine-1))
+        parent.extend(rng.randints(0,spine-1,n-spine))
+        return _result(_shape_tree(n,parent,0 if zero_based else 1,rng),as_buffer)
+
+    @staticmethod
+    def broom(n:int,handle:int=None,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
+        """Path of handle nodes (default n//2) whose last node carries all other nodes as leaves."""
+        if rng is None:
+            rng=get_secure_random()
+        handle=min(max(handle if handle is not None else n//2,1),n)
+        parent=index_array(n,range(handle-1))
+        parent.extend(repeat(handle-1,n-handle))
+        return _result(_shape_tree(n,parent,0 if zero_based else 1,rng),as_buffer)
+
+    @staticmethod
+    def k_ary_tree(n:int,k:int=2,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
+        """Complete k-ary tree (heap order: node v>0 hangs off (v-1)//k), randomly labelled."""
+        if rng is None:
+            rng=get_secure_random()
+        parent=index_array(n,islice(chain.from_iterable(map(repeat,range(n),repeat(k))),max(n-1,0)))
+        return _result(_shape_tree(n,parent,0 if zero_based else 1,rng),as_buffer)
+
+    @staticmethod
+    def spider(n:int,legs:int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
+        """Root with legs paths of (n-1)/legs nodes each (lengths differ by at most one)."""
+        if rng is None:
+            rng=get_secure_random()
+        legs=min(max(legs,1),max(n-1,1))
+        # every node hangs off the previous one, except the first node of each leg
+        parent=index_array(n,range(max(n-1,0)))
+        q,r=divmod(n-1,legs)
+        start=1
+        for j in range(legs if n>1 else 0):
+            parent[start-1]=0
+            start+=q+(j<r)
+        return _result(_shape_tree(n,parent,0 if zero_based else 1,rng),as_buffer)
+
+    @staticmethod
+    def sqrt_killer(n:int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
+        """
+        Spider with about sqrt(n) legs of about sqrt(n) nodes: depth and root degree are both
+        ~sqrt(n), so neither a small depth nor small degrees can be assumed (breaks "light
+        side is small" square root splits and per-ancestor or per-neighbour loops).
+        """
+        return gen_graphs.spider(n,max(isqrt(n-1),1) if n>1 else 1,zero_based,rng,as_buffer)
+
+    @staticmethod
+    def windowed_tree(n:int,window:int,zero_based=False,rng=None,as_buffer=False)->List[Tuple[int,int]]:
+        """
+        Node v hangs off one of the window nodes before it (uniformly), mixing depth against
+        branching: window=1 is a path, window>=n the random recursive tree of tree(); in
+        between the depth is about 2n/window and degrees stay small.
+        """
+        if rng is None:
+            rng=get_secure_random()
+        window=max(window,1)
+        parent=index_array(n)
+        for start in range(1,n,CHUNK_SIZE):
+            stop=min(start+CHUNK_SIZE,n)
+            back=rng.randbelows(list(map(min,range(start,stop),repeat(window))))
+            parent.extend(map(sub,range(start-1,stop-1),back))
+        return _result(_shape_tree(n,parent,0 if zero_based else 1,rng),as_buffer)
+
+    @staticmethod
+    def chain_tree(n:int,zero_based=False,as_buffer=False)->List[Tuple[int,int]]:
+        base=0 if zero_based else 1
+        return _result(GraphBuffer(n,base,range(base,n+base-1),range(base+1,n+base)),as_buffer)
     
 
 if __name__ == "__main__":
@@ -161,4 +578,4 @@ if __name__ == "__main__":
     print(gen_graphs.simple_graph(6,8))
     print(gen_graphs.weighted_graph(5,6,1,10))
     print(gen_graphs.dag(6,7))
-    print(gen_graphs.star(5,center=3))
\ No newline at end of file
+    print(gen_graphs.star(5,center=3))
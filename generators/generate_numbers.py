@@ -3,7 +3,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from Hashings.secure_random import get_secure_random
-from typing import List,Set
+from generators.retries import count_retries
+from generators.sampling import ExclusionIndex, RealExclusionIndex, WeightedSampler
+from typing import List,Set,Tuple
 
 class gen_numbers:
 
@@ -24,28 +26,35 @@ class gen_numbers:
         if rng is None:
             rng=get_secure_random()
         if isinstance(l,float) or isinstance(r,float):
-            return [rng.uniform(l,r) for _ in range(count)]
-        return [rng.randint(l,r) for _ in range(count)]
+            return rng.uniforms(l,r,count)
+        return rng.randints(l,r,count)
 
     @staticmethod
     def random_exclude(l:int,r:int,exclude:Set[int],rng=None)->int:
+        """exclude may also be an ExclusionIndex over [l, r], reused across calls."""
         if rng is None:
             rng=get_secure_random()
-        while True:
-            val=rng.randint(l,r)
-            if val not in exclude:
-                return val
+        if isinstance(exclude,ExclusionIndex):
+            return exclude.draw(rng)
+        if 2*len(exclude)<=r-l+1:
+            # at most half the range is excluded: retrying takes at most 2 draws on average
+            retries=0
+            while True:
+                val=rng.randint(l,r)
+                if val not in exclude:
+                    if retries:
+                        count_retries('gen_numbers.random_exclude',retries)
+                    return val
+                retries+=1
+        return ExclusionIndex(l,r,exclude).draw(rng)
 
     @staticmethod
     def random_range_exclude(l:int,r:int,count:int,exclude:Set[int],rng=None)->List[int]:
+        """count draws via one ExclusionIndex (exclude may be a prebuilt one); no retries."""
         if rng is None:
             rng=get_secure_random()
-        v=[]
-        while len(v)<count:
-            val=rng.randint(l,r)
-            if val not in exclude:
-                v.append(val)
-        return v
+        index=exclude if isinstance(exclude,ExclusionIndex) else ExclusionIndex(l,r,exclude)
+        return index.sample(count,rng)
 
     @staticmethod
     def random_weighted(values:List,weights:List[float],rng=None):
@@ -53,15 +62,26 @@ class gen_numbers:
             rng=get_secure_random()
         return rng.choices(values,weights,k=1)[0]
 
+    @staticmethod
+    def random_weighted_range(values:List,weights:List[float],count:int,rng=None)->List:
+        """count weighted draws; use a WeightedSampler directly to reuse the table across calls."""
+        if rng is None:
+            rng=get_secure_random()
+        return WeightedSampler(weights,values).sample(count,rng)
+
     @staticmethod
     def random_real_exclude(l:float,r:float,excl_l:float,excl_r:float,rng=None)->float:
         if rng is None:
             rng=get_secure_random()
-        while True:
-            val=rng.uniform(l,r)
-            if not(excl_l<=val<=excl_r):
-                return val
+        return RealExclusionIndex(l,r,((excl_l,excl_r),)).draw(rng)
 
+    @staticmethod
+    def random_reals_exclude(l:float,r:float,count:int,intervals:List[Tuple[float,float]],rng=None)->List[float]:
+        """count uniform reals from [l, r] outside every (a, b) interval; intervals may be a RealExclusionIndex."""
+        if rng is None:
+            rng=get_secure_random()
+        index=intervals if isinstance(intervals,RealExclusionIndex) else RealExclusionIndex(l,r,intervals)
+        return index.sample(count,rng)
 
 if __name__ == "__main__":
     print(gen_numbers.random_int(1,10))
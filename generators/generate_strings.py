@@ -3,84 +3,381 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from Hashings.secure_random import get_secure_random
+from generators.retries import count_retries
+from generators.sampling import isqrt
 from enum import Enum
-from typing import List
+from functools import lru_cache
+from math import gcd
+from typing import List, Sequence, Tuple
 
 class CaseType(Enum):
     Lower=0
     Upper=1
     Mixed=2
 
+DIGITS=b'0123456789'
+# bytes mapped per translate() round of _random_bytes, bounds the temporary buffers
+BYTES_CHUNK=1<<22
+# hash_collision: birthday search up to this modulus size, tree attack above
+BIRTHDAY_BITS=36
+_FLIP=bytes.maketrans(b'\x00\x01',b'\x01\x00')
+
+@lru_cache(maxsize=64)
+def _letters(case_type: CaseType, l: str='a', r: str='z')->bytes:
+    """Alphabet of the letters l..r (either case) in case_type; Mixed holds both cases."""
+    lower=bytes(range(ord(l.lower()),ord(r.lower())+1))
+    if not lower:
+        raise ValueError("empty letter range")
+    if case_type==CaseType.Upper:
+        return lower.upper()
+    if case_type==CaseType.Mixed:
+        return lower+lower.upper()
+    return lower
+
+@lru_cache(maxsize=64)
+def _tables(alphabet: bytes):
+    """translate() tables for alphabet: byte -> symbol, and the bytes rejected to stay unbiased."""
+    k=len(alphabet)
+    limit=256-256%k
+    return bytes(alphabet[i%k] for i in range(256)),bytes(range(limit,256)),limit
+
+def _random_bytes(len_: int,alphabet: bytes,rng)->bytes:
+    """
+    len_ symbols drawn uniformly from alphabet (at most 256 single-byte symbols).
+    Random bytes at or above the largest multiple of len(alphabet) are deleted and the
+    rest mapped by bytes.translate, so there is no Python-level work per character.
+    """
+    if len_<=0:
+        return b''
+    if len(alphabet)==1:
+        return alphabet*len_
+    table,reject,limit=_tables(alphabet)
+    out=[]
+    need=len_
+    rounds=0
+    while need>0:
+        step=min(need,BYTES_CHUNK)
+        # over-draw by the expected rejection rate so one round is almost always enough
+        raw=rng.randbytes(step*256//limit+16) if reject else rng.randbytes(step)
+        raw=raw.translate(table,reject)[:step]
+        out.append(raw)
+        need-=len(raw)
+        # a short chunk (too many rejected bytes) means one extra round
+        rounds+=len(raw)<step
+    if rounds:
+        count_retries('gen_strings.random_bytes',rounds)
+    return b''.join(out)
+
+def _mix(a: bytes,b: bytes,rng)->bytes:
+    """a[i] or b[i] for every i, each with probability 1/2 (bytewise masks on big ints)."""
+    n=len(a)
+    if n==0:
+        return b''
+    mask=_random_bytes(n,b'\x00\xff',rng)
+    keep_a=int.from_bytes(mask,'big')
+    keep_b=int.from_bytes(mask.translate(bytes(range(255,-1,-1))),'big')
+    return ((int.from_bytes(a,'big')&keep_a)|(int.from_bytes(b,'big')&keep_b)).to_bytes(n,'big')
+
+def _alphanum_bytes(len_: int,letters: bool,digits: bool,case_type: CaseType,rng)->bytes:
+    assert letters or digits
+    if not digits:
+        return _random_bytes(len_,_letters(case_type),rng)
+    if not letters:
+        return _random_bytes(len_,DIGITS,rng)
+    # a letter or a digit with probability 1/2 each, as random_alphanum always did
+    return _mix(_random_bytes(len_,_letters(case_type),rng),_random_bytes(len_,DIGITS,rng),rng)
+
+def _mirror(half: bytes,len_: int)->bytes:
+    """Palindrome of length len_ whose first ceil(len_/2) symbols are half."""
+    return half+half[:len_//2][::-1]
+
+def _split(data: bytes,count: int,len_: int)->List[str]:
+    if len_<=0:
+        return ['']*count
+    s=data.decode('latin-1')
+    return [s[i:i+len_] for i in range(0,count*len_,len_)]
+
+def _inverse(a: int,m: int)->int:
+    """a^-1 mod m for gcd(a, m) = 1 (pow(a, -1, m) needs Python 3.8)."""
+    r0,r1,x0,x1=a%m,m,1,0
+    while r1:
+        q=r0//r1
+        r0,r1,x0,x1=r1,r0-q*r1,x1,x0-q*x1
+    return x0%m
+
+def _groups(pairs: Sequence[Tuple[int,int]]):
+    """Split (base, mod) pairs into groups of pairwise coprime moduli (one CRT stage each)."""
+    groups=[]
+    for base,mod in pairs:
+        for g in groups:
+            if gcd(g[0],mod)==1:
+                g[0]*=mod
+                g[1].append((base,mod))
+                break
+        else:
+            groups.append([mod,[(base,mod)]])
+    return groups
+
+def _stage_weights(group,a: bytes,b: bytes,count: int):
+    """
+    CRT combined hash contribution of swapping block a for block b at each of count block
+    positions: a choice of blocks x collides with y for every modulus of the group exactly
+    when sum((x_j-y_j)*w_j) = 0 mod the product of the moduli.
+    """
+    total,pairs=group
+    width=len(a)
+    weights=[0]*count
+    for base,mod in pairs:
+        crt=total//mod*_inverse(total//mod,mod)
+        diff=(gen_strings.poly_hash(b,base,mod)-gen_strings.poly_hash(a,base,mod))%mod
+        step=pow(base,width,mod)
+        p=1
+        for j in range(count-1,-1,-1):
+            weights[j]=(weights[j]+crt*(diff*p%mod))%total
+            p=p*step%mod
+    return weights,total
+
+def _birthday(group,a: bytes,b: bytes,rng):
+    """Two distinct 0/1 block choices with equal weight sum, by the birthday paradox."""
+    bits=group[0].bit_length()
+    # 4 lookup tables of 2^q entries; 2^count choices make repeated draws of one choice rare
+    q=(bits+11)//4
+    count=4*q
+    w,mod=_stage_weights(group,a,b,count)
+    tables=[]
+    for t in range(4):
+        part=w[count-q*(t+1):count-q*t][::-1]
+        table=[0]
+        for wj in part:
+            table+=[(v+wj)%mod for v in table]
+        tables.append(table)
+    t0,t1,t2,t3=tables
+    mask=(1<<q)-1
+    seen={}
+    while True:
+        for x in rng.randints(0,(1<<count)-1,1<<12):
+            h=(t0[x&mask]+t1[x>>q&mask]+t2[x>>2*q&mask]+t3[x>>3*q])%mod
+            y=seen.setdefault(h,x)
+            if y!=x:
+                return [x>>(count-1-j)&1 for j in range(count)],[y>>(count-1-j)&1 for j in range(count)]
+
+def _tree_attack(group,a: bytes,b: bytes):
+    """
+    Tree attack: pair up sorted values and keep differences until one becomes 0; the
+    signs along the way give coefficients in {-1, 0, 1}. Needs about 2^sqrt(2*log2(mod))
+    blocks, so it handles 64-bit and combined moduli where a birthday search cannot.
+    """
+    k=isqrt(2*group[0].bit_length()-1)+1
+    while k<=24:
+        n=1<<k
+        w,mod=_stage_weights(group,a,b,n)
+        # node i<n is block i; node n+j combines parts[j]=(larger, smaller)
+        parts=[]
+        level=sorted(((v,i) for i,v in enumerate(w)),reverse=True)
+        zero=next((i for v,i in level if v==0),None)
+        while zero is None and len(level)>1:
+            nxt=[]
+            for j in range(0,len(level)-1,2):
+                (v1,i1),(v2,i2)=level[j],level[j+1]
+                parts.append((i1,i2))
+                nxt.append((v1-v2,n+len(parts)-1))
+            level=sorted(nxt,reverse=True)
+            zero=next((i for v,i in level if v==0),None)
+        if zero is not None:
+            d=[0]*n
+            stack=[(zero,1)]
+            while stack:
+                node,sign=stack.pop()
+                if node<n:
+                    d[node]=sign
+                else:
+                    big,small=parts[node-n]
+                    stack.append((big,sign))
+                    stack.append((small,-sign))
+            return [int(c==1) for c in d],[int(c==-1) for c in d]
+        k+=1
+    raise ValueError("tree attack found no collision; modulus too large")
+
 class gen_strings:
 
     @staticmethod
     def random_char(case_type:CaseType,rng=None,l='a',r='z')->str:
         if rng is None:
             rng=get_secure_random()
-        if case_type==CaseType.Upper:
-            base='A'
-        else:
-            base='a'
-        ch=chr(ord(base)+rng.randint(ord(l)-ord(base),ord(r)-ord(base)))
-        if case_type==CaseType.Mixed and rng.randint(0,1):
-            ch=ch.upper() if ch.islower() else ch.lower()
-        return ch
+        alphabet=_letters(case_type,l,r)
+        return chr(alphabet[rng.randint(0,len(alphabet)-1)])
 
     @staticmethod
     def random(len_:int,case_type:CaseType,rng=None,l='a',r='z')->str:
         if rng is None:
             rng=get_secure_random()
-        return ''.join(gen_strings.random_char(case_type,rng,l,r) for _ in range(len_))
+        return _random_bytes(len_,_letters(case_type,l,r),rng).decode('latin-1')
 
     @staticmethod
     def palindrome(len_:int,case_type:CaseType,rng=None,l='a',r='z')->str:
         if rng is None:
             rng=get_secure_random()
-        s=['']*len_
-        i,j=0,len_-1
-        while i<=j:
-            ch=gen_strings.random_char(case_type,rng,l,r)
-            s[i]=s[j]=ch
-            i+=1
-            j-=1
-        return ''.join(s)
+        half=_random_bytes((len_+1)//2,_letters(case_type,l,r),rng)
+        return _mirror(half,len_).decode('latin-1')
 
     @staticmethod
     def random_alphanum(len_:int,letters:bool,digits:bool,case_type:CaseType,rng=None)->str:
         if rng is None:
             rng=get_secure_random()
-        assert letters or digits
-        s=[]
-        for _ in range(len_):
-            if letters and digits:
-                if rng.randint(0,1):
-                    s.append(gen_strings.random_char(case_type,rng))
-                else:
-                    s.append(chr(ord('0')+rng.randint(0,9)))
-            elif letters:
-                s.append(gen_strings.random_char(case_type,rng))
-            else:
-                s.append(chr(ord('0')+rng.randint(0,9)))
-        return ''.join(s)
+        return _alphanum_bytes(len_,letters,digits,case_type,rng).decode('latin-1')
 
     @staticmethod
     def random_custom(len_:int,alphabet:str,rng=None)->str:
         if rng is None:
             rng=get_secure_random()
         assert alphabet
-        return ''.join(alphabet[rng.randint(0,len(alphabet)-1)] for _ in range(len_))
+        if len(alphabet)<=256 and max(map(ord,alphabet))<256:
+            return _random_bytes(len_,alphabet.encode('latin-1'),rng).decode('latin-1')
+        # symbols wider than a byte: draw indices in bulk instead
+        return ''.join(map(alphabet.__getitem__,rng.randints(0,len(alphabet)-1,len_)))
 
     @staticmethod
     def random_strings(count:int,len_:int,case_type:CaseType,rng=None)->List[str]:
         if rng is None:
             rng=get_secure_random()
-        return [gen_strings.random(len_,case_type,rng) for _ in range(count)]
+        return _split(_random_bytes(count*len_,_letters(case_type),rng),count,len_)
 
     @staticmethod
     def palindromes(count:int,len_:int,case_type:CaseType,rng=None)->List[str]:
         if rng is None:
             rng=get_secure_random()
-        return [gen_strings.palindrome(len_,case_type,rng) for _ in range(count)]
+        h=(len_+1)//2
+        if h==0:
+            return ['']*count
+        halves=_random_bytes(count*h,_letters(case_type),rng)
+        return [_mirror(halves[i:i+h],len_).decode('latin-1') for i in range(0,count*h,h)]
+
+    # ==================== ADVERSARIAL STRINGS ====================
+
+    @staticmethod
+    def poly_hash(s,base:int,mod:int)->int:
+        """sum(ord(s[i]) * base^(n-1-i)) mod mod, the hash hash_collision() attacks."""
+        h=0
+        for c in (s.encode('latin-1') if isinstance(s,str) else s):
+            h=(h*base+c)%mod
+        return h
+
+    @staticmethod
+    def thue_morse(len_:int,a:str='a',b:str='b')->str:
+        """
+        Prefix of the Thue-Morse word (a/b at i by the parity of popcount(i)), built by doubling.
+        thue_morse(2**k) and thue_morse(2**k,'b','a') have equal polynomial hashes mod 2^64
+        for every odd base once k>=11, which breaks hashing with unsigned overflow.
+        """
+        t=b'\x00'
+        while len(t)<len_:
+            t+=t.translate(_FLIP)
+        return t[:max(len_,0)].translate(bytes.maketrans(b'\x00\x01',(a+b).encode('latin-1'))).decode('latin-1')
+
+    @staticmethod
+    def hash_collision(pairs:Sequence[Tuple[int,int]],len_:int=None,rng=None)->Tuple[str,str]:
+        """
+        Two distinct strings of equal length over 'a'/'b' with equal poly_hash for every (base, mod)
+        in pairs (so character codes c-'a'+1 collide too). Coprime moduli are attacked together
+        through the CRT; moduli up to 2^BIRTHDAY_BITS by a birthday search, larger ones by the
+        tree attack. A modulus sharing a factor with an earlier one gets its own stage over the
+        two colliding blocks of the previous stage, which multiplies the length.
+        len_ pads both strings with the same random suffix (collisions survive common suffixes).
+        """
+        if rng is None:
+            rng=get_secure_random()
+        if not pairs:
+            raise ValueError("no (base, mod) pairs")
+        a,b=b'a',b'b'
+        for group in _groups(pairs):
+            if group[0].bit_length()<=BIRTHDAY_BITS:
+                x,y=_birthday(group,a,b,rng)
+            else:
+                x,y=_tree_attack(group,a,b)
+            a,b=b''.join(b if c else a for c in x),b''.join(b if c else a for c in y)
+        if len_ is not None:
+            if len_<len(a):
+                raise ValueError(f"collision needs length {len(a)}, asked for {len_}")
+            tail=_random_bytes(len_-len(a),_letters(CaseType.Lower),rng)
+            a,b=a+tail,b+tail
+        return a.decode('latin-1'),b.decode('latin-1')
+
+    @staticmethod
+    def fibonacci(len_:int,a:str='a',b:str='b')->str:
+        """Prefix of the Fibonacci word abaababaab... (S_n = S_(n-1) + S_(n-2)): many repeats, few distinct factors."""
+        prev,cur=a,a+b
+        while len(cur)<len_:
+            prev,cur=cur,cur+prev
+        return cur[:max(len_,0)] if len_>1 else prev[:max(len_,0)]
+
+    @staticmethod
+    def periodic(len_:int,period:int,case_type:CaseType=CaseType.Lower,rng=None)->str:
+        """A random block of length period repeated up to len_ characters."""
+        if rng is None:
+            rng=get_secure_random()
+        if period<=0:
+            raise ValueError("period must be positive")
+        block=_random_bytes(min(period,len_),_letters(case_type),rng)
+        if not block:
+            return ''
+        return (block*(len_//len(block)+1))[:len_].decode('latin-1')
+
+    @staticmethod
+    def runs(len_:int,max_run:int,case_type:CaseType=CaseType.Lower,rng=None)->str:
+        """Runs of one repeated letter with lengths uniform in [1, max_run]; adjacent runs differ."""
+        if rng is None:
+            rng=get_secure_random()
+        if max_run<=0:
+            raise ValueError("max_run must be positive")
+        letters=_letters(case_type)
+        k=len(letters)
+        if k==1 or len_<=0:
+            return (letters[:1]*max(len_,0)).decode('latin-1')
+        singles=[letters[i:i+1] for i in range(k)]
+        out=[]
+        total=0
+        cur=rng.randint(0,k-1)
+        while total<len_:
+            count=(len_-total)//((max_run+1)//2+1)+16
+            # shifting by 1..k-1 letters never repeats the previous run's letter
+            for length,shift in zip(rng.randints(1,max_run,count),rng.randints(1,k-1,count)):
+                out.append(singles[cur]*length)
+                total+=length
+                cur=(cur+shift)%k
+                if total>=len_:
+                    break
+        return b''.join(out)[:len_].decode('latin-1')
+
+    @staticmethod
+    def many_borders(len_:int,period:int=1,case_type:CaseType=CaseType.Lower,mismatch_last:bool=True,rng=None)->str:
+        """
+        w^k prefix for a random block w of length period: every prefix of length p*i is a border
+        (aaaa...a for period=1). With mismatch_last the final character breaks the period, so a
+        failure-function walk visits every border at the end; code that restarts the comparison
+        instead of following borders goes quadratic.
+        """
+        if rng is None:
+            rng=get_secure_random()
+        s=gen_strings.periodic(len_,period,case_type,rng)
+        if not mismatch_last or len_<=1:
+            return s
+        letters=_letters(case_type)
+        if len(letters)==1:
+            raise ValueError("mismatch_last needs at least two letters")
+        expected=letters.index(ord(s[-1]))
+        return s[:-1]+chr(letters[(expected+rng.randint(1,len(letters)-1))%len(letters)])
+
+    @staticmethod
+    def zimin(len_:int)->str:
+        """Prefix of the Zimin word Z_k = Z_(k-1) x_k Z_(k-1) over a, b, c, ... (every Z_j is a border of Z_k)."""
+        z=b''
+        letter=ord('a')
+        while len(z)<len_:
+            if letter>ord('z'):
+                raise ValueError("zimin words longer than 2^26-1 need more than 26 letters")
+            z=z+bytes((letter,))+z
+            letter+=1
+        return z[:max(len_,0)].decode('latin-1')
 
 if __name__ == "__main__":
     print(gen_strings.random(10,CaseType.Mixed))
@@ -88,4 +385,4 @@ if __name__ == "__main__":
     print(gen_strings.random_alphanum(15,True,True,CaseType.Upper))
     print(gen_strings.random_custom(12,"abc123"))
     print(gen_strings.random_strings(5,8,CaseType.Lower))
-    print(gen_strings.palindromes(3,7,CaseType.Mixed))
\ No newline at end of file
+    print(gen_strings.palindromes(3,7,CaseType.Mixed))
@@ -0,0 +1,128 @@
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Hashings.secure_random import get_secure_random
+from generators.generate_arrays import gen_arrays
+from generators.generate_numbers import gen_numbers
+
+try:
+    import numpy as np
+except ImportError:
+    np=None
+
+HAS_NUMPY=np is not None
+
+INT64_MIN=-(1<<63)
+INT64_MAX=(1<<63)-1
+
+
+def _fits_int64(*vals)->bool:
+    return all(INT64_MIN<=v<=INT64_MAX for v in vals)
+
+
+def _np_rng(rng):
+    """
+    NumPy Generator for rng: used as is when it already is one, otherwise a PCG64
+    seeded with 128 bits drawn from rng (reproducible for seeded backends). Without rng
+    the seed comes from get_secure_random(), like every other generator's default.
+    """
+    if rng is None:
+        rng=get_secure_random()
+    if isinstance(rng,np.random.Generator):
+        return rng
+    return np.random.default_rng(rng.getrandbits(128))
+
+
+class gen_vectorized:
+    """
+    NumPy backed versions of the bulk array generators.
+    Results are ndarrays (lists with as_list=True); without NumPy, or for values that do
+    not fit in int64, every method falls back to the pure-Python generator and returns a list.
+    Accepted rng values are any backend instance or a numpy.random.Generator. The draws
+    themselves come from PCG64, which is not cryptographically secure: only its seed is.
+    """
+
+    @staticmethod
+    def random(len_: int,l: int,r: int,rng=None,unique: bool=False,sorted_: bool=False,as_list: bool=False):
+        if not HAS_NUMPY or not _fits_int64(l,r,r-l+1):
+            return gen_arrays.random(len_,l,r,rng,unique=unique,sorted_=sorted_)
+        if unique and len_>r-l+1:
+            raise ValueError("Cannot generate unique values: not enough numbers in range")
+        g=_np_rng(rng)
+        if unique:
+            v=g.choice(r-l+1,size=len_,replace=False)+l
+        else:
+            v=g.integers(l,r,size=len_,endpoint=True)
+        if sorted_:
+            v.sort()
+        return v.tolist() if as_list else v
+
+    @staticmethod
+    def matrix(rows: int,cols: int,l: int,r: int,rng=None,unique_rows: bool=False,sorted_rows: bool=False,as_list: bool=False):
+        if not HAS_NUMPY or not _fits_int64(l,r,r-l+1):
+            return gen_arrays.matrix(rows,cols,l,r,rng,unique_rows=unique_rows,sorted_rows=sorted_rows)
+        g=_np_rng(rng)
+        if unique_rows:
+            if cols>r-l+1:
+                raise ValueError("Cannot generate unique values: not enough numbers in range")
+            m=np.empty((rows,cols),dtype=np.int64)
+            for i in range(rows):
+                m[i]=g.choice(r-l+1,size=cols,replace=False)+l
+        else:
+            m=g.integers(l,r,size=(rows,cols),endpoint=True)
+        if sorted_rows:
+            m.sort(axis=1)
+        return m.tolist() if as_list else m
+
+    @staticmethod
+    def pairs(len_: int,l1: int,r1: int,l2: int,r2: int,rng=None,ordered: bool=False,as_list: bool=False):
+        if not HAS_NUMPY or not _fits_int64(l1,r1,r1-l1+1,l2,r2,r2-l2+1):
+            return gen_arrays.pairs(len_,l1,r1,l2,r2,rng,ordered=ordered)
+        g=_np_rng(rng)
+        a=g.integers(l1,r1,size=len_,endpoint=True)
+        b=g.integers(l2,r2,size=len_,endpoint=True)
+        if ordered:
+            a,b=np.minimum(a,b),np.maximum(a,b)
+        if as_list:
+            return list(zip(a.tolist(),b.tolist()))
+        return np.stack((a,b),axis=1)
+
+    @staticmethod
+    def bit_array(len_: int,prob_one: float=0.5,rng=None,as_list: bool=False):
+        if not HAS_NUMPY:
+            return gen_arrays.bit_array(len_,prob_one,rng)
+        g=_np_rng(rng)
+        v=(g.random(len_)<prob_one).astype(np.uint8)
+        return v.tolist() if as_list else v
+
+    @staticmethod
+    def strictly_increasing(len_: int,start: int,step_min: int,step_max: int,rng=None,as_list: bool=False):
+        if not HAS_NUMPY or len_<=0 or not _fits_int64(start,step_min,step_max,start+(len_-1)*max(step_max,0),start+(len_-1)*min(step_min,0)):
+            return gen_arrays.strictly_increasing(len_,start,step_min,step_max,rng)
+        g=_np_rng(rng)
+        v=np.empty(len_,dtype=np.int64)
+        v[0]=start
+        np.cumsum(g.integers(step_min,step_max,size=len_-1,endpoint=True),out=v[1:])
+        v[1:]+=start
+        return v.tolist() if as_list else v
+
+    @staticmethod
+    def random_range(l,r,count:int,rng=None,as_list: bool=False):
+        if not HAS_NUMPY:
+            return gen_numbers.random_range(l,r,count,rng)
+        if isinstance(l,float) or isinstance(r,float):
+            v=_np_rng(rng).uniform(l,r,size=count)
+        elif _fits_int64(l,r,r-l+1):
+            v=_np_rng(rng).integers(l,r,size=count,endpoint=True)
+        else:
+            return gen_numbers.random_range(l,r,count,rng)
+        return v.tolist() if as_list else v
+
+
+if __name__ == "__main__":
+    print(gen_vectorized.random(10,1,100))
+    print(gen_vectorized.matrix(3,4,0,9,sorted_rows=True))
+    print(gen_vectorized.pairs(3,1,10,1,10,ordered=True,as_list=True))
+    print(gen_vectorized.strictly_increasing(6,0,1,5))
+    print(gen_vectorized.random_range(0.0,1.0,3))
@@ -0,0 +1,155 @@
+from array import array
+from itertools import accumulate
+from typing import List, Tuple
+
+
+def index_array(n: int, values=()):
+    """Compact int array wide enough to hold node ids up to n."""
+    return array('i' if n<(1<<31)-1 else 'q', values)
+
+
+def weight_array(values):
+    """Weights as array('q'); falls back to a list for weights outside int64."""
+    values=list(values)
+    try:
+        return array('q', values)
+    except OverflowError:
+        return values
+
+
+class GraphBuffer:
+    """
+    Edge list stored column-wise: u[i], v[i] (and w[i] for weighted graphs) in compact
+    int arrays instead of one tuple per edge. n is the node count and base the smallest
+    node id (0 or 1), which is all to_csr() needs to size its offset array.
+    """
+
+    def __init__(self, n: int, base: int=1, u=(), v=(), w=None):
+        self.n=n
+        self.base=base
+        self.u=index_array(n+base, u)
+        self.v=index_array(n+base, v)
+        self.w=None if w is None else weight_array(w)
+        if len(self.u)!=len(self.v) or (self.w is not None and len(self.w)!=len(self.u)):
+            raise ValueError("Edge columns must have the same length")
+
+    def __len__(self):
+        return len(self.u)
+
+    def __iter__(self):
+        if self.w is None:
+            return zip(self.u, self.v)
+        return zip(self.u, self.v, self.w)
+
+    def __getitem__(self, i):
+        if self.w is None:
+            return (self.u[i], self.v[i])
+        return (self.u[i], self.v[i], self.w[i])
+
+    @property
+    def weighted(self)->bool:
+        return self.w is not None
+
+    def columns(self):
+        """The edge columns, (u, v) or (u, v, w)."""
+        return (self.u, self.v) if self.w is None else (self.u, self.v, self.w)
+
+    def append(self, a: int, b: int, weight=None):
+        self.u.append(a)
+        self.v.append(b)
+        if self.w is not None:
+            self.w.append(weight)
+
+    def to_list(self)->List[Tuple[int, ...]]:
+        """Edges as the list of tuples returned by the plain generators."""
+        return list(iter(self))
+
+    def set_weights(self, weights):
+        """Attach one weight per edge."""
+        if len(weights)!=len(self.u):
+            raise ValueError("Need exactly one weight per edge")
+        self.w=weight_array(weights)
+
+    # ==================== IN-PLACE TRANSFORMS ====================
+
+    def _permute(self, order):
+        self.u=index_array(self.n+self.base, map(self.u.__getitem__, order))
+        self.v=index_array(self.n+self.base, map(self.v.__getitem__, order))
+        if self.w is not None:
+            self.w=weight_array(map(self.w.__getitem__, order))
+
+    def shuffle(self, rng):
+        """Shuffle the edge order (all columns together)."""
+        order=list(range(len(self.u)))
+        rng.shuffle(order)
+        self._permute(order)
+
+    def sort(self):
+        """Sort edges by (u, v)."""
+        u,v=self.u,self.v
+        self._permute(sorted(range(len(u)), key=lambda i: (u[i], v[i])))
+
+    def relabel(self, mapping):
+        """Replace every node id x by mapping[x] (any sequence or dict indexed by old id)."""
+        self.u=index_array(self.n+self.base, map(mapping.__getitem__, self.u))
+        self.v=index_array(self.n+self.base, map(mapping.__getitem__, self.v))
+
+    def relabel_random(self, rng):
+        """Apply a uniformly random permutation of the node ids base..base+n-1."""
+        perm=list(range(self.base, self.n+self.base))
+        rng.shuffle(perm)
+        self.relabel([0]*self.base+perm)
+
+    def flip(self, rng):
+        """Swap u and v of each edge with probability 1/2 (random orientation)."""
+        u,v=self.u,self.v
+        for i,bit in enumerate(rng.random_bits(len(u))):
+            if bit:
+                u[i],v[i]=v[i],u[i]
+
+    # ==================== EXPORT ====================
+
+    def to_csr(self, directed: bool=True):
+        """
+        Compressed sparse row adjacency in O(n + m): (offsets, targets, weights).
+        Neighbours of node x are targets[offsets[x-base]:offsets[x-base+1]]; undirected
+        graphs store every edge in both directions. weights is None for unweighted graphs.
+        """
+        n,base=self.n,self.base
+        u,v,w=self.u,self.v,self.w
+        counts=[0]*(n+1)
+        for a in u:
+            counts[a-base+1]+=1
+        if not directed:
+            for b in v:
+                counts[b-base+1]+=1
+        offsets=array('q', accumulate(counts))
+        cursor=list(offsets[:-1])
+        total=offsets[-1]
+        targets=index_array(n+base, [0])*total
+        weights=None if w is None else weight_array([0]*total)
+        for i in range(len(u)):
+            a,b=u[i],v[i]
+            k=cursor[a-base]
+            cursor[a-base]=k+1
+            targets[k]=b
+            if weights is not None:
+                weights[k]=w[i]
+            if not directed:
+                k=cursor[b-base]
+                cursor[b-base]=k+1
+                targets[k]=a
+                if weights is not None:
+                    weights[k]=w[i]
+        return offsets, targets, weights
+
+    def degrees(self, directed: bool=False)->List[int]:
+        """Degree (out-degree when directed) of every node, indexed by id-base."""
+        base=self.base
+        deg=[0]*self.n
+        for a in self.u:
+            deg[a-base]+=1
+        if not directed:
+            for b in self.v:
+                deg[b-base]+=1
+        return deg
@@ -0,0 +1,16 @@
+"""
+Retry counters of the generators' rejection loops, read by the profiler (src/profiler.py).
+A loop counts its retries in a local variable and reports them once when it is done, so
+a run without profiling pays one dict update per loop that actually had to retry.
+"""
+
+# loop name -> retries since the last reset
+RETRIES={}
+
+
+def count_retries(name: str, n: int):
+    RETRIES[name]=RETRIES.get(name,0)+n
+
+
+def reset_retries():
+    RETRIES.clear()
@@ -0,0 +1,401 @@
+import math
+import sys
+from bisect import bisect_right
+from itertools import accumulate,repeat
+from math import exp,isfinite,log,sqrt
+from pathlib import Path
+from typing import Iterable,Iterator,List,Sequence,Tuple
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Hashings.secure_random import get_secure_random
+from generators.retries import count_retries
+
+# Floyd's algorithm is used while k <= n/FLOYD_RATIO, the dense shuffle once 2k >= n
+FLOYD_RATIO=16
+# Vitter's method D switches to method A once n <= VITTER_ALPHA_INV*k
+VITTER_ALPHA_INV=13
+
+
+def _isqrt(x:int)->int:
+    """floor(sqrt(x)) for non-negative integers of any size."""
+    r=int(sqrt(x))
+    while r*r>x:
+        r-=1
+    while (r+1)*(r+1)<=x:
+        r+=1
+    return r
+
+
+isqrt=getattr(math,'isqrt',_isqrt)
+
+
+def unrank_pair(idx:int):
+    """Pair (u, v) with u < v at position idx when pairs are ordered by v, then u."""
+    v=(1+isqrt(1+8*idx))//2
+    return idx-v*(v-1)//2,v
+
+
+def floyd_sample(n:int,k:int,rng)->set:
+    """Set of k distinct integers from [0, n) using Floyd's algorithm (exactly k draws)."""
+    s=set()
+    for j,t in zip(range(n-k,n),rng.randbelows(range(n-k+1,n+1))):
+        s.add(j if t in s else t)
+    return s
+
+
+def sparse_fisher_yates(n:int,k:int,rng)->List[int]:
+    """
+    First k entries of a Fisher-Yates shuffle of [0, n), in shuffle order.
+    Only displaced positions are stored, so memory is O(k) instead of O(n).
+    """
+    moved={}
+    out=[]
+    for i,j in enumerate(rng.randbelows(range(n,n-k,-1))):
+        j+=i
+        vj=moved.get(j,j)
+        moved[j]=moved.get(i,i)
+        out.append(vj)
+    return out
+
+
+def dense_fisher_yates(n:int,k:int,rng)->List[int]:
+    """First k entries of a Fisher-Yates shuffle of [0, n) on a materialized range."""
+    v=list(range(n))
+    for i,j in enumerate(rng.randbelows(range(n,n-k,-1))):
+        j+=i
+        v[i],v[j]=v[j],v[i]
+    del v[k:]
+    return v
+
+
+def sample_unique(l:int,r:int,k:int,rng=None,ordered:bool=True)->List[int]:
+    """
+    k distinct integers from [l, r], uniformly over all k-subsets.
+    Cost depends only on k: Floyd's algorithm for small k, a sparse partial Fisher-Yates
+    for medium k and a partial shuffle of the materialized range once k is at least half of it.
+    With ordered=True the result is also in uniformly random order; callers that sort or
+    shuffle the result anyway can pass ordered=False, which skips the order shuffle and,
+    for dense samples, draws only the n-k complement.
+    """
+    if rng is None:
+        rng=get_secure_random()
+    n=r-l+1
+    if k>n:
+        raise ValueError("Cannot sample more unique values than the range holds")
+    if k<=0:
+        return []
+    if 2*k>n and not ordered:
+        # dense: draw the n-k values to leave out instead
+        drop=set(sample_unique(0,n-1,n-k,rng,ordered=False))
+        v=[x for x in range(n) if x not in drop]
+    elif 2*k>=n:
+        v=dense_fisher_yates(n,k,rng)
+    elif k*FLOYD_RATIO<=n:
+        v=list(floyd_sample(n,k,rng))
+        if ordered:
+            rng.shuffle(v)
+    else:
+        v=sparse_fisher_yates(n,k,rng)
+    if l:
+        v=[x+l for x in v]
+    return v
+
+
+def iter_sorted_sample(n:int,k:int,rng=None)->Iterator[int]:
+    """
+    Stream k distinct integers from [0, n) in increasing order, uniformly over all k-subsets.
+    Vitter's sequential sampling (method D, falling back to method A when the sample is
+    dense) generates the gaps between selected values directly: O(k) expected time, O(1) memory.
+    """
+    if rng is None:
+        rng=get_secure_random()
+    if k>n:
+        raise ValueError("Cannot sample more unique values than the range holds")
+    if k<=0:
+        return
+    random=rng.random
+    current=-1
+    retries=0
+    if VITTER_ALPHA_INV*k<n:
+        ninv=1.0/k
+        vprime=exp(log(1.0-random())*ninv)
+        qu1=n-k+1
+        threshold=VITTER_ALPHA_INV*k
+        while k>1 and threshold<n:
+            nmin1inv=1.0/(k-1)
+            while True:
+                while True:
+                    x=n*(1.0-vprime)
+                    s=int(x)
+                    if s<qu1:
+                        break
+                    retries+=1
+                    vprime=exp(log(1.0-random())*ninv)
+                y1=exp(log((1.0-random())*n/qu1)*nmin1inv)
+                vprime=y1*(1.0-x/n)*(qu1/(qu1-s))
+                if vprime<=1.0:
+                    break
+                y2=1.0
+                top=n-1.0
+                if k-1>s:
+                    bottom=float(n-k)
+                    limit=n-s
+                else:
+                    bottom=n-s-1.0
+                    limit=qu1
+                for _ in range(n-1,limit-1,-1):
+                    y2=y2*top/bottom
+                    top-=1.0
+                    bottom-=1.0
+                if n/(n-x)>=y1*exp(log(y2)*nmin1inv):
+                    vprime=exp(log(1.0-random())*nmin1inv)
+                    break
+                retries+=1
+                vprime=exp(log(1.0-random())*ninv)
+            current+=s+1
+            yield current
+            n-=s+1
+            k-=1
+            ninv=nmin1inv
+            qu1-=s
+            threshold-=VITTER_ALPHA_INV
+        if retries:
+            count_retries('sampling.iter_sorted_sample',retries)
+        if k==1:
+            yield current+int(n*vprime)+1
+            return
+    # method A: walk the remaining range, skip lengths by inversion
+    top=n-k
+    nreal=float(n)
+    while k>=2:
+        v=random()
+        s=0
+        quot=top/nreal
+        while quot>v:
+            s+=1
+            top-=1
+            nreal-=1
+            quot=quot*top/nreal
+        current+=s+1
+        yield current
+        nreal-=1
+        k-=1
+    yield current+int(nreal*random())+1
+
+
+class WeightedSampler:
+    """
+    Walker's alias method (Vose's construction): index i is drawn with probability
+    weights[i]/sum(weights). Building the table is O(n), every draw after that is O(1):
+    one uniform column plus one uniform threshold, both read from a single random integer.
+    Integer weights give an exact integer table; float weights a float one.
+    values (optional) are returned instead of indices.
+    """
+
+    def __init__(self,weights:Sequence,values:Sequence=None):
+        n=len(weights)
+        if n==0:
+            raise ValueError("WeightedSampler needs at least one weight")
+        if values is not None and len(values)!=n:
+            raise ValueError("values and weights differ in length")
+        exact=all(isinstance(w,int) for w in weights)
+        if not exact:
+            weights=[float(w) for w in weights]
+            if not all(isfinite(w) for w in weights):
+                raise ValueError("weights must be finite")
+        if min(weights)<0:
+            raise ValueError("weights must be non-negative")
+        total=sum(weights)
+        if total<=0:
+            raise ValueError("weights must not all be zero")
+        # column j is kept while the threshold is below cut[j] (out of `scale`), else alias[j]
+        if exact:
+            scale=total
+            scaled=[w*n for w in weights]
+        else:
+            scale=1.0
+            scaled=[w*n/total for w in weights]
+        cut=[scale]*n
+        alias=list(range(n))
+        small=[i for i,w in enumerate(scaled) if w<scale]
+        large=[i for i,w in enumerate(scaled) if w>=scale]
+        while small and large:
+            s,l=small.pop(),large[-1]
+            cut[s]=scaled[s]
+            alias[s]=l
+            scaled[l]-=scale-scaled[s]
+            if scaled[l]<scale:
+                small.append(large.pop())
+        # leftovers are exactly full columns (up to float rounding)
+        self.n=n
+        self.exact=exact
+        self.total=total
+        self._scale=scale
+        self._cut=cut
+        self._keep=list(range(n)) if values is None else list(values)
+        self._alias=[self._keep[a] for a in alias]
+
+    def draw(self,rng=None):
+        """One weighted draw."""
+        if rng is None:
+            rng=get_secure_random()
+        if self.exact:
+            j,u=divmod(rng.randint(0,self.n*self.total-1),self.total)
+        else:
+            x=rng.random()*self.n
+            j=min(int(x),self.n-1)
+            u=x-j
+        return self._keep[j] if u<self._cut[j] else self._alias[j]
+
+    def sample(self,k:int,rng=None)->List:
+        """k independent weighted draws, read from one bulk randints()/uniforms() call."""
+        if rng is None:
+            rng=get_secure_random()
+        if k<=0:
+            return []
+        cut,keep,alias,n=self._cut,self._keep,self._alias,self.n
+        if self.exact:
+            cols=map(divmod,rng.randints(0,n*self.total-1,k),repeat(self.total))
+        else:
+            last=n-1
+            cols=((j if j<n else last,x-j) for x in rng.uniforms(0.0,float(n),k) for j in (int(x),))
+        return [keep[j] if u<cut[j] else alias[j] for j,u in cols]
+
+
+def _merge(ranges,lo,hi,adjacent):
+    """Sort, clip to [lo, hi] and merge (a, b) ranges; adjacent=1 also merges touching integer ranges."""
+    out=[]
+    for a,b in sorted(ranges):
+        a,b=max(a,lo),min(b,hi)
+        if a>b:
+            continue
+        if out and a<=out[-1][1]+adjacent:
+            if b>out[-1][1]:
+                out[-1][1]=b
+        else:
+            out.append([a,b])
+    return out
+
+
+def _runs(values):
+    """Maximal runs of consecutive integers in a sorted list of distinct values, as [a, b] pairs."""
+    out=[]
+    for x in values:
+        if out and x==out[-1][1]+1:
+            out[-1][1]=x
+        else:
+            out.append([x,x])
+    return out
+
+
+class ExclusionIndex:
+    """
+    The integers of [l, r] minus excluded values and closed ranges, indexed by rank.
+    Excluded runs are kept sorted and merged together with the number of allowed values before each,
+    so the k-th allowed value is found by binary search: O(log runs) per draw, no retries,
+    whatever fraction of the range is excluded. Build once and reuse it for many draws.
+    """
+
+    def __init__(self,l:int,r:int,exclude:Iterable[int]=(),ranges:Iterable[Tuple[int,int]]=()):
+        runs=_runs(sorted(x for x in set(exclude) if l<=x<=r))
+        # [a, b] lists like the runs, so the two sort together
+        ranges=[list(ab) for ab in ranges]
+        if ranges:
+            runs=_merge(runs+ranges,l,r,1)
+        self.l,self.r=l,r
+        self._starts=[a for a,_ in runs]
+        self._stops=[b for _,b in runs]
+        # _before[i]: allowed values below run i; _skip[i]: excluded values in the first i runs
+        self._before=[]
+        self._skip=[0]
+        for a,b in runs:
+            self._before.append(a-l-self._skip[-1])
+            self._skip.append(self._skip[-1]+b-a+1)
+        self.count=max(r-l+1,0)-self._skip[-1]
+
+    def __contains__(self,x):
+        """True if x is an allowed value."""
+        i=bisect_right(self._starts,x)-1
+        return self.l<=x<=self.r and not(i>=0 and x<=self._stops[i])
+
+    def value(self,k:int)->int:
+        """The k-th (0-based) allowed value."""
+        return self.l+k+self._skip[bisect_right(self._before,k)]
+
+    def draw(self,rng=None)->int:
+        """One uniform draw from the allowed values; ValueError if there are none."""
+        if rng is None:
+            rng=get_secure_random()
+        if self.count<=0:
+            raise ValueError("every value of the range is excluded")
+        return self.value(rng.randint(0,self.count-1))
+
+    def sample(self,k:int,rng=None)->List[int]:
+        """k independent uniform draws from the allowed values."""
+        if rng is None:
+            rng=get_secure_random()
+        if k<=0:
+            return []
+        if self.count<=0:
+            raise ValueError("every value of the range is excluded")
+        if not self._before:
+            return rng.randints(self.l,self.r,k)
+        before,bisect=self._before,bisect_right
+        offset=[self.l+x for x in self._skip]
+        # bucket q of 2^shift ranks only needs runs table[q]..table[q+1] of the binary search
+        shift=max((self.count//len(before)).bit_length()-1,0)
+        table=[bisect(before,q<<shift) for q in range((self.count-1>>shift)+2)]
+        return [x+offset[bisect(before,x,table[x>>shift],table[(x>>shift)+1])]
+                for x in rng.randints(0,self.count-1,k)]
+
+class RealExclusionIndex:
+    """
+    [l, r] minus closed intervals, for uniform real draws: the allowed gaps are stored with
+    their cumulative length and a uniform position in the total allowed length is mapped
+    into its gap by binary search. Excluded endpoints are hit with probability zero.
+    """
+
+    def __init__(self,l:float,r:float,intervals:Iterable[Tuple[float,float]]=()):
+        excluded=_merge([tuple(ab) for ab in intervals],l,r,0)
+        gaps=[]
+        pos=l
+        for a,b in excluded:
+            if a>pos:
+                gaps.append((pos,a))
+            pos=b
+        if not excluded and l<=r or pos<r:
+            gaps.append((pos,r))
+        self.l,self.r=l,r
+        self._starts=[a for a,_ in gaps]
+        self._ends=list(accumulate(b-a for a,b in gaps))
+        self.length=self._ends[-1] if gaps else 0.0
+
+    def value(self,u:float)->float:
+        """The point at allowed length u (0 <= u <= length) from l."""
+        i=min(bisect_right(self._ends,u),len(self._ends)-1)
+        return self._starts[i]+u-(self._ends[i-1] if i else 0.0)
+
+    def draw(self,rng=None)->float:
+        """One uniform draw from the allowed part; ValueError if nothing is left."""
+        if rng is None:
+            rng=get_secure_random()
+        if not self._ends:
+            raise ValueError("every value of the range is excluded")
+        return self.value(rng.uniform(0.0,self.length))
+
+    def sample(self,k:int,rng=None)->List[float]:
+        """k independent uniform draws from the allowed part."""
+        if rng is None:
+            rng=get_secure_random()
+        if k<=0:
+            return []
+        if not self._ends:
+            raise ValueError("every value of the range is excluded")
+        return list(map(self.value,rng.uniforms(0.0,self.length,k)))
+
+
+if __name__ == "__main__":
+    print(sample_unique(1,10,10))
+    print(sample_unique(1,10**12,5))
+    print(sorted(sample_unique(1,100,30,ordered=False)))
+    print(list(iter_sorted_sample(10**12,5)))
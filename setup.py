@@ -26,6 +26,9 @@ setup(
         "Topic :: Software Development :: Testing",
     ],
     python_requires=">=3.7",
+    extras_require={
+        "numpy": ["numpy>=1.17"],
+    },
     keywords="competitive programming test data generation random stress-testing",
     project_urls={
         "Bug Reports": "https://github.com/sharpsalt/cpstress/issues",
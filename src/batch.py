@@ -0,0 +1,71 @@
+"""
+Batch generation of many test files on a process pool.
+Case i is always generated from derive_seed(master_seed, i) and written by whichever
+worker draws it, so the produced files depend only on the master seed, never on the
+number of workers or on how the cases were split between them.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Hashings.backends import derive_seed, get_random
+from src.utils.writer import TokenWriter
+
+DEFAULT_NAME='{index:04d}.txt'
+# cases per task = count/(jobs*TASKS_PER_WORKER): small enough to balance uneven case sizes
+TASKS_PER_WORKER=4
+
+
+def case_path(out_dir, name, index):
+    """File for case index; name is a str.format pattern with an {index} field."""
+    return os.path.join(out_dir, name.format(index=index))
+
+
+def write_case(case_fn, seed, path, backend='fast'):
+    """
+    Generate one case with case_fn(rng) and write it to path.
+    case_fn returns str/bytes, (chunks, separator) like the CLI generators, or a
+    function that writes the file itself given the path (binary cases).
+    """
+    result=case_fn(get_random(backend, seed))
+    if callable(result):
+        result(path)
+        return path
+    with TokenWriter.open(path) as writer:
+        if isinstance(result, (str, bytes, bytearray)):
+            writer.write(result)
+        else:
+            writer.write_parts(*result)
+    return path
+
+
+def _write_range(case_fn, master_seed, start, stop, out_dir, name, backend):
+    return [write_case(case_fn, derive_seed(master_seed, i), case_path(out_dir, name, i), backend)
+            for i in range(start, stop)]
+
+
+def write_batch(case_fn, count, out_dir, seed=None, jobs=None, name=DEFAULT_NAME, backend='fast'):
+    """
+    Write count cases to out_dir and return their paths in case order.
+    case_fn must be picklable (a module level function or functools.partial of one).
+    Without a seed a random master seed is drawn; pass the same seed to get the same files.
+    jobs=1 generates in the calling process.
+    """
+    if seed is None:
+        seed=get_random().getrandbits(63)
+    os.makedirs(out_dir, exist_ok=True)
+    jobs=max(1, min(jobs or os.cpu_count() or 1, count))
+    if jobs==1 or count<=1:
+        return _write_range(case_fn, seed, 0, count, out_dir, name, backend)
+    from concurrent.futures import ProcessPoolExecutor
+    step=max(1, -(-count//(jobs*TASKS_PER_WORKER)))
+    paths=[]
+    with ProcessPoolExecutor(jobs) as pool:
+        futures=[pool.submit(_write_range, case_fn, seed, start, min(start+step, count), out_dir, name, backend)
+                 for start in range(0, count, step)]
+        for fut in futures:
+            paths.extend(fut.result())
+    return paths
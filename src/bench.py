@@ -0,0 +1,336 @@
+"""
+Throughput benchmarks for every generator and output formatter.
+Each benchmark is timed at a list of size tiers and reports elements/sec, the random
+bytes it consumed and the peak RSS of the process that ran it (every benchmark runs in
+a forked child where available, so peaks do not leak from one benchmark to the next).
+Results can be saved as JSON and compared against a saved baseline.
+"""
+
+import json
+import math
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Hashings.backends import get_random
+from Hashings.counting_random import CountingRandom
+from generators.generate_arrays import gen_arrays
+from generators.generate_graphs import gen_graphs
+from generators.generate_numbers import gen_numbers
+from generators.generate_strings import gen_strings, CaseType
+from generators.sampling import isqrt
+from src.utils.writer import format_rows, format_tokens
+
+try:
+    import resource
+except ImportError:
+    resource=None
+
+DEFAULT_SIZES=(10**3, 10**4, 10**5)
+DEFAULT_THRESHOLD=0.3
+MIN_TIME=0.1
+MAX_REPEATS=1000
+BIG=10**9
+
+
+def _scalar(fn):
+    """Benchmark calling a scalar generator once per element."""
+    return lambda n, rng: ((lambda: [fn(rng) for _ in range(n)]), n)
+
+
+def _bulk(fn, elements=None):
+    """Benchmark one bulk call producing elements(n) elements (n by default)."""
+    return lambda n, rng: ((lambda: fn(n, rng)), elements(n) if elements else n)
+
+
+def _consume(it):
+    return sum(map(len, it))
+
+
+def _format(fn):
+    """The StressTestGenerator.format_* functions are thin wrappers around these."""
+    return lambda data, rng: fn(data)
+
+
+def _side(n):
+    return max(1, isqrt(n))
+
+
+def _degrees(n):
+    """Graphic degree sequence 1..7 repeated, with about n edges."""
+    degrees=[i%7+1 for i in range(max(8, n//2))]
+    degrees[0]+=sum(degrees)%2
+    return degrees
+
+
+def _complete_nodes(n):
+    """Node count whose complete graph has about n edges."""
+    return max(2, (1+isqrt(1+8*n))//2)
+
+
+def _with_input(make, fn, elements=None):
+    """Benchmark fn(data, rng) on data=make(n, rng), built before the timer starts."""
+    def setup(n, rng):
+        data=make(n, rng)
+        return (lambda: fn(data, rng)), elements(n) if elements else n
+    return setup
+
+
+# name -> (setup(size, rng) -> (run, elements), largest size it is run at)
+BENCHMARKS={
+    # arrays
+    'gen_arrays.random': (_bulk(lambda n, rng: gen_arrays.random(n, 1, BIG, rng)), None),
+    'gen_arrays.random[unique]': (_bulk(lambda n, rng: gen_arrays.random(n, 1, 2*n, rng, unique=True)), None),
+    'gen_arrays.random[sorted]': (_bulk(lambda n, rng: gen_arrays.random(n, 1, BIG, rng, sorted_=True)), None),
+    'gen_arrays.iter_random': (_bulk(lambda n, rng: _consume(gen_arrays.iter_random(n, 1, BIG, rng))), None),
+    'gen_arrays.permutation': (_bulk(lambda n, rng: gen_arrays.permutation(n, rng)), None),
+    'gen_arrays.matrix': (_bulk(lambda n, rng: gen_arrays.matrix(_side(n), _side(n), 1, BIG, rng), lambda n: _side(n)**2), None),
+    'gen_arrays.pairs': (_bulk(lambda n, rng: gen_arrays.pairs(n, 1, BIG, 1, BIG, rng, ordered=True)), None),
+    'gen_arrays.subset': (_bulk(lambda n, rng: gen_arrays.subset(1, 2*n, n, rng)), None),
+    'gen_arrays.partition': (_bulk(lambda n, rng: gen_arrays.partition(5*n, n, 1, 10, rng)), None),
+    'gen_arrays.partition[uniform]': (_bulk(lambda n, rng: gen_arrays.partition(5*n, n, 1, 10, rng, uniform=True)), None),
+    'gen_arrays.partition[unbounded]': (_bulk(lambda n, rng: gen_arrays.partition(5*n, n, 1, BIG, rng, uniform=True)), None),
+    'gen_arrays.arithmetic_progression': (_bulk(lambda n, rng: gen_arrays.arithmetic_progression(n, 1, 3)), None),
+    'gen_arrays.geometric_progression': (_bulk(lambda n, rng: gen_arrays.geometric_progression(n, 1, 2)), 10**4),
+    'gen_arrays.constant_array': (_bulk(lambda n, rng: gen_arrays.constant_array(n, 7)), None),
+    'gen_arrays.bit_array': (_bulk(lambda n, rng: gen_arrays.bit_array(n, 0.5, rng)), None),
+    'gen_arrays.bit_array[p=0.3]': (_bulk(lambda n, rng: gen_arrays.bit_array(n, 0.3, rng)), None),
+    'gen_arrays.weighted': (_bulk(lambda n, rng: gen_arrays.weighted(n, _VALUES, _WEIGHTS, rng)), None),
+    'gen_arrays.shuffled': (_with_input(lambda n, rng: list(range(n)), gen_arrays.shuffled), None),
+    'gen_arrays.strictly_increasing': (_bulk(lambda n, rng: gen_arrays.strictly_increasing(n, 0, 1, 10, rng)), None),
+    'gen_arrays.strictly_decreasing': (_bulk(lambda n, rng: gen_arrays.strictly_decreasing(n, 0, 1, 10, rng)), None),
+    'gen_arrays.random_with_sum': (_bulk(lambda n, rng: gen_arrays.random_with_sum(n, 5*n, 1, 10, rng)), None),
+    'gen_arrays.random_with_sum[uniform]': (_bulk(lambda n, rng: gen_arrays.random_with_sum(n, 5*n, 1, 10, rng, uniform=True)), None),
+    # numbers
+    'gen_numbers.random_int': (_scalar(lambda rng: gen_numbers.random_int(1, BIG, rng)), 10**6),
+    'gen_numbers.random_real': (_scalar(lambda rng: gen_numbers.random_real(0.0, 1.0, rng)), 10**6),
+    'gen_numbers.random_range': (_bulk(lambda n, rng: gen_numbers.random_range(1, BIG, n, rng)), None),
+    'gen_numbers.random_range[float]': (_bulk(lambda n, rng: gen_numbers.random_range(0.0, 1.0, n, rng)), None),
+    'gen_numbers.random_exclude': (_scalar(lambda rng: gen_numbers.random_exclude(1, 100, _EXCLUDE, rng)), 10**6),
+    'gen_numbers.random_range_exclude': (_bulk(lambda n, rng: gen_numbers.random_range_exclude(1, 100, n, _EXCLUDE, rng)), None),
+    'gen_numbers.random_range_exclude[dense]': (_bulk(lambda n, rng: gen_numbers.random_range_exclude(1, 2*n, n, range(1, 2*n, 2), rng)), 10**6),
+    'gen_numbers.random_weighted': (_scalar(lambda rng: gen_numbers.random_weighted(_VALUES, _WEIGHTS, rng)), 10**6),
+    'gen_numbers.random_weighted_range': (_bulk(lambda n, rng: gen_numbers.random_weighted_range(_VALUES, _WEIGHTS, n, rng)), None),
+    'gen_numbers.random_real_exclude': (_scalar(lambda rng: gen_numbers.random_real_exclude(0.0, 1.0, 0.25, 0.5, rng)), 10**6),
+    'gen_numbers.random_reals_exclude': (_bulk(lambda n, rng: gen_numbers.random_reals_exclude(0.0, 1.0, n, _INTERVALS, rng)), None),
+    # strings (elements are characters)
+    'gen_strings.random_char': (_scalar(lambda rng: gen_strings.random_char(CaseType.Lower, rng)), 10**6),
+    'gen_strings.random': (_bulk(lambda n, rng: gen_strings.random(n, CaseType.Lower, rng)), 10**6),
+    'gen_strings.palindrome': (_bulk(lambda n, rng: gen_strings.palindrome(n, CaseType.Lower, rng)), 10**6),
+    'gen_strings.random_alphanum': (_bulk(lambda n, rng: gen_strings.random_alphanum(n, True, True, CaseType.Mixed, rng)), 10**6),
+    'gen_strings.random_custom': (_bulk(lambda n, rng: gen_strings.random_custom(n, 'abc', rng)), 10**6),
+    'gen_strings.random_strings': (_bulk(lambda n, rng: gen_strings.random_strings(max(1, n//10), 10, CaseType.Lower, rng)), 10**6),
+    'gen_strings.palindromes': (_bulk(lambda n, rng: gen_strings.palindromes(max(1, n//10), 10, CaseType.Lower, rng)), 10**6),
+    'gen_strings.poly_hash': (_with_input(lambda n, rng: gen_strings.random(n, CaseType.Lower, rng), lambda s, rng: gen_strings.poly_hash(s, 131, _MOD)), 10**6),
+    'gen_strings.thue_morse': (_bulk(lambda n, rng: gen_strings.thue_morse(n)), None),
+    'gen_strings.hash_collision': (_bulk(lambda n, rng: gen_strings.hash_collision(_HASH_PAIRS, max(n, 64), rng)), None),
+    'gen_strings.fibonacci': (_bulk(lambda n, rng: gen_strings.fibonacci(n)), None),
+    'gen_strings.periodic': (_bulk(lambda n, rng: gen_strings.periodic(n, 7, CaseType.Lower, rng)), None),
+    'gen_strings.runs': (_bulk(lambda n, rng: gen_strings.runs(n, 3, CaseType.Lower, rng)), None),
+    'gen_strings.many_borders': (_bulk(lambda n, rng: gen_strings.many_borders(n, 1, CaseType.Lower, rng=rng)), None),
+    'gen_strings.zimin': (_bulk(lambda n, rng: gen_strings.zimin(n)), None),
+    # graphs (elements are edges)
+    'gen_graphs.tree': (_bulk(lambda n, rng: gen_graphs.tree(n+1, rng=rng)), None),
+    'gen_graphs.tree[buffer]': (_bulk(lambda n, rng: gen_graphs.tree(n+1, rng=rng, as_buffer=True)), None),
+    'gen_graphs.iter_tree': (_bulk(lambda n, rng: _consume(gen_graphs.iter_tree(n+1, rng=rng))), None),
+    'gen_graphs.simple_graph': (_bulk(lambda n, rng: gen_graphs.simple_graph(max(2, n//4), n, rng=rng, as_buffer=True)), None),
+    'gen_graphs.iter_simple_graph': (_bulk(lambda n, rng: _consume(gen_graphs.iter_simple_graph(max(2, n//4), n, rng=rng))), None),
+    'gen_graphs.weighted_graph': (_bulk(lambda n, rng: gen_graphs.weighted_graph(max(2, n//4), n, 1, BIG, rng=rng, as_buffer=True)), None),
+    'gen_graphs.weighted_graph_dist': (_bulk(lambda n, rng: gen_graphs.weighted_graph_dist(max(2, n//4), n, _VALUES, _WEIGHTS, rng=rng, as_buffer=True)), None),
+    'gen_graphs.directed_graph': (_bulk(lambda n, rng: gen_graphs.directed_graph(max(2, n//4), n, rng=rng, as_buffer=True)), None),
+    'gen_graphs.dag': (_bulk(lambda n, rng: gen_graphs.dag(max(2, n//4), n, rng=rng, as_buffer=True)), None),
+    'gen_graphs.bipartite': (_bulk(lambda n, rng: gen_graphs.bipartite(max(1, n//4), max(1, n//4), n, rng=rng, as_buffer=True)), None),
+    'gen_graphs.star': (_bulk(lambda n, rng: gen_graphs.star(n+1, 1, rng=rng, as_buffer=True)), None),
+    'gen_graphs.cycle': (_bulk(lambda n, rng: gen_graphs.cycle(n, rng=rng, as_buffer=True)), None),
+    'gen_graphs.complete': (_bulk(lambda n, rng: gen_graphs.complete(_complete_nodes(n), as_buffer=True),
+                                  lambda n: _complete_nodes(n)*(_complete_nodes(n)-1)//2), None),
+    'gen_graphs.regular': (_bulk(lambda n, rng: gen_graphs.regular(n//2, 4, rng=rng, as_buffer=True), lambda n: n//2*2), 10**6),
+    'gen_graphs.regular[mixed]': (_bulk(lambda n, rng: gen_graphs.regular(n//2, 4, rng=rng, as_buffer=True, rounds=1), lambda n: n//2*2), 10**6),
+    'gen_graphs.degree_sequence': (_bulk(lambda n, rng: gen_graphs.degree_sequence(_degrees(n), rng=rng, as_buffer=True),
+                                         lambda n: sum(_degrees(n))//2), 10**6),
+    'gen_graphs.tree_with_diameter': (_bulk(lambda n, rng: gen_graphs.tree_with_diameter(n+1, n//2, rng=rng, as_buffer=True)), None),
+    'gen_graphs.chain_tree': (_bulk(lambda n, rng: gen_graphs.chain_tree(n+1, as_buffer=True)), None),
+    'gen_graphs.uniform_tree': (_bulk(lambda n, rng: gen_graphs.uniform_tree(n+1, rng=rng, as_buffer=True)), None),
+    'gen_graphs.caterpillar': (_bulk(lambda n, rng: gen_graphs.caterpillar(n+1, rng=rng, as_buffer=True)), None),
+    'gen_graphs.broom': (_bulk(lambda n, rng: gen_graphs.broom(n+1, rng=rng, as_buffer=True)), None),
+    'gen_graphs.k_ary_tree': (_bulk(lambda n, rng: gen_graphs.k_ary_tree(n+1, 3, rng=rng, as_buffer=True)), None),
+    'gen_graphs.spider': (_bulk(lambda n, rng: gen_graphs.spider(n+1, 10, rng=rng, as_buffer=True)), None),
+    'gen_graphs.sqrt_killer': (_bulk(lambda n, rng: gen_graphs.sqrt_killer(n+1, rng=rng, as_buffer=True)), None),
+    'gen_graphs.windowed_tree': (_bulk(lambda n, rng: gen_graphs.windowed_tree(n+1, 16, rng=rng, as_buffer=True)), None),
+    # output formatting (elements are tokens or rows)
+    'format_array': (_with_input(lambda n, rng: gen_arrays.random(n, 1, BIG, rng), _format(format_tokens)), None),
+    'format_matrix': (_with_input(lambda n, rng: gen_arrays.matrix(_side(n), _side(n), 1, BIG, rng), _format(format_rows),
+                                  lambda n: _side(n)**2), None),
+    'format_edges': (_with_input(lambda n, rng: gen_graphs.tree(n+1, rng=rng), _format(format_rows)), None),
+    'format_edges[buffer]': (_with_input(lambda n, rng: gen_graphs.tree(n+1, rng=rng, as_buffer=True), _format(format_rows)), None),
+}
+
+_EXCLUDE=frozenset(range(1, 11))
+_MOD=10**9+7
+_INTERVALS=((0.1, 0.2), (0.5, 0.75))
+_HASH_PAIRS=((31, _MOD),)
+_VALUES=list(range(10))
+_WEIGHTS=[i+1 for i in range(10)]
+
+# classes whose public methods must all be covered by a benchmark
+COVERED=(('gen_arrays', gen_arrays), ('gen_numbers', gen_numbers), ('gen_strings', gen_strings), ('gen_graphs', gen_graphs))
+
+
+def uncovered():
+    """Public generator methods without a benchmark (listed as a warning by run_benchmarks)."""
+    names={name.split('[')[0] for name in BENCHMARKS}
+    return [f"{cls_name}.{attr}" for cls_name,cls in COVERED for attr in vars(cls)
+            if not attr.startswith('_') and callable(getattr(cls, attr)) and f"{cls_name}.{attr}" not in names]
+
+
+def select(patterns=None):
+    """Benchmark names containing any of patterns (all of them when patterns is empty)."""
+    return [name for name in BENCHMARKS if not patterns or any(p in name for p in patterns)]
+
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes, or None where unavailable."""
+    if resource is None:
+        return None
+    peak=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform=='darwin' else peak*1024
+
+
+def measure(name, size, seed=0, min_time=MIN_TIME):
+    """Time one benchmark at one size in this process."""
+    setup,_=BENCHMARKS[name]
+    rng=CountingRandom(get_random('fast', seed))
+    run,elements=setup(size, rng)
+    rng.reset_counts()
+    best=math.inf
+    spent=0.0
+    rng_bytes=None
+    for _ in range(MAX_REPEATS):
+        start=time.perf_counter()
+        run()
+        elapsed=time.perf_counter()-start
+        if rng_bytes is None:
+            rng_bytes=rng.bytes_drawn
+        best=min(best, elapsed)
+        spent+=elapsed
+        if spent>=min_time:
+            break
+    return {
+        'name': name,
+        'size': size,
+        'elements': elements,
+        'seconds': best,
+        'elements_per_sec': elements/best if best>0 else None,
+        'rng_bytes': rng_bytes,
+        'peak_rss': _peak_rss(),
+    }
+
+
+def _measure_child(conn, args):
+    try:
+        conn.send(('ok', measure(*args)))
+    except BaseException as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def measure_isolated(name, size, seed=0, min_time=MIN_TIME):
+    """measure() in a forked child, so peak_rss belongs to this benchmark alone."""
+    import multiprocessing
+    try:
+        ctx=multiprocessing.get_context('fork')
+    except ValueError:
+        return measure(name, size, seed, min_time)
+    parent,child=ctx.Pipe(duplex=False)
+    proc=ctx.Process(target=_measure_child, args=(child, (name, size, seed, min_time)))
+    proc.start()
+    child.close()
+    try:
+        status,result=parent.recv()
+    except EOFError:
+        proc.join()
+        status,result='error', f"benchmark process exited with code {proc.exitcode}"
+    proc.join()
+    if status!='ok':
+        raise RuntimeError(f"{name} at {size}: {result}")
+    return result
+
+
+def run_benchmarks(names=None, sizes=DEFAULT_SIZES, seed=0, min_time=MIN_TIME, isolate=True, progress=None):
+    """
+    Run the named benchmarks (all by default) at every size tier they support.
+    progress(result) is called after each measurement. Returns the JSON-ready report.
+    """
+    names=names if names is not None else list(BENCHMARKS)
+    run=measure_isolated if isolate and hasattr(os, 'fork') else measure
+    results=[]
+    for name in names:
+        limit=BENCHMARKS[name][1]
+        for size in sizes:
+            if limit is not None and size>limit:
+                continue
+            res=run(name, size, seed, min_time)
+            results.append(res)
+            if progress is not None:
+                progress(res)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'sizes': list(sizes),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def save_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=1)
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Match results by (name, size) and return (name, size, ratio, regressed) tuples, where
+    ratio is new/baseline elements per second and regressed means ratio < 1 - threshold.
+    """
+    base={(r['name'], r['size']): r for r in baseline['results']}
+    out=[]
+    for r in report['results']:
+        old=base.get((r['name'], r['size']))
+        if old is None or not old.get('elements_per_sec') or not r.get('elements_per_sec'):
+            continue
+        ratio=r['elements_per_sec']/old['elements_per_sec']
+        out.append((r['name'], r['size'], ratio, ratio<1-threshold))
+    return out
+
+
+def _si(x):
+    if x is None:
+        return '-'
+    for unit,scale in (('G', 1e9), ('M', 1e6), ('k', 1e3)):
+        if x>=scale:
+            return f"{x/scale:.2f}{unit}"
+    return f"{x:.0f}"
+
+
+def format_result(r):
+    """One table row for a measurement."""
+    rss=f"{r['peak_rss']/2**20:.1f}MB" if r['peak_rss'] is not None else '-'
+    return (f"{r['name']:<36} {r['size']:>9} {r['seconds']*1e3:>10.2f}ms {_si(r['elements_per_sec']):>8}/s "
+            f"{_si(r['rng_bytes']):>8}B {rss:>9}")
+
+
+HEADER=f"{'benchmark':<36} {'size':>9} {'time':>12} {'elements':>10} {'rng':>9} {'peak RSS':>9}"
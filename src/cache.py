@@ -0,0 +1,216 @@
+"""
+Content-addressed on-disk cache of generated test cases.
+A seeded case is fully determined by the generator, its arguments, the random backend,
+the seed and the generator code, so its bytes are stored under a hash of exactly that.
+The cache directory is capped in size; the least recently used entries (by mtime, which
+every hit refreshes) are evicted first. Hits are copied to the output by the kernel
+(copy_file_range, else sendfile) without passing through Python buffers.
+"""
+
+import errno
+import hashlib
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.writer import TokenWriter
+
+ENV_DIR='CPSTRESS_CACHE_DIR'
+DEFAULT_MAX_BYTES=2<<30
+COPY_BLOCK=1<<20
+ROOT=Path(__file__).resolve().parent.parent
+# everything that can change the bytes of a generated case
+CODE_PATHS=('generators', 'Hashings', 'src', 'stress_testing.py')
+_SUFFIX='.case'
+# errors meaning "this kernel copy does not work for these descriptors", not "the copy failed"
+_UNSUPPORTED=frozenset(getattr(errno, name) for name in ('EINVAL', 'ENOSYS', 'EXDEV', 'EBADF', 'EOPNOTSUPP', 'ENOTSUP', 'ETXTBSY')
+                       if hasattr(errno, name))
+
+
+def default_cache_dir():
+    """$CPSTRESS_CACHE_DIR, else cpstress under $XDG_CACHE_HOME or ~/.cache."""
+    path=os.environ.get(ENV_DIR)
+    if path:
+        return path
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'cpstress')
+
+
+def parse_size(text):
+    """Byte count from '500M', '2G', '1.5g' or a plain number."""
+    text=str(text).strip().upper().rstrip('B')
+    scale=1
+    if text and text[-1] in 'KMGT':
+        scale=1<<(10*('KMGT'.index(text[-1])+1))
+        text=text[:-1]
+    return int(float(text)*scale)
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    Digest of the library sources: any change to a generator, backend or the CLI gives new
+    keys, so stale cases are never served (a release number alone misses local edits).
+    """
+    h=hashlib.blake2b(digest_size=16)
+    for name in CODE_PATHS:
+        path=ROOT/name
+        for file in sorted(path.rglob('*.py')) if path.is_dir() else [path]:
+            h.update(str(file.relative_to(ROOT)).encode())
+            h.update(file.read_bytes())
+    return h.hexdigest()
+
+
+def case_key(generator, args, backend, seed, *extra):
+    """Hex key of one case: generator name, its arguments (a dict), backend, seed and the code version."""
+    data=repr((generator, sorted(args.items()), backend, seed, extra, code_version())).encode()
+    return hashlib.blake2b(data, digest_size=20, person=b'cpstress-case').hexdigest()
+
+
+def copy_fd(src, dst, size):
+    """
+    Write the first size bytes of the regular file src to dst at its current position.
+    copy_file_range keeps file to file copies in the kernel (or shares extents on CoW file
+    systems); sendfile covers pipes, sockets and terminals; a read/write loop is the fallback.
+    """
+    offset=0
+    copy_range=getattr(os, 'copy_file_range', None)
+    if copy_range is not None:
+        try:
+            while offset<size:
+                n=copy_range(src, dst, size-offset, offset)
+                if not n:
+                    break
+                offset+=n
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+    if offset<size and hasattr(os, 'sendfile'):
+        try:
+            while offset<size:
+                n=os.sendfile(dst, src, offset, size-offset)
+                if not n:
+                    break
+                offset+=n
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+    if offset<size:
+        os.lseek(src, offset, os.SEEK_SET)
+        while offset<size:
+            data=os.read(src, min(COPY_BLOCK, size-offset))
+            if not data:
+                raise OSError(f'cached case shrank while being copied ({offset} of {size} bytes)')
+            view=memoryview(data)
+            while view:
+                view=view[os.write(dst, view):]
+            offset+=len(data)
+
+
+class CaseCache:
+    """
+    Directory of cases named by key (two-level fan-out), at most max_bytes in total.
+    Entries are written to a temporary file and renamed into place, so concurrent runs
+    (batch workers, parallel CI jobs) never see a partial case. Whoever can write to the
+    directory controls what is served from it.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory=Path(directory or default_cache_dir())
+        self.max_bytes=max_bytes
+
+    def path(self, key):
+        return self.directory/key[:2]/(key+_SUFFIX)
+
+    def open(self, key):
+        """Read-only descriptor on the cached case (and mark it as just used), None on a miss."""
+        path=self.path(key)
+        try:
+            fd=os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted meanwhile, the open descriptor still reads it
+        return fd
+
+    @contextmanager
+    def store(self, key):
+        """TokenWriter for a new entry; it becomes visible when the block exits without error."""
+        path=self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd,tmp=tempfile.mkstemp(prefix='.tmp-', dir=path.parent)
+        try:
+            with TokenWriter(fd, closefd=True) as writer:
+                yield writer
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def entries(self):
+        """(mtime, size, path) of every cached case."""
+        out=[]
+        if not self.directory.is_dir():
+            return out
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(_SUFFIX):
+                    try:
+                        st=entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    out.append((st.st_mtime, st.st_size, entry.path))
+        return out
+
+    def size(self):
+        return sum(size for _,size,_ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used cases until the total is at most max_bytes; returns bytes freed."""
+        limit=self.max_bytes if max_bytes is None else max_bytes
+        entries=self.entries()
+        total=sum(size for _,size,_ in entries)
+        freed=0
+        for _,size,path in sorted(entries):
+            if total-freed<=limit:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            freed+=size
+        return freed
+
+    def clear(self):
+        return self.evict(0)
+
+    def fetch(self, key, generate, dst):
+        """
+        Copy the case for key to descriptor dst, running generate(writer) to create it on a
+        miss. Returns True on a hit.
+        """
+        fd=self.open(key)
+        hit=fd is not None
+        if not hit:
+            with self.store(key) as writer:
+                generate(writer)
+            fd=self.open(key)
+            if fd is None:
+                raise OSError(f'cache entry {key} vanished right after it was written')
+            self.evict()
+        try:
+            copy_fd(fd, dst, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+        return hit
@@ -0,0 +1,196 @@
+"""
+Instrumentation of one generation run (stress_testing.py --profile).
+Everything here is opt-in: the profiler swaps in timed wrappers for the generator methods,
+the formatters and the writer for the duration of a session and restores the originals
+afterwards, so runs without --profile execute exactly the uninstrumented code.
+
+Reported:
+- phases: wall time of the run split into generate (with the entropy share measured
+  by TimedRandom), format (format_* calls) and write (TokenWriter flushes, cache copies)
+- generators: calls, inclusive time and the RNG requests/bytes each public generator
+  method consumed, lazily produced chunks included
+- retries: counts of the generators' rejection loops (generators/retries.py)
+"""
+
+import json
+import sys
+import types
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from generators.retries import RETRIES
+from Hashings.counting_random import TimedRandom
+
+FORMAT_FUNCTIONS=('format_tokens', 'format_rows', 'format_columns')
+
+
+class Profiler:
+    """Collects phase times, per-generator RNG usage and retry counts of one session."""
+
+    def __init__(self, cprofile=False):
+        self.phases={'format': 0.0, 'write': 0.0}
+        self.total=0.0
+        self.generators={}
+        self.retries={}
+        self.rng=None
+        self._cprofile=None
+        if cprofile:
+            import cProfile
+            self._cprofile=cProfile.Profile()
+        self._undo=[]
+
+    # ==================== PATCHING ====================
+
+    def _patch(self, owner, name, value):
+        """Set owner.name (owner[name] for namespace dicts), remembering the original."""
+        if isinstance(owner, dict):
+            self._undo.append((owner.__setitem__, name, owner[name]))
+            owner[name]=value
+        else:
+            self._undo.append((partial(setattr, owner), name, owner.__dict__[name]))
+            setattr(owner, name, value)
+
+    def _restore(self):
+        while self._undo:
+            setter,name,value=self._undo.pop()
+            setter(name, value)
+
+    def _timed(self, phase, fn):
+        phases=self.phases
+
+        def timed(*args, **kwargs):
+            start=perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                phases[phase]+=perf_counter()-start
+        return timed
+
+    def _tracked(self, name, fn):
+        """fn counted under name; generators returned by fn are tracked chunk by chunk."""
+        stats=self.generators.setdefault(name, [0, 0.0, 0, 0])
+        profiler=self
+
+        def tracked(*args, **kwargs):
+            stats[0]+=1
+            with profiler._measure(stats):
+                result=fn(*args, **kwargs)
+            if isinstance(result, types.GeneratorType):
+                return profiler._tracked_iter(stats, result)
+            return result
+        return tracked
+
+    def _tracked_iter(self, stats, it):
+        while True:
+            with self._measure(stats):
+                try:
+                    item=next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    @contextmanager
+    def _measure(self, stats):
+        rng=self.rng
+        calls,drawn,start=rng.calls, rng.bytes_drawn, perf_counter()
+        try:
+            yield
+        finally:
+            stats[1]+=perf_counter()-start
+            stats[2]+=rng.calls-calls
+            stats[3]+=rng.bytes_drawn-drawn
+
+    # ==================== SESSION ====================
+
+    @contextmanager
+    def session(self, rng, classes=(), namespaces=(), writers=(), copiers=()):
+        """
+        Instrument a run and yield the rng to use for it (rng wrapped in a TimedRandom).
+        classes: generator classes (name, cls) whose public static methods are tracked;
+        namespaces: module dicts whose format_* names are timed as the format phase;
+        writers: classes whose _writev is timed as the write phase;
+        copiers: (module, name) functions also timed as the write phase.
+        """
+        self.rng=TimedRandom(rng)
+        for cls_name,cls in classes:
+            for attr,value in list(vars(cls).items()):
+                if isinstance(value, staticmethod) and not attr.startswith('_'):
+                    self._patch(cls, attr, staticmethod(self._tracked(f'{cls_name}.{attr}', value.__func__)))
+        for namespace in namespaces:
+            for name in FORMAT_FUNCTIONS:
+                if name in namespace:
+                    self._patch(namespace, name, self._timed('format', namespace[name]))
+        for cls in writers:
+            self._patch(cls, '_writev', self._timed('write', cls.__dict__['_writev']))
+        for module,name in copiers:
+            self._patch(module, name, self._timed('write', module.__dict__[name]))
+        retries_before=dict(RETRIES)
+        start=perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        try:
+            yield self.rng
+        finally:
+            if self._cprofile is not None:
+                self._cprofile.disable()
+            self.total=perf_counter()-start
+            self._restore()
+            self.retries={name: count-retries_before.get(name, 0) for name,count in RETRIES.items()
+                          if count!=retries_before.get(name, 0)}
+            # methods that were patched but never called are left out of the report
+            self.generators={name: stats for name,stats in self.generators.items() if stats[0]}
+
+    # ==================== REPORTS ====================
+
+    def summary(self):
+        """Report as a JSON-ready dict."""
+        fmt,write=self.phases['format'], self.phases['write']
+        return {
+            'total_seconds': self.total,
+            'phases': {
+                'generate': max(self.total-fmt-write, 0.0),
+                'entropy': self.rng.seconds if self.rng else 0.0,
+                'format': fmt,
+                'write': write,
+            },
+            'rng': {'calls': self.rng.calls if self.rng else 0, 'bytes': self.rng.bytes_drawn if self.rng else 0},
+            'generators': {name: {'calls': c, 'seconds': t, 'rng_calls': rc, 'rng_bytes': rb}
+                           for name,(c,t,rc,rb) in sorted(self.generators.items())},
+            'retries': dict(sorted(self.retries.items())),
+        }
+
+    def table(self):
+        """Human readable summary (for stderr)."""
+        report=self.summary()
+        total=report['total_seconds'] or 1e-12
+        lines=[f"{'phase':<34}{'seconds':>10}{'share':>8}"]
+        for name,seconds in report['phases'].items():
+            label='  entropy (in generate)' if name=='entropy' else name
+            lines.append(f"{label:<34}{seconds:>10.4f}{100*seconds/total:>7.1f}%")
+        lines.append(f"{'total':<34}{report['total_seconds']:>10.4f}")
+        lines.append(f"rng: {report['rng']['calls']} calls, {report['rng']['bytes']} bytes")
+        if report['generators']:
+            lines.append('')
+            lines.append(f"{'generator (inclusive)':<34}{'calls':>8}{'seconds':>10}{'rng calls':>11}{'rng bytes':>13}")
+            for name,g in report['generators'].items():
+                lines.append(f"{name:<34}{g['calls']:>8}{g['seconds']:>10.4f}{g['rng_calls']:>11}{g['rng_bytes']:>13}")
+        if report['retries']:
+            lines.append('')
+            lines.append(f"{'retry loop':<34}{'retries':>10}")
+            for name,count in report['retries'].items():
+                lines.append(f"{name:<34}{count:>10}")
+        return '\n'.join(lines)
+
+    def save_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def dump_stats(self, path):
+        """Write the cProfile data (pstats format; view with python -m pstats or snakeviz)."""
+        if self._cprofile is None:
+            raise ValueError('profiler was created without cprofile=True')
+        self._cprofile.dump_stats(path)
@@ -0,0 +1,196 @@
+"""
+Differential stress testing: feed generated cases to a reference (brute force) and a
+candidate program in parallel and stop at the first case where their outputs differ.
+Cases are produced in-process by a callable; only the two programs are spawned per case.
+"""
+
+import os
+import shlex
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+COMPARE_MODES=('exact', 'tokens', 'float')
+# cases kept in flight per worker, so generation stays ahead of the pool
+WINDOW_PER_WORKER=2
+
+
+def split_command(cmd):
+    """Command string (shell-like quoting) or argument list to an argument list."""
+    return shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+
+
+def _float_equal(a: bytes, b: bytes, eps: float)->bool:
+    if a==b:
+        return True
+    try:
+        x,y=float(a),float(b)
+    except ValueError:
+        return False
+    return abs(x-y)<=eps*max(1.0, abs(x))
+
+
+def compare_outputs(expected: bytes, actual: bytes, mode: str='tokens', eps: float=1e-6)->bool:
+    """
+    exact:  byte for byte
+    tokens: same whitespace separated tokens (ignores spacing and trailing newlines)
+    float:  like tokens, numeric tokens may differ by eps (absolute, or relative for |x|>1)
+    """
+    if mode=='exact':
+        return expected==actual
+    a,b=expected.split(),actual.split()
+    if len(a)!=len(b):
+        return False
+    if mode=='tokens':
+        return a==b
+    if mode=='float':
+        return all(_float_equal(x, y, eps) for x,y in zip(a, b))
+    raise ValueError(f"Unknown compare mode: {mode}")
+
+
+class RunResult:
+    """Outcome of one program on one case: status is 'ok', 'timeout' or 'error'."""
+
+    __slots__=('status', 'returncode', 'stdout', 'stderr', 'elapsed')
+
+    def __init__(self, status, returncode, stdout, stderr, elapsed):
+        self.status=status
+        self.returncode=returncode
+        self.stdout=stdout
+        self.stderr=stderr
+        self.elapsed=elapsed
+
+
+def run_program(cmd, data: bytes, timeout=None)->RunResult:
+    """Run cmd with data on stdin; the process is killed once timeout seconds have passed."""
+    # imported on first use: subprocess alone is a noticeable share of CLI startup
+    import subprocess
+    start=time.perf_counter()
+    try:
+        p=subprocess.run(cmd, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    except subprocess.TimeoutExpired as e:
+        return RunResult('timeout', None, e.stdout or b'', e.stderr or b'', time.perf_counter()-start)
+    except OSError as e:
+        return RunResult('error', None, b'', str(e).encode(), time.perf_counter()-start)
+    status='ok' if p.returncode==0 else 'error'
+    return RunResult(status, p.returncode, p.stdout, p.stderr, time.perf_counter()-start)
+
+
+class Mismatch:
+    """First failing case: its index, input, both results and why it failed."""
+
+    def __init__(self, index, seed, data, reference, candidate, reason):
+        self.index=index
+        self.seed=seed
+        self.data=data
+        self.reference=reference
+        self.candidate=candidate
+        self.reason=reason
+
+    def save(self, directory):
+        """Write input.txt, expected.txt, actual.txt (and stderr logs, seed.txt) to directory."""
+        path=Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        (path/'input.txt').write_bytes(self.data)
+        if self.seed is not None:
+            (path/'seed.txt').write_text(f'{self.seed}\n')
+        (path/'expected.txt').write_bytes(self.reference.stdout)
+        (path/'actual.txt').write_bytes(self.candidate.stdout)
+        for name,res in (('expected.err', self.reference), ('actual.err', self.candidate)):
+            if res.stderr:
+                (path/name).write_bytes(res.stderr)
+        return path
+
+
+class StressRunner:
+    """
+    Runs cases through reference and candidate on a thread pool (the work happens in the
+    child processes, so threads are enough to keep every core busy).
+
+    make_case(index) -> (data, seed) builds case number index; seed is only reported.
+    Results are checked in case order, so the reported mismatch is the first failing
+    case no matter how many workers are used.
+    """
+
+    def __init__(self, reference, candidate, make_case, jobs=None, timeout=None, compare='tokens', eps=1e-6):
+        if compare not in COMPARE_MODES:
+            raise ValueError(f"Unknown compare mode: {compare}")
+        self.reference=split_command(reference)
+        self.candidate=split_command(candidate)
+        self.make_case=make_case
+        self.jobs=jobs or os.cpu_count() or 1
+        self.timeout=timeout
+        self.compare=compare
+        self.eps=eps
+        self.cases_run=0
+        self.elapsed=0.0
+
+    def _run_case(self, data):
+        return run_program(self.reference, data, self.timeout), run_program(self.candidate, data, self.timeout)
+
+    def _check(self, index, seed, data, ref, cand):
+        if ref.status!='ok':
+            reason=f"reference {ref.status}" + (f" (exit code {ref.returncode})" if ref.status=='error' else '')
+        elif cand.status!='ok':
+            reason=f"candidate {cand.status}" + (f" (exit code {cand.returncode})" if cand.status=='error' else '')
+        elif not compare_outputs(ref.stdout, cand.stdout, self.compare, self.eps):
+            reason="wrong answer"
+        else:
+            return None
+        return Mismatch(index, seed, data, ref, cand, reason)
+
+    def fails(self, data: bytes)->bool:
+        """True when the candidate fails on data while the reference handles it (shrinking predicate)."""
+        ref,cand=self._run_case(data)
+        return ref.status=='ok' and self._check(0, None, data, ref, cand) is not None
+
+    def check(self, data: bytes, index=None, seed=None):
+        """Run both programs on data: the Mismatch, or None when the outputs agree."""
+        return self._check(index, seed, data, *self._run_case(data))
+
+    @property
+    def rate(self)->float:
+        """Cases per second of the last run."""
+        return self.cases_run/self.elapsed if self.elapsed else 0.0
+
+    def run(self, cases=None, progress=None):
+        """
+        Run cases cases (forever when None) and return the first Mismatch, or None.
+        progress(cases_done, elapsed) is called about once a second.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        start=time.perf_counter()
+        last_report=start
+        self.cases_run=0
+        pending=deque()
+        window=self.jobs*WINDOW_PER_WORKER
+        index=0
+        with ThreadPoolExecutor(self.jobs) as pool:
+            try:
+                while True:
+                    while len(pending)<window and (cases is None or index<cases):
+                        data,seed=self.make_case(index)
+                        pending.append((index, seed, data, pool.submit(self._run_case, data)))
+                        index+=1
+                    if not pending:
+                        return None
+                    i,seed,data,fut=pending.popleft()
+                    ref,cand=fut.result()
+                    self.cases_run+=1
+                    mismatch=self._check(i, seed, data, ref, cand)
+                    if mismatch is not None:
+                        return mismatch
+                    now=time.perf_counter()
+                    if progress is not None and now-last_report>=1.0:
+                        progress(self.cases_run, now-start)
+                        last_report=now
+            finally:
+                for item in pending:
+                    item[3].cancel()
+                self.elapsed=time.perf_counter()-start
+
+
+def print_progress(done, elapsed):
+    """Default progress line on stderr."""
+    print(f"\r{done} cases, {done/elapsed:.1f} cases/s", end='', file=sys.stderr, flush=True)
@@ -0,0 +1,162 @@
+"""
+Persistent generator server.
+One warm process (interpreter started, generator modules imported) listens on a Unix
+domain socket and runs each request in a forked child, so a request costs a fork instead
+of a fresh interpreter. Requests use the CLI argument syntax; the client passes its own
+stdin/stdout/stderr descriptors along (SCM_RIGHTS), so output goes straight to the
+client's terminal, pipe or file and is never copied through the socket.
+Only the standard library modules needed by the client are imported at the top.
+"""
+
+import array
+import os
+import socket
+import sys
+
+ENV_SOCKET='CPSTRESS_SOCKET'
+# stdin, stdout, stderr
+STD_FDS=(0, 1, 2)
+_MAX_REQUEST=1<<20
+
+
+def default_socket_path():
+    """$CPSTRESS_SOCKET, else a per-user socket in $XDG_RUNTIME_DIR or /tmp."""
+    path=os.environ.get(ENV_SOCKET)
+    if path:
+        return path
+    return os.path.join(os.environ.get('XDG_RUNTIME_DIR') or '/tmp', f'cpstress-{os.getuid()}.sock')
+
+
+def _send_fds(sock, data, fds):
+    sock.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))])
+
+
+def _recv_fds(sock, bufsize, maxfds):
+    fds=array.array('i')
+    data,ancdata,_,_=sock.recvmsg(bufsize, socket.CMSG_LEN(maxfds*fds.itemsize))
+    for level,kind,payload in ancdata:
+        if level==socket.SOL_SOCKET and kind==socket.SCM_RIGHTS:
+            fds.frombytes(payload[:len(payload)-len(payload)%fds.itemsize])
+    return data, list(fds)
+
+
+def _read_line(sock, data=b''):
+    while b'\n' not in data:
+        chunk=sock.recv(64)
+        if not chunk:
+            raise ConnectionError('connection closed before the end of the line')
+        data+=chunk
+    return data.split(b'\n', 1)
+
+
+def _encode_request(cwd, argv):
+    # "<length>\n" then cwd and the arguments NUL separated (json would pull in re on the client)
+    body=b'\0'.join(map(os.fsencode, [cwd, *argv]))
+    return b'%d\n%s' % (len(body), body)
+
+
+def _decode_request(sock, data):
+    size,body=_read_line(sock, data)
+    size=int(size)
+    if size>_MAX_REQUEST:
+        raise ValueError('request too large')
+    while len(body)<size:
+        chunk=sock.recv(size-len(body))
+        if not chunk:
+            raise ConnectionError('connection closed in the middle of a request')
+        body+=chunk
+    cwd,*argv=map(os.fsdecode, body.split(b'\0'))
+    return cwd, argv
+
+
+def request(argv, path=None, cwd=None, fds=STD_FDS):
+    """
+    Run argv on the server at path with this process' stdin/stdout/stderr; returns the exit status.
+    Raises OSError (FileNotFoundError, ConnectionRefusedError) when no server is listening.
+    """
+    payload=_encode_request(cwd or os.getcwd(), argv)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path or default_socket_path())
+        _send_fds(sock, payload, fds)
+        return int(_read_line(sock)[0])
+
+
+def _exit_status(handler, argv):
+    """Run handler(argv) like a script's main: SystemExit becomes the returned status."""
+    try:
+        handler(argv)
+        status=0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            status=e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            status=1
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        status=1
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+    return status
+
+
+def _check_stale(path):
+    """Remove a socket file left behind by a dead server; refuse to replace a live one."""
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)
+            return
+    raise OSError(f'a server is already listening on {path}')
+
+
+def serve(handler, path=None, ready=None):
+    """
+    Serve handler(argv) on a Unix socket until interrupted (Ctrl-C or SIGTERM).
+    Each request runs in a forked child with the client's descriptors as fds 0-2 and the
+    client's working directory; state changed by one request never leaks into the next.
+    ready(path) is called once the socket accepts connections.
+    """
+    import signal
+    import socketserver
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            data,fds=_recv_fds(self.request, 65536, len(STD_FDS))
+            cwd,argv=_decode_request(self.request, data)
+            for target,fd in zip(STD_FDS, fds):
+                os.dup2(fd, target)
+                os.close(fd)
+            os.chdir(cwd)
+            status=_exit_status(handler, argv)
+            try:
+                self.request.sendall(f'{status}\n'.encode())
+            except OSError:
+                pass  # client went away
+
+    class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+        block_on_close=False
+
+    path=path or default_socket_path()
+    _check_stale(path)
+    # flush before forking, or buffered output would be written again by every child
+    sys.stdout.flush()
+    sys.stderr.flush()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    with Server(path, Handler) as server:
+        try:
+            os.chmod(path, 0o600)
+            if ready is not None:
+                ready(path)
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(path)
@@ -0,0 +1,230 @@
+"""
+Failing test case minimizer (delta debugging).
+Shrinks arrays, strings, edge lists and trees while a predicate keeps failing. Candidate
+reductions are rendered to the exact input bytes, checked a wave at a time in parallel,
+and every verdict is cached by a hash of those bytes, so no input is ever run twice.
+"""
+
+import os
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.writer import format_rows, format_tokens
+
+
+def render_array(arr)->bytes:
+    return format_tokens(arr)+b'\n'
+
+
+def render_string(s)->bytes:
+    return (s if isinstance(s, bytes) else s.encode())+b'\n'
+
+
+def render_edges(n, edges)->bytes:
+    """Edge list as printed by the CLI (n is not written)."""
+    return format_rows(edges)+b'\n'
+
+
+def relabel_edges(edges, base=1):
+    """Renumber the nodes of edges (u, v, *rest) to base, base+1, ... in order of first use: (k, edges)."""
+    ids={}
+    out=[]
+    for e in edges:
+        u=ids.setdefault(e[0], len(ids)+base)
+        v=ids.setdefault(e[1], len(ids)+base)
+        out.append((u, v)+tuple(e[2:]))
+    return len(ids), out
+
+
+def _tree_order(edges):
+    """BFS from the first endpoint of edges: (order, parent) of every node."""
+    adj={}
+    for e in edges:
+        adj.setdefault(e[0], []).append(e[1])
+        adj.setdefault(e[1], []).append(e[0])
+    root=edges[0][0]
+    parent={root: None}
+    order=[root]
+    queue=deque(order)
+    while queue:
+        x=queue.popleft()
+        for y in adj[x]:
+            if y not in parent:
+                parent[y]=x
+                order.append(y)
+                queue.append(y)
+    return order, parent
+
+
+class Shrinker:
+    """
+    predicate(data: bytes) -> bool must be True while the input still fails.
+    Candidates are evaluated jobs at a time; of each wave the first failing one
+    (in candidate order) wins, so the result does not depend on timing.
+    """
+
+    def __init__(self, predicate, jobs=None):
+        self.predicate=predicate
+        self.jobs=jobs or os.cpu_count() or 1
+        self._cache={}
+        self.calls=0
+        self.cache_hits=0
+
+    def fails(self, data: bytes)->bool:
+        """Cached predicate."""
+        key=blake2b(data, digest_size=16).digest()
+        if key in self._cache:
+            self.cache_hits+=1
+            return self._cache[key]
+        self.calls+=1
+        res=self._cache[key]=bool(self.predicate(data))
+        return res
+
+    def first_failing(self, candidates, render):
+        """First candidate (state) whose rendered input still fails, or None."""
+        it=iter(candidates)
+        with ThreadPoolExecutor(self.jobs) as pool:
+            while True:
+                wave=[]
+                for state in it:
+                    wave.append(state)
+                    if len(wave)>=self.jobs:
+                        break
+                if not wave:
+                    return None
+                datas=[render(state) for state in wave]
+                for state,ok in zip(wave, pool.map(self.fails, datas)):
+                    if ok:
+                        return state
+
+    def reduce(self, state, units_of, remove, render):
+        """
+        Generic ddmin: split units_of(state) into g chunks and try keeping only one chunk,
+        then dropping one chunk (remove(state, chunk) builds the reduced state). A success
+        restarts on the smaller state, otherwise g doubles until chunks are single units.
+        """
+        g=2
+        while True:
+            units=units_of(state)
+            size=len(units)
+            if size<2:
+                return state
+            g=min(g, size)
+            step=-(-size//g)
+            chunks=[units[s:s+step] for s in range(0, size, step)]
+
+            def candidates():
+                if len(chunks)>2:
+                    for i in range(len(chunks)):
+                        yield remove(state, [u for j,c in enumerate(chunks) if j!=i for u in c]), True
+                for c in chunks:
+                    yield remove(state, c), False
+
+            found=self.first_failing(candidates(), lambda cand: render(cand[0]))
+            if found is not None:
+                state,kept_one=found
+                g=2 if kept_one else max(g-1, 2)
+            elif g>=size:
+                return state
+            else:
+                g=min(2*g, size)
+
+    # ==================== STRUCTURES ====================
+
+    def shrink_list(self, items, render):
+        """Minimal failing sub-sequence of items."""
+        def remove(state, idx):
+            drop=set(idx)
+            return [x for i,x in enumerate(state) if i not in drop]
+        return self.reduce(list(items), lambda s: list(range(len(s))), remove, render)
+
+    def shrink_array(self, arr, render=render_array):
+        return self.shrink_list(arr, render)
+
+    def shrink_string(self, s, render=render_string):
+        """Minimal failing subsequence of the characters of s."""
+        join=(lambda xs: bytes(xs)) if isinstance(s, bytes) else ''.join
+        out=self.shrink_list(list(s), lambda xs: render(join(xs)))
+        return join(out)
+
+    def shrink_graph(self, n, edges, render=render_edges, base=1):
+        """
+        Drop edges, then renumber the nodes still used by an edge to base.. (isolated
+        nodes disappear); the relabelled graph is kept only if it still fails. Returns (n, edges).
+        """
+        edges=self.shrink_list(edges, lambda es: render(n, es))
+        k,relabelled=relabel_edges(edges, base)
+        if k<n and relabelled!=edges and self.fails(render(k, relabelled)):
+            return k, relabelled
+        if relabelled!=edges and self.fails(render(n, relabelled)):
+            return n, relabelled
+        return n, edges
+
+    def shrink_tree(self, edges, render=render_edges, base=1):
+        """
+        Keep the tree connected: cut off (or keep only) whole subtrees, then drop leaves.
+        Every candidate is relabelled to base..base+k-1, so the result is a tree on k nodes.
+        Returns (k, edges).
+        """
+        edges=list(edges)
+
+        def rend(es):
+            return render(*relabel_edges(es, base)) if es else render(1, es)
+
+        def leaves(es):
+            deg={}
+            for e in es:
+                deg[e[0]]=deg.get(e[0], 0)+1
+                deg[e[1]]=deg.get(e[1], 0)+1
+            return [x for x,d in deg.items() if d==1]
+
+        def drop_nodes(es, nodes):
+            drop=set(nodes)
+            return [e for e in es if e[0] not in drop and e[1] not in drop]
+
+        while True:
+            before=len(edges)
+            edges=self._cut_subtrees(edges, rend)
+            edges=self.reduce(edges, leaves, drop_nodes, rend)
+            if len(edges)>=before:
+                break
+        return relabel_edges(edges, base) if edges else (1, edges)
+
+    def _cut_subtrees(self, edges, render):
+        """Repeatedly replace the tree by one side of an edge, trying the most balanced cuts first."""
+        while len(edges)>1:
+            order,parent=_tree_order(edges)
+            size=dict.fromkeys(order, 1)
+            for x in reversed(order[1:]):
+                size[parent[x]]+=size[x]
+            total=len(order)
+            cuts=sorted(order[1:], key=lambda x: abs(2*size[x]-total))[:max(2*self.jobs, 8)]
+
+            found=self.first_failing(self._cut_candidates(edges, order, parent, cuts), render)
+            if found is None:
+                return edges
+            edges=found
+        return edges
+
+    @staticmethod
+    def _cut_candidates(edges, order, parent, cuts):
+        """For each cut node c: the subtree below c, then the tree without it."""
+        children={}
+        for x in order[1:]:
+            children.setdefault(parent[x], []).append(x)
+        for c in cuts:
+            inside={c}
+            stack=[c]
+            while stack:
+                for y in children.get(stack.pop(), ()):
+                    inside.add(y)
+                    stack.append(y)
+            below=[e for e in edges if e[0] in inside and e[1] in inside]
+            if below:
+                yield below
+            yield [e for e in edges if e[0] not in inside and e[1] not in inside]
@@ -0,0 +1,348 @@
+"""
+Declarative test case specs.
+A spec (JSON file, or the same structure as a Python dict) lists the sections of one
+input file; compile_spec() checks it and turns it into a Plan whose run(rng) streams
+the encoded file in a single pass.
+
+    {
+      "body": [
+        {"let": {"T": {"int": [1, 10]}}},
+        {"line": ["T"]},
+        {"repeat": "T",
+         "split": {"n": {"total": 200000, "min": 1, "max": 100000}},
+         "body": [
+           {"let": {"q": {"int": [1, "n"]}}},
+           {"line": ["n", "q"]},
+           {"array": {"size": "n", "min": 1, "max": 1000000000}},
+           {"pairs": {"count": "q", "min": 1, "max": "n", "ordered": true}}
+         ]}
+      ]
+    }
+
+"vars" holds constants visible everywhere, "let" binds variables as the file is generated
+(inside a repeat, per repetition). Values are numbers, expressions over variables (strings
+such as "n-1" or "min(n, 5)"), or random draws: {"int": [lo, hi]}, {"real": [lo, hi]}, {"choice": [...]}.
+A split gives every repetition its own value of a variable, drawn up front so that the
+values respect the total (sum of n <= total) without retrying any test case.
+"""
+
+import ast
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from generators.generate_arrays import gen_arrays
+from generators.generate_graphs import gen_graphs
+from generators.generate_strings import gen_strings, CaseType
+from src.utils.writer import format_rows, format_tokens
+
+_CASES={'lower': CaseType.Lower, 'upper': CaseType.Upper, 'mixed': CaseType.Mixed}
+_FUNCTIONS={'min': min, 'max': max, 'abs': abs}
+_EXPR_NODES=(ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load, ast.Call,
+             ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd)
+
+
+class SpecError(ValueError):
+    """Raised for malformed specs, with the path of the offending entry."""
+
+
+# ==================== VALUES ====================
+
+def _compile_expr(text, where):
+    try:
+        tree=ast.parse(text, mode='eval')
+    except SyntaxError as e:
+        raise SpecError(f"{where}: invalid expression {text!r}") from e
+    for node in ast.walk(tree):
+        if not isinstance(node, _EXPR_NODES):
+            raise SpecError(f"{where}: unsupported syntax in {text!r}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS):
+            raise SpecError(f"{where}: only {', '.join(_FUNCTIONS)} can be called in {text!r}")
+    code=compile(tree, where, 'eval')
+
+    def value(env, rng):
+        try:
+            return eval(code, {'__builtins__': {}, **_FUNCTIONS}, env)
+        except NameError as e:
+            raise SpecError(f"{where}: {e}") from None
+    return value
+
+
+def compile_value(spec, where='value'):
+    """Compile a value spec into value(env, rng)."""
+    if isinstance(spec, bool) or spec is None:
+        return lambda env, rng: spec
+    if isinstance(spec, (int, float)):
+        return lambda env, rng: spec
+    if isinstance(spec, str):
+        return _compile_expr(spec, where)
+    if isinstance(spec, dict) and len(spec)==1:
+        kind,arg=next(iter(spec.items()))
+        if kind in ('int', 'real') and isinstance(arg, list) and len(arg)==2:
+            lo,hi=compile_value(arg[0], where), compile_value(arg[1], where)
+            if kind=='int':
+                return lambda env, rng: rng.randint(lo(env, rng), hi(env, rng))
+            return lambda env, rng: rng.uniform(lo(env, rng), hi(env, rng))
+        if kind=='choice' and isinstance(arg, list) and arg:
+            options=[compile_value(a, where) for a in arg]
+            return lambda env, rng: rng.choice(options)(env, rng)
+    raise SpecError(f"{where}: cannot interpret {spec!r}")
+
+
+def _params(spec, where, required, optional, static=()):
+    """
+    Compile the parameters of an item; optional maps names to default values.
+    static names are accepted but left to the item (fixed options such as a graph type).
+    """
+    if not isinstance(spec, dict):
+        raise SpecError(f"{where}: expected an object, got {spec!r}")
+    unknown=set(spec)-set(required)-set(optional)-set(static)
+    if unknown:
+        raise SpecError(f"{where}: unknown parameter(s) {', '.join(sorted(unknown))}")
+    missing=[k for k in required if k not in spec]
+    if missing:
+        raise SpecError(f"{where}: missing parameter(s) {', '.join(missing)}")
+    out={k: compile_value(spec[k], f"{where}.{k}") for k in required}
+    for k,default in optional.items():
+        out[k]=compile_value(spec.get(k, default), f"{where}.{k}")
+    return out
+
+
+def _evaluate(params, env, rng):
+    return {k: f(env, rng) for k,f in params.items()}
+
+
+# ==================== ITEMS ====================
+# Every compiled item is emit(env, rng) -> iterator of encoded chunks ending in a newline.
+
+def _line(spec, where):
+    if not isinstance(spec, list):
+        raise SpecError(f"{where}: expected a list of values")
+    values=[compile_value(v, f"{where}[{i}]") for i,v in enumerate(spec)]
+
+    def emit(env, rng):
+        yield format_tokens([v(env, rng) for v in values])+b'\n'
+    return emit
+
+
+def _let(spec, where):
+    if not isinstance(spec, dict):
+        raise SpecError(f"{where}: expected an object of name: value")
+    values=[(name, compile_value(v, f"{where}.{name}")) for name,v in spec.items()]
+
+    def emit(env, rng):
+        for name,v in values:
+            env[name]=v(env, rng)
+        return iter(())
+    return emit
+
+
+def _array(spec, where):
+    p=_params(spec, where, ('size', 'min', 'max'), {'unique': False, 'sorted': False})
+
+    def emit(env, rng):
+        a=_evaluate(p, env, rng)
+        if a['unique'] or a['sorted']:
+            yield format_tokens(gen_arrays.random(a['size'], a['min'], a['max'], rng, unique=a['unique'], sorted_=a['sorted']))
+        else:
+            first=True
+            for chunk in gen_arrays.iter_random(a['size'], a['min'], a['max'], rng):
+                yield format_tokens(chunk) if first else b' '+format_tokens(chunk)
+                first=False
+        yield b'\n'
+    return emit
+
+
+def _permutation(spec, where):
+    p=_params(spec, where, ('n',), {})
+
+    def emit(env, rng):
+        yield format_tokens(gen_arrays.permutation(p['n'](env, rng), rng))+b'\n'
+    return emit
+
+
+def _pairs(spec, where):
+    p=_params(spec, where, ('count', 'min', 'max'), {'ordered': False})
+
+    def emit(env, rng):
+        a=_evaluate(p, env, rng)
+        if a['count']>0:
+            yield format_rows(gen_arrays.pairs(a['count'], a['min'], a['max'], a['min'], a['max'], rng, ordered=a['ordered']))+b'\n'
+    return emit
+
+
+def _matrix(spec, where):
+    p=_params(spec, where, ('rows', 'cols', 'min', 'max'), {})
+
+    def emit(env, rng):
+        a=_evaluate(p, env, rng)
+        if a['rows']>0:
+            yield format_rows(gen_arrays.matrix(a['rows'], a['cols'], a['min'], a['max'], rng))+b'\n'
+    return emit
+
+
+def _string(spec, where):
+    p=_params(spec, where, ('length',), {'count': 1}, static=('case', 'alphabet'))
+    case=spec.get('case', 'lower')
+    if case not in _CASES:
+        raise SpecError(f"{where}.case: expected one of {', '.join(_CASES)}")
+    alphabet=spec.get('alphabet')
+
+    def emit(env, rng):
+        a=_evaluate(p, env, rng)
+        for _ in range(a['count']):
+            if alphabet:
+                s=gen_strings.random_custom(a['length'], alphabet, rng)
+            else:
+                s=gen_strings.random(a['length'], _CASES[case], rng)
+            yield s.encode()+b'\n'
+    return emit
+
+
+_GRAPH_TYPES=('tree', 'simple', 'weighted', 'directed', 'dag', 'bipartite')
+
+
+def _graph(spec, where):
+    p=_params(spec, where, ('nodes',), {'edges': 0, 'min_weight': 1, 'max_weight': 10}, static=('type',))
+    kind=spec.get('type', 'simple')
+    if kind not in _GRAPH_TYPES:
+        raise SpecError(f"{where}.type: expected one of {', '.join(_GRAPH_TYPES)}")
+
+    def emit(env, rng):
+        a=_evaluate(p, env, rng)
+        n,m=a['nodes'],a['edges']
+        if kind=='tree':
+            for chunk in gen_graphs.iter_tree(n, rng=rng):
+                yield format_rows(chunk)+b'\n'
+            return
+        if kind=='simple':
+            g=gen_graphs.simple_graph(n, m, rng=rng, as_buffer=True)
+        elif kind=='weighted':
+            g=gen_graphs.weighted_graph(n, m, a['min_weight'], a['max_weight'], rng=rng, as_buffer=True)
+        elif kind=='directed':
+            g=gen_graphs.directed_graph(n, m, rng=rng, as_buffer=True)
+        elif kind=='dag':
+            g=gen_graphs.dag(n, m, rng=rng, as_buffer=True)
+        else:
+            g=gen_graphs.bipartite(n//2, n-n//2, m, rng=rng, as_buffer=True)
+        if len(g):
+            yield format_rows(g)+b'\n'
+    return emit
+
+
+def _split_values(total, count, lo, hi, exact, rng, where='split'):
+    """count values in [lo, hi] whose sum is at most total (exactly total when exact), uniform given the sum."""
+    if count<=0:
+        return []
+    if hi is None:
+        hi=total
+    if lo>hi:
+        raise SpecError(f"{where}: min {lo} > max {hi}")
+    if lo*count>total:
+        raise SpecError(f"{where}: {count} repetitions need at least {lo*count} > total {total}")
+    if exact and hi*count<total:
+        raise SpecError(f"{where}: {count} repetitions reach at most {hi*count} < exact total {total}")
+    top=min(total, hi*count)
+    s=top if exact else rng.randint(lo*count, top)
+    return gen_arrays.partition(s, count, lo, hi, rng, uniform=True)
+
+
+def _repeat(spec, where):
+    unknown=set(spec)-{'repeat', 'body', 'split'}
+    if unknown:
+        raise SpecError(f"{where}: unknown key(s) {', '.join(sorted(unknown))}")
+    times=compile_value(spec['repeat'], f"{where}.repeat")
+    body=compile_body(spec.get('body', []), f"{where}.body")
+    splits=[]
+    for name,s in spec.get('split', {}).items():
+        splits.append((name, f"{where}.split.{name}", _params(s, f"{where}.split.{name}", ('total',), {'min': 1, 'max': None, 'exact': False})))
+
+    def emit(env, rng):
+        count=times(env, rng)
+        # every split is drawn for all repetitions before the first one is generated
+        shares=[]
+        for name,path,sp in splits:
+            a=_evaluate(sp, env, rng)
+            shares.append((name, _split_values(a['total'], count, a['min'], a['max'], a['exact'], rng, path)))
+        for i in range(count):
+            local=dict(env)
+            for name,values in shares:
+                local[name]=values[i]
+            for item in body:
+                yield from item(local, rng)
+    return emit
+
+
+_ITEMS={
+    'line': _line,
+    'let': _let,
+    'array': _array,
+    'permutation': _permutation,
+    'pairs': _pairs,
+    'matrix': _matrix,
+    'string': _string,
+    'graph': _graph,
+}
+
+
+def compile_item(spec, where):
+    if not isinstance(spec, dict):
+        raise SpecError(f"{where}: expected an object, got {spec!r}")
+    if 'repeat' in spec:
+        return _repeat(spec, where)
+    if len(spec)!=1:
+        raise SpecError(f"{where}: expected exactly one of {', '.join(_ITEMS)} or repeat")
+    kind,arg=next(iter(spec.items()))
+    if kind not in _ITEMS:
+        raise SpecError(f"{where}: unknown item {kind!r}")
+    return _ITEMS[kind](arg, f"{where}.{kind}")
+
+
+def compile_body(items, where='body'):
+    if not isinstance(items, list):
+        raise SpecError(f"{where}: expected a list of items")
+    return [compile_item(item, f"{where}[{i}]") for i,item in enumerate(items)]
+
+
+# ==================== PLAN ====================
+
+class Plan:
+    """Compiled spec: run(rng) yields the encoded test case chunk by chunk."""
+
+    def __init__(self, body, variables=None):
+        self.body=body
+        self.variables=variables or {}
+
+    def run(self, rng, strip_final_newline=False):
+        env=dict(self.variables)
+        held=None
+        for item in self.body:
+            for chunk in item(env, rng):
+                if held is not None:
+                    yield held
+                held=chunk
+        if held is not None:
+            yield held[:-1] if strip_final_newline and held.endswith(b'\n') else held
+
+    def generate(self, rng)->bytes:
+        return b''.join(self.run(rng))
+
+
+def compile_spec(spec)->Plan:
+    """Validate a spec dict ({"vars": {...}, "body": [...]}) and compile it into a Plan."""
+    if isinstance(spec, list):
+        spec={'body': spec}
+    if not isinstance(spec, dict) or 'body' not in spec:
+        raise SpecError("spec: expected an object with a body list")
+    unknown=set(spec)-{'vars', 'body'}
+    if unknown:
+        raise SpecError(f"spec: unknown key(s) {', '.join(sorted(unknown))}")
+    return Plan(compile_body(spec['body']), dict(spec.get('vars', {})))
+
+
+def load_spec(path)->Plan:
+    """Compile the JSON spec stored in path."""
+    with open(path) as f:
+        return compile_spec(json.load(f))
@@ -0,0 +1,412 @@
+"""
+Binary container for test cases.
+A case is a sequence of named sections (scalars, numeric arrays, edge lists with optional
+weights, strings) stored as little-endian packed payloads, so a validator or harness can
+read a 10^7-element array without formatting and parsing it as text.
+
+Layout:
+    header   32 bytes: magic, version, flags, section count, table offset, table length
+    payloads one per section, each starting on an 8 byte boundary
+    table    one entry per section: kind, typecode, width, count, offset, length, name
+
+The table is written last (the writer streams payloads straight from the generators and
+only knows the sizes at the end) and the header, reserved up front, is filled in on close.
+CaseReader memory-maps the file and hands out memoryviews over the payloads without
+copying. to_text() renders the same whitespace separated text the CLI writes, so a binary
+case only needs converting when it is actually given to a solution.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate, chain
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.utils.writer import TokenWriter, format_columns, format_tokens
+
+MAGIC=b'CPSTRESS'
+VERSION=1
+_HEADER=struct.Struct('<8sHHIQQ')
+_ENTRY=struct.Struct('<BcBxIQQQ')
+ALIGN=8
+# elements (or rows) rendered per format call by the text converter
+TEXT_BLOCK=1<<16
+
+SCALARS,ARRAY,EDGES,STRINGS=1,2,3,4
+KIND_NAMES={SCALARS: 'scalars', ARRAY: 'array', EDGES: 'edges', STRINGS: 'strings'}
+# signed integer typecodes, narrowest first, and the float one
+INT_CODES=('b', 'h', 'i', 'q')
+TYPECODES=frozenset(INT_CODES+('d',))
+_BIG_ENDIAN=sys.byteorder=='big'
+
+
+class CaseFormatError(ValueError):
+    pass
+
+
+def int_typecode(lo, hi):
+    """Narrowest signed typecode holding every integer in [lo, hi]."""
+    for code in INT_CODES:
+        bits=8*array(code).itemsize
+        if -(1<<(bits-1))<=lo and hi<(1<<(bits-1)):
+            return code
+    raise CaseFormatError(f'values in [{lo}, {hi}] do not fit in 64 bits')
+
+
+def _typecode_of(values):
+    if not values:
+        return 'b'
+    if any(isinstance(x, float) for x in values):
+        return 'd'
+    return int_typecode(min(values), max(values))
+
+
+def _le_bytes(values):
+    """Little-endian bytes of an array, without a copy on little-endian machines."""
+    if _BIG_ENDIAN:
+        values=array(values.typecode, values)
+        values.byteswap()
+    return memoryview(values).cast('B')
+
+
+class CaseWriter:
+    """
+    Writes sections to a seekable file descriptor; call close() (or use it as a context
+    manager) to write the section table and the header.
+    """
+
+    def __init__(self, fd, closefd=False):
+        self._out=TokenWriter(fd, closefd=closefd)
+        self._fd=fd
+        self._entries=[]
+        self._pos=0
+        self._closed=False
+        self._put(bytes(_HEADER.size))
+
+    @classmethod
+    def open(cls, path):
+        """Writer on a new (truncated) file."""
+        fd=os.open(path, os.O_WRONLY|os.O_CREAT|os.O_TRUNC|getattr(os, 'O_BINARY', 0), 0o644)
+        return cls(fd, closefd=True)
+
+    def _put(self, data):
+        self._out.write(data)
+        self._pos+=len(data)
+
+    def _begin(self):
+        self._put(bytes(-self._pos%ALIGN))
+        return self._pos
+
+    def _add(self, kind, name, typecode, width, count, offset):
+        self._entries.append((kind, typecode, width, count, offset, self._pos-offset, name.encode()))
+
+    # ==================== SECTIONS ====================
+
+    def scalars(self, name, values):
+        """A few numbers rendered on one line, e.g. "n m"."""
+        values=list(values)
+        code='d' if any(isinstance(x, float) for x in values) else 'q'
+        offset=self._begin()
+        self._put(_le_bytes(array(code, values)))
+        self._add(SCALARS, name, code, 1, len(values), offset)
+
+    def array(self, name, values, typecode=None):
+        """Numeric array (one line of tokens); typecode defaults to the narrowest that fits."""
+        if not isinstance(values, array) or (typecode and typecode!=values.typecode):
+            values=list(values)
+            values=array(typecode or _typecode_of(values), values)
+        self._check(values.typecode)
+        offset=self._begin()
+        self._put(_le_bytes(values))
+        self._add(ARRAY, name, values.typecode, 1, len(values), offset)
+
+    def array_chunks(self, name, chunks, typecode):
+        """Numeric array streamed from chunks (e.g. gen_arrays.iter_random); typecode must fit every value."""
+        self._check(typecode)
+        offset=self._begin()
+        count=0
+        for chunk in chunks:
+            part=array(typecode, chunk)
+            self._put(_le_bytes(part))
+            count+=len(part)
+        self._add(ARRAY, name, typecode, 1, count, offset)
+
+    def edges(self, name, edges, typecode=None):
+        """Edge list, a GraphBuffer or (u, v[, w]) tuples, stored row by row; one edge per line."""
+        if hasattr(edges, 'columns'):
+            columns=edges.columns()
+            width,count=len(columns), len(columns[0])
+            flat=[0]*(width*count)
+            for j,col in enumerate(columns):
+                flat[j::width]=col
+        else:
+            edges=list(edges)
+            width=len(edges[0]) if edges else 2
+            if any(len(e)!=width for e in edges):
+                raise CaseFormatError('edges must all have the same number of fields')
+            count=len(edges)
+            flat=list(chain.from_iterable(edges))
+        values=array(typecode or _typecode_of(flat), flat)
+        self._check(values.typecode)
+        offset=self._begin()
+        self._put(_le_bytes(values))
+        self._add(EDGES, name, values.typecode, width, count, offset)
+
+    def edge_chunks(self, name, chunks, typecode='i', width=2):
+        """Edge list streamed from chunks of tuples (e.g. gen_graphs.iter_tree)."""
+        self._check(typecode)
+        offset=self._begin()
+        count=0
+        for chunk in chunks:
+            self._put(_le_bytes(array(typecode, chain.from_iterable(chunk))))
+            count+=len(chunk)
+        self._add(EDGES, name, typecode, width, count, offset)
+
+    def strings(self, name, values):
+        """Strings (str or bytes), one per line: int64 end offsets followed by the bytes."""
+        values=[s.encode() if isinstance(s, str) else bytes(s) for s in values]
+        offset=self._begin()
+        self._put(_le_bytes(array('q', [0, *accumulate(map(len, values))])))
+        for s in values:
+            self._put(s)
+        self._add(STRINGS, name, 'B', 1, len(values), offset)
+
+    def _check(self, typecode):
+        if typecode not in TYPECODES:
+            raise CaseFormatError(f"unsupported typecode {typecode!r} (use one of {', '.join(sorted(TYPECODES))})")
+
+    # ==================== CLOSING ====================
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed=True
+        table_offset=self._begin()
+        for kind,code,width,count,offset,length,name in self._entries:
+            self._put(_ENTRY.pack(kind, code.encode(), width, len(name), count, offset, length))
+            self._put(name)
+        self._out.flush()
+        header=_HEADER.pack(MAGIC, VERSION, 0, len(self._entries), table_offset, self._pos-table_offset)
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, header)
+        self._out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Section:
+    """
+    One section of a CaseReader. values is a flat memoryview over the mapped file (rows of
+    width values for edges); rows() is the same data shaped (count, width), column(j) a
+    strided view. Strings are indexed (section[i] is a memoryview of bytes).
+    """
+
+    def __init__(self, kind, name, typecode, width, count, data):
+        self.kind=kind
+        self.name=name
+        self.typecode=typecode
+        self.width=width
+        self.count=count
+        self._data=data
+        if kind==STRINGS:
+            self._ends=_values(data[:8*(count+1)], 'q')
+            self._chars=data[8*(count+1):]
+            self.values=None
+        else:
+            self.values=_values(data, typecode)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if self.kind==STRINGS:
+            if not -self.count<=i<self.count:
+                raise IndexError('string index out of range')
+            i%=self.count
+            return self._chars[self._ends[i]:self._ends[i+1]]
+        if self.kind==EDGES:
+            return tuple(self.values[i*self.width:(i+1)*self.width])
+        return self.values[i]
+
+    def rows(self):
+        """Edges as a (count, width) memoryview (index it as rows()[i, j]; numpy.asarray() takes it as is)."""
+        if _BIG_ENDIAN:
+            raise CaseFormatError('rows() is only available on little-endian machines, use values')
+        return self.values.cast('B').cast(self.typecode, (self.count, self.width))
+
+    def column(self, j):
+        return self.values[j::self.width]
+
+    def tolist(self):
+        if self.kind==STRINGS:
+            return [bytes(self[i]) for i in range(self.count)]
+        if self.kind==EDGES:
+            flat=self.values.tolist()
+            return list(zip(*(flat[j::self.width] for j in range(self.width))))
+        return self.values.tolist()
+
+    def text_chunks(self):
+        """Encoded text of the section (no trailing newline) in bounded chunks."""
+        if self.kind==STRINGS:
+            for i in range(self.count):
+                if i:
+                    yield b'\n'
+                yield self[i]
+            return
+        values,width=self.values, self.width
+        step=TEXT_BLOCK*width
+        for start in range(0, self.count*width, step):
+            flat=values[start:start+step].tolist()
+            if self.kind==EDGES:
+                chunk=format_columns([flat[j::width] for j in range(width)])
+                sep=b'\n'
+            else:
+                chunk=format_tokens(flat)
+                sep=b' '
+            yield sep+chunk if start else chunk
+
+
+def _values(data, typecode):
+    view=data.cast(typecode)
+    if _BIG_ENDIAN:
+        # the payload is little-endian: a byteswapped copy
+        view=array(typecode, view.tobytes())
+        view.byteswap()
+        view=memoryview(view)
+    return view
+
+
+class CaseReader:
+    """
+    Memory-mapped reader: reader[i] or reader[name] is a Section whose views point into the
+    mapping. Views still alive at close() keep the mapping until they are released.
+    """
+
+    def __init__(self, fd, closefd=False):
+        if not isinstance(fd, int):
+            fd=fd.fileno()
+        self._fd=fd
+        self._closefd=closefd
+        self._map=None
+        try:
+            self._load()
+        except (struct.error, UnicodeDecodeError) as e:
+            self.close()
+            raise CaseFormatError(f'corrupt binary case table ({e})') from None
+        except BaseException:
+            self.close()
+            raise
+
+    def _load(self):
+        # mmap cannot map an empty file, so short files are rejected before mapping
+        if os.fstat(self._fd).st_size<_HEADER.size:
+            raise CaseFormatError('file too short for a binary case')
+        self._map=mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+        self._view=memoryview(self._map)
+        magic,version,_,nsections,table,table_len=_HEADER.unpack_from(self._view)
+        if magic!=MAGIC:
+            raise CaseFormatError('not a binary case file (bad magic)')
+        if version>VERSION:
+            raise CaseFormatError(f'binary case version {version} is newer than this reader ({VERSION})')
+        if table+table_len>len(self._view):
+            raise CaseFormatError('truncated binary case (was the writer closed?)')
+        self.sections=[]
+        pos=table
+        for _ in range(nsections):
+            kind,code,width,name_len,count,offset,length=_ENTRY.unpack_from(self._view, pos)
+            pos+=_ENTRY.size
+            name=bytes(self._view[pos:pos+name_len]).decode()
+            pos+=name_len
+            if offset+length>table:
+                raise CaseFormatError(f'section {name!r} points outside the payload area')
+            self.sections.append(Section(kind, name, code.decode(), width, count, self._view[offset:offset+length]))
+        self._names={s.name: s for s in self.sections}
+
+    @classmethod
+    def open(cls, path):
+        """Reader over the file at path (closed with the reader)."""
+        return cls(os.open(path, os.O_RDONLY|getattr(os, 'O_BINARY', 0)), closefd=True)
+
+    def __len__(self):
+        return len(self.sections)
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def __getitem__(self, key):
+        return self._names[key] if isinstance(key, str) else self.sections[key]
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def close(self):
+        if self._map is not None:
+            self.sections=[]
+            self._names={}
+            self._view.release()
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # unmapped once the caller drops its views
+            self._map=None
+        if self._closefd:
+            os.close(self._fd)
+            self._closefd=False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_case_file(path):
+    """True if path starts with the binary case magic."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC))==MAGIC
+    except OSError:
+        return False
+
+
+def write_text(reader, writer):
+    """Render every section of reader to writer, sections on their own lines, final newline."""
+    for i,section in enumerate(reader):
+        if i:
+            writer.write(b'\n')
+        for chunk in section.text_chunks():
+            writer.write(chunk)
+    writer.write(b'\n')
+
+
+def to_text(src, dst):
+    """Convert the binary case at path src to text at path dst."""
+    with CaseReader.open(src) as reader, TokenWriter.open(dst) as writer:
+        write_text(reader, writer)
+
+
+def ensure_text(src, dst=None):
+    """
+    Text version of the binary case src (default path: src with a .txt suffix), converted
+    only when it is missing or older than src; returns its path. Call it right before a
+    case is handed to a solution.
+    """
+    if dst is None:
+        dst=os.path.splitext(src)[0]+'.txt'
+    try:
+        fresh=os.stat(dst).st_mtime_ns>=os.stat(src).st_mtime_ns
+    except FileNotFoundError:
+        fresh=False
+    if not fresh:
+        tmp=dst+'.tmp'
+        to_text(src, tmp)
+        os.replace(tmp, dst)
+    return dst
@@ -1,17 +1,23 @@
-import os,sys
+import mmap,os,stat,sys
 from io import BytesIO,IOBase
 
 BUFSIZ=8192
+# TokenReader splits at most this many bytes at a time
+WINDOW=1<<20
+READ_BLOCK=1<<20
+# bytes.split() separators
+_SPACE=frozenset(b' \t\n\r\x0b\x0c')
 class FastIO(IOBase):
     newlines=0
     def __init__(self,file):
         self._fd=file.fileno()
+        self._bufsize=max(os.fstat(self._fd).st_size,BUFSIZ)
         self.buffer=BytesIO()
         self.writable="n"in file.mode or "r" not in file.mode
         self.write=self.buffer.write if self.writable else None
     def read(self):
         while True:
-            b=os.read(self._fd,max(os.fstat(self._fd).st_size,BUFSIZ))
+            b=os.read(self._fd,self._bufsize)
             if not b:
                 break
             ptr=self.buffer.tell()
@@ -20,7 +26,7 @@ class FastIO(IOBase):
         return self.buffer.read()
     def readline(self):
         while self.newlines==0:
-            b=os.read(self._fd,max(os.fstat(self._fd).st_size, BUFSIZ))
+            b=os.read(self._fd,self._bufsize)
             self.newlines=b.count(b"\n")+(not b)
             ptr=self.buffer.tell()
             self.buffer.seek(0, 2),self.buffer.write(b),self.buffer.seek(ptr)
@@ -38,8 +44,117 @@ class IOWrapper(IOBase):
         self.write=lambda s:self.buffer.write(s.encode("ascii"))
         self.read=lambda:self.buffer.read().decode("ascii")
         self.readline=lambda:self.buffer.readline().decode("ascii")
-if sys.version_info[0]<3:
-    sys.stdin,sys.stdout=FastIO(sys.stdin),FastIO(sys.stdout)
-else:
+def install():
+    """Replace sys.stdin/sys.stdout with the buffered wrappers (opt-in; importing the module changes nothing)."""
     sys.stdin,sys.stdout=IOWrapper(sys.stdin),IOWrapper(sys.stdout)
-input=lambda:sys.stdin.readline().rstrip("\r\n")
\ No newline at end of file
+input=lambda:sys.stdin.readline().rstrip("\r\n")
+
+
+def _read_all(fd):
+    chunks=[]
+    while True:
+        b=os.read(fd,READ_BLOCK)
+        if not b:
+            return b''.join(chunks)
+        chunks.append(b)
+
+
+class TokenReader:
+    """
+    Whitespace separated tokens of a whole input, for checkers and validators.
+    Regular files are memory-mapped, anything else (pipes, terminals) is read with large
+    reads. Tokens are split a window of about WINDOW bytes at a time, so reading n
+    integers costs one bulk split and one map(int) per window instead of a copy per line.
+    """
+
+    def __init__(self, fd=0, closefd=False):
+        if not isinstance(fd, int):
+            fd=fd.fileno()
+        self._fd=fd
+        self._closefd=closefd
+        self._map=None
+        st=os.fstat(fd)
+        if stat.S_ISREG(st.st_mode) and st.st_size>0:
+            self._map=mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            self._data=self._map
+        else:
+            self._data=_read_all(fd)
+        self._size=len(self._data)
+        self._pos=0
+        self._tokens=[]
+        self._index=0
+
+    @classmethod
+    def open(cls, path):
+        """Reader over the file at path (closed with the reader)."""
+        return cls(os.open(path, os.O_RDONLY), closefd=True)
+
+    def _fill(self):
+        """Split the next window into self._tokens; False at end of input."""
+        data,pos,size=self._data,self._pos,self._size
+        while pos<size:
+            end=min(pos+WINDOW, size)
+            # never cut a token in two
+            while end<size and data[end] not in _SPACE:
+                end+=1
+            self._tokens=data[pos:end].split()
+            self._index=0
+            self._pos=pos=end
+            if self._tokens:
+                return True
+        return False
+
+    def read_tokens(self, k=None):
+        """Next k tokens as bytes (all remaining ones for k=None); EOFError if fewer are left."""
+        tokens,i=self._tokens,self._index
+        if k is None:
+            out=tokens[i:]+self._data[self._pos:].split()
+            self._tokens,self._index,self._pos=[],0,self._size
+            return out
+        if i+k<=len(tokens):
+            self._index=i+k
+            return tokens[i:i+k]
+        out=tokens[i:]
+        while len(out)<k:
+            if not self._fill():
+                raise EOFError(f'expected {k} tokens, input has {len(out)} left')
+            need=k-len(out)
+            out+=self._tokens[:need]
+            self._index=min(need, len(self._tokens))
+        return out
+
+    def read_token(self):
+        """Next token as bytes; EOFError at end of input."""
+        if self._index==len(self._tokens) and not self._fill():
+            raise EOFError('no tokens left')
+        self._index+=1
+        return self._tokens[self._index-1]
+
+    def read_ints(self, k=None):
+        """Next k tokens as ints (all remaining ones for k=None)."""
+        return list(map(int, self.read_tokens(k)))
+
+    def read_int(self):
+        return int(self.read_token())
+
+    def read_floats(self, k=None):
+        return list(map(float, self.read_tokens(k)))
+
+    def at_eof(self):
+        """True when no tokens are left (trailing whitespace is ignored)."""
+        return self._index==len(self._tokens) and not self._fill()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map=None
+        self._data=b''
+        if self._closefd:
+            os.close(self._fd)
+            self._closefd=False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,163 @@
+"""
+High-throughput text serialization for generated test cases.
+Tokens are converted in bulk with one %-format per batch, the encoded bytes are
+gathered in a reusable bytearray and flushed to the file descriptor in large blocks.
+"""
+
+import os
+from functools import lru_cache
+from itertools import chain
+
+BLOCK_SIZE=1<<20
+# values formatted per %-format call, bounds the temporary tuple/bytes size
+BATCH=1<<16
+
+
+@lru_cache(maxsize=64)
+def _pattern(fields, sep, end):
+    """%-format for a row of fields tokens (str() of each token, like print)."""
+    return sep.replace('%', '%%').join(['%s']*fields)+end.replace('%', '%%')
+
+
+def _decode(s):
+    return s.decode() if isinstance(s, (bytes, bytearray)) else s
+
+
+def _as_sequence(values):
+    """Lists stay as they are, arrays/ndarrays become lists, other iterables are materialized."""
+    if isinstance(values, (list, tuple)):
+        return values
+    if hasattr(values, 'tolist'):
+        return values.tolist()
+    return list(values)
+
+
+def format_tokens(values, sep=' ')->bytes:
+    """Join a sequence of tokens (ints, floats, strings) with sep, encoded."""
+    sep=_decode(sep)
+    values=_as_sequence(values)
+    out=[]
+    for start in range(0, len(values), BATCH):
+        part=values[start:start+BATCH]
+        out.append(_pattern(len(part), sep, '') % tuple(part))
+    return sep.join(out).encode()
+
+
+def format_columns(columns, sep=' ', end='\n')->bytes:
+    """One line per index of equally long columns (e.g. GraphBuffer u, v, w), no trailing newline."""
+    sep,end=_decode(sep),_decode(end)
+    k=len(columns)
+    m=len(columns[0]) if k else 0
+    out=[]
+    for start in range(0, m, BATCH):
+        stop=min(start+BATCH, m)
+        flat=[None]*((stop-start)*k)
+        for j,col in enumerate(columns):
+            flat[j::k]=col[start:stop]
+        out.append(_pattern(k, sep, end)*(stop-start) % tuple(flat))
+    data=''.join(out)
+    return (data[:-len(end)] if end else data).encode()
+
+
+def format_rows(rows, sep=' ', end='\n')->bytes:
+    """One line per row (edge tuple or matrix row), no trailing newline."""
+    if hasattr(rows, 'columns'):
+        return format_columns(rows.columns(), sep, end)
+    sep,end=_decode(sep),_decode(end)
+    rows=_as_sequence(rows)
+    out=[]
+    for start in range(0, len(rows), BATCH):
+        part=rows[start:start+BATCH]
+        widths=set(map(len, part))
+        if len(widths)==1:
+            out.append(_pattern(widths.pop(), sep, end)*len(part) % tuple(chain.from_iterable(part)))
+        else:
+            out.append(''.join(sep.join(map(str, row))+end for row in part))
+    data=''.join(out)
+    return (data[:-len(end)] if end else data).encode()
+
+
+class TokenWriter:
+    """
+    Buffered writer on a raw file descriptor.
+    Small writes are appended to a reusable bytearray; once it holds block_size bytes
+    (or a single write is that large) everything is pushed with one os.writev/os.write.
+    """
+
+    def __init__(self, fd=1, block_size=BLOCK_SIZE, closefd=False):
+        self._fd=fd
+        self._block=block_size
+        self._closefd=closefd
+        self._buf=bytearray()
+        self.bytes_written=0
+
+    @classmethod
+    def open(cls, filename, block_size=BLOCK_SIZE):
+        """Writer on a new (truncated) file."""
+        fd=os.open(filename, os.O_WRONLY|os.O_CREAT|os.O_TRUNC|getattr(os, 'O_BINARY', 0), 0o644)
+        return cls(fd, block_size, closefd=True)
+
+    def write(self, data):
+        """Write str or bytes-like data."""
+        if isinstance(data, str):
+            data=data.encode()
+        if len(data)>=self._block:
+            self._writev([self._buf, data])
+            self._buf.clear()
+            return
+        self._buf+=data
+        if len(self._buf)>=self._block:
+            self.flush()
+
+    def write_tokens(self, values, sep=' ', end='\n'):
+        """Write a sequence of tokens separated by sep, followed by end."""
+        self.write(format_tokens(values, sep))
+        self.write(end)
+
+    def write_rows(self, rows, sep=' ', end='\n'):
+        """Write edges or matrix rows, one per line, each followed by end."""
+        data=format_rows(rows, sep, end)
+        if data:
+            self.write(data)
+            self.write(end)
+
+    def write_parts(self, parts, separator=b'\n', end=b'\n'):
+        """Write chunks (e.g. from the streaming generators) joined by separator, followed by end."""
+        first=True
+        for part in parts:
+            if not first:
+                self.write(separator)
+            self.write(part)
+            first=False
+        self.write(end)
+
+    def flush(self):
+        if self._buf:
+            self._writev([self._buf])
+            self._buf.clear()
+
+    def _writev(self, parts):
+        parts=[memoryview(p) for p in parts if len(p)]
+        while parts:
+            if hasattr(os, 'writev') and len(parts)>1:
+                n=os.writev(self._fd, parts)
+            else:
+                n=os.write(self._fd, parts[0])
+            self.bytes_written+=n
+            # drop fully written parts, keep the unwritten tail of a partial one
+            while parts and n>=len(parts[0]):
+                n-=len(parts[0])
+                parts.pop(0)
+            if parts and n:
+                parts[0]=parts[0][n:]
+
+    def close(self):
+        self.flush()
+        if self._closefd:
+            os.close(self._fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
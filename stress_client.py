@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Thin client for `stress_testing.py serve`.
+Takes the same arguments as the generator subcommands of stress_testing.py and has the
+warm server run them with this process' stdin/stdout/stderr. When no server is
+listening the command runs in-process instead, so scripts work either way.
+"""
+
+import sys
+
+from src.server import request
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        return request(argv)
+    except (FileNotFoundError, ConnectionRefusedError):
+        from stress_testing import main as run_locally
+        run_locally(argv)
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
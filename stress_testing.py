@@ -1,16 +1,50 @@
 import os
 import sys
 import argparse
-import platform
+import importlib
+import time
+from functools import lru_cache, partial
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from generators.generate_arrays import gen_arrays
-from generators.generate_numbers import gen_numbers
 from generators.generate_strings import gen_strings, CaseType
-from generators.generate_graphs import gen_graphs
+from Hashings.backends import SEEDED_BACKEND, available_backends, derive_seed, get_random
+from src.utils.writer import TokenWriter, format_rows, format_tokens
+
+# Generator classes and the run/batch/bench/spec/serve modules are imported on first
+# use, so a one-off CLI call only pays for the modules it actually needs.
+
+
+class _LazyImport:
+    """Placeholder for a module level name; the first attribute access imports it and replaces it."""
+    
+    def __init__(self, name, module, attr=None):
+        self._name = name
+        self._module = module
+        self._attr = attr
+    
+    def _resolve(self):
+        obj = importlib.import_module(self._module)
+        if self._attr is not None:
+            obj = getattr(obj, self._attr)
+        globals()[self._name] = obj
+        return obj
+    
+    def __getattr__(self, item):
+        return getattr(self._resolve(), item)
+
+
+gen_arrays = _LazyImport('gen_arrays', 'generators.generate_arrays', 'gen_arrays')
+gen_numbers = _LazyImport('gen_numbers', 'generators.generate_numbers', 'gen_numbers')
+gen_graphs = _LazyImport('gen_graphs', 'generators.generate_graphs', 'gen_graphs')
+bench = _LazyImport('bench', 'src.bench')
+cache = _LazyImport('cache', 'src.cache')
+spec = _LazyImport('spec', 'src.spec')
+
+
+GENERATOR_COMMANDS = ('array', 'number', 'string', 'graph', 'spec')
 
 
 class StressTestGenerator:
@@ -25,44 +59,49 @@ class StressTestGenerator:
     # ==================== ARRAY GENERATORS ====================
     
     @staticmethod
-    def random_array(size, min_val, max_val, unique=False, sorted_=False):
+    def random_array(size, min_val, max_val, unique=False, sorted_=False, rng=None):
         """Generate a random array."""
-        return gen_arrays.random(size, min_val, max_val, unique=unique, sorted_=sorted_)
+        return gen_arrays.random(size, min_val, max_val, unique=unique, sorted_=sorted_, rng=rng)
+    
+    @staticmethod
+    def iter_random_array(size, min_val, max_val, rng=None):
+        """Generate a random array as a stream of chunks."""
+        return gen_arrays.iter_random(size, min_val, max_val, rng=rng)
     
     @staticmethod
-    def permutation(n):
+    def permutation(n, rng=None):
         """Generate a random permutation of 1 to n."""
-        return gen_arrays.permutation(n)
+        return gen_arrays.permutation(n, rng=rng)
     
     @staticmethod
-    def matrix(rows, cols, min_val, max_val):
+    def matrix(rows, cols, min_val, max_val, rng=None):
         """Generate a random matrix."""
-        return gen_arrays.matrix(rows, cols, min_val, max_val)
+        return gen_arrays.matrix(rows, cols, min_val, max_val, rng=rng)
     
     @staticmethod
-    def pairs(count, min_l, max_l, min_r, max_r, ordered=False):
+    def pairs(count, min_l, max_l, min_r, max_r, ordered=False, rng=None):
         """Generate random pairs."""
-        return gen_arrays.pairs(count, min_l, max_l, min_r, max_r, ordered=ordered)
+        return gen_arrays.pairs(count, min_l, max_l, min_r, max_r, ordered=ordered, rng=rng)
     
     @staticmethod
-    def subset(min_val, max_val, size, sorted_=False):
+    def subset(min_val, max_val, size, sorted_=False, rng=None):
         """Generate a random subset."""
-        return gen_arrays.subset(min_val, max_val, size, sorted_=sorted_)
+        return gen_arrays.subset(min_val, max_val, size, sorted_=sorted_, rng=rng)
     
     @staticmethod
-    def partition(total, parts, min_val, max_val):
-        """Partition a sum into k parts."""
-        return gen_arrays.partition(total, parts, min_val, max_val)
+    def partition(total, parts, min_val, max_val, rng=None, uniform=False):
+        """Partition a sum into k parts (uniform=True: uniformly among all such partitions)."""
+        return gen_arrays.partition(total, parts, min_val, max_val, rng=rng, uniform=uniform)
     
     @staticmethod
-    def strictly_increasing(size, start, min_step, max_step):
+    def strictly_increasing(size, start, min_step, max_step, rng=None):
         """Generate strictly increasing sequence."""
-        return gen_arrays.strictly_increasing(size, start, min_step, max_step)
+        return gen_arrays.strictly_increasing(size, start, min_step, max_step, rng=rng)
     
     @staticmethod
-    def strictly_decreasing(size, start, min_step, max_step):
+    def strictly_decreasing(size, start, min_step, max_step, rng=None):
         """Generate strictly decreasing sequence."""
-        return gen_arrays.strictly_decreasing(size, start, min_step, max_step)
+        return gen_arrays.strictly_decreasing(size, start, min_step, max_step, rng=rng)
     
     @staticmethod
     def arithmetic_sequence(size, start, step):
@@ -77,132 +116,173 @@ class StressTestGenerator:
     # ==================== NUMBER GENERATORS ====================
     
     @staticmethod
-    def random_int(min_val, max_val):
+    def random_int(min_val, max_val, rng=None):
         """Generate a random integer."""
-        return gen_numbers.random_int(min_val, max_val)
+        return gen_numbers.random_int(min_val, max_val, rng=rng)
     
     @staticmethod
-    def random_float(min_val, max_val):
+    def random_float(min_val, max_val, rng=None):
         """Generate a random float."""
-        return gen_numbers.random_real(min_val, max_val)
+        return gen_numbers.random_real(min_val, max_val, rng=rng)
     
     @staticmethod
-    def random_numbers(min_val, max_val, count):
+    def random_numbers(min_val, max_val, count, rng=None):
         """Generate multiple random numbers."""
-        return gen_numbers.random_range(min_val, max_val, count)
+        return gen_numbers.random_range(min_val, max_val, count, rng=rng)
     
     @staticmethod
-    def random_exclude(min_val, max_val, exclude_set):
+    def random_exclude(min_val, max_val, exclude_set, rng=None):
         """Generate random number excluding certain values."""
-        return gen_numbers.random_exclude(min_val, max_val, exclude_set)
+        return gen_numbers.random_exclude(min_val, max_val, exclude_set, rng=rng)
     
     @staticmethod
-    def weighted_choice(values, weights):
+    def weighted_choice(values, weights, rng=None):
         """Choose from weighted distribution."""
-        return gen_numbers.random_weighted(values, weights)
+        return gen_numbers.random_weighted(values, weights, rng=rng)
     
     # ==================== STRING GENERATORS ====================
     
     @staticmethod
-    def random_string(length, case_type=CaseType.Mixed):
+    def random_string(length, case_type=CaseType.Mixed, rng=None):
         """Generate random string."""
-        return gen_strings.random(length, case_type)
+        return gen_strings.random(length, case_type, rng=rng)
     
     @staticmethod
-    def random_palindrome(length, case_type=CaseType.Lower):
+    def random_palindrome(length, case_type=CaseType.Lower, rng=None):
         """Generate random palindrome."""
-        return gen_strings.palindrome(length, case_type)
+        return gen_strings.palindrome(length, case_type, rng=rng)
     
     @staticmethod
-    def random_alphanum(length, case_type=CaseType.Mixed):
+    def random_alphanum(length, case_type=CaseType.Mixed, rng=None):
         """Generate alphanumeric string."""
-        return gen_strings.random_alphanum(length, True, True, case_type)
+        return gen_strings.random_alphanum(length, True, True, case_type, rng=rng)
     
     @staticmethod
-    def random_from_alphabet(length, alphabet):
+    def random_from_alphabet(length, alphabet, rng=None):
         """Generate string from custom alphabet."""
-        return gen_strings.random_custom(length, alphabet)
+        return gen_strings.random_custom(length, alphabet, rng=rng)
     
     @staticmethod
-    def multiple_strings(count, length, case_type=CaseType.Mixed):
+    def multiple_strings(count, length, case_type=CaseType.Mixed, rng=None):
         """Generate multiple random strings."""
-        return gen_strings.random_strings(count, length, case_type)
+        return gen_strings.random_strings(count, length, case_type, rng=rng)
     
     # ==================== GRAPH GENERATORS ====================
     
     @staticmethod
-    def tree(n_nodes, zero_based=False):
+    def tree(n_nodes, zero_based=False, rng=None, as_buffer=False):
         """Generate random tree."""
-        return gen_graphs.tree(n_nodes, zero_based=zero_based)
+        return gen_graphs.tree(n_nodes, zero_based=zero_based, rng=rng, as_buffer=as_buffer)
     
     @staticmethod
-    def simple_graph(n_nodes, n_edges, zero_based=False):
+    def iter_tree(n_nodes, zero_based=False, rng=None):
+        """Generate random tree as a stream of edge chunks."""
+        return gen_graphs.iter_tree(n_nodes, zero_based=zero_based, rng=rng)
+    
+    @staticmethod
+    def iter_simple_graph(n_nodes, n_edges, zero_based=False, rng=None):
+        """Generate random simple graph as a stream of edge chunks."""
+        return gen_graphs.iter_simple_graph(n_nodes, n_edges, zero_based=zero_based, rng=rng)
+    
+    @staticmethod
+    def simple_graph(n_nodes, n_edges, zero_based=False, rng=None, as_buffer=False):
         """Generate random simple graph."""
-        return gen_graphs.simple_graph(n_nodes, n_edges, zero_based=zero_based)
+        return gen_graphs.simple_graph(n_nodes, n_edges, zero_based=zero_based, rng=rng, as_buffer=as_buffer)
     
     @staticmethod
-    def weighted_graph(n_nodes, n_edges, min_weight, max_weight, zero_based=False):
+    def weighted_graph(n_nodes, n_edges, min_weight, max_weight, zero_based=False, rng=None, as_buffer=False):
         """Generate random weighted graph."""
-        return gen_graphs.weighted_graph(n_nodes, n_edges, min_weight, max_weight, zero_based=zero_based)
+        return gen_graphs.weighted_graph(n_nodes, n_edges, min_weight, max_weight, zero_based=zero_based, rng=rng, as_buffer=as_buffer)
     
     @staticmethod
-    def directed_graph(n_nodes, n_edges, zero_based=False):
+    def directed_graph(n_nodes, n_edges, zero_based=False, rng=None, as_buffer=False):
         """Generate random directed graph."""
-        return gen_graphs.directed_graph(n_nodes, n_edges, zero_based=zero_based)
+        return gen_graphs.directed_graph(n_nodes, n_edges, zero_based=zero_based, rng=rng, as_buffer=as_buffer)
     
     @staticmethod
-    def dag(n_nodes, n_edges, zero_based=False):
+    def dag(n_nodes, n_edges, zero_based=False, rng=None, as_buffer=False):
         """Generate random DAG (Directed Acyclic Graph)."""
-        return gen_graphs.dag(n_nodes, n_edges, zero_based=zero_based)
+        return gen_graphs.dag(n_nodes, n_edges, zero_based=zero_based, rng=rng, as_buffer=as_buffer)
     
     @staticmethod
-    def bipartite_graph(n1, n2, n_edges, zero_based=False):
+    def bipartite_graph(n1, n2, n_edges, zero_based=False, rng=None, as_buffer=False):
         """Generate random bipartite graph."""
-        return gen_graphs.bipartite(n1, n2, n_edges, zero_based=zero_based)
+        return gen_graphs.bipartite(n1, n2, n_edges, zero_based=zero_based, rng=rng, as_buffer=as_buffer)
     
     @staticmethod
-    def cycle(n_nodes, zero_based=False):
+    def cycle(n_nodes, zero_based=False, rng=None, as_buffer=False):
         """Generate cycle graph."""
-        return gen_graphs.cycle(n_nodes, zero_based=zero_based)
+        return gen_graphs.cycle(n_nodes, zero_based=zero_based, rng=rng, as_buffer=as_buffer)
     
     @staticmethod
-    def star_graph(n_nodes, center=1, zero_based=False):
+    def star_graph(n_nodes, center=1, zero_based=False, rng=None, as_buffer=False):
         """Generate star graph."""
-        return gen_graphs.star(n_nodes, center, zero_based=zero_based)
+        return gen_graphs.star(n_nodes, center, zero_based=zero_based, rng=rng, as_buffer=as_buffer)
     
     @staticmethod
-    def complete_graph(n_nodes, zero_based=False):
+    def complete_graph(n_nodes, zero_based=False, as_buffer=False):
         """Generate complete graph."""
-        return gen_graphs.complete(n_nodes, zero_based=zero_based)
+        return gen_graphs.complete(n_nodes, zero_based=zero_based, as_buffer=as_buffer)
     
     # ==================== OUTPUT FUNCTIONS ====================
     
     @staticmethod
     def format_array(arr, separator=' '):
         """Format array for output."""
-        return separator.join(map(str, arr))
+        return format_tokens(arr, separator).decode()
     
     @staticmethod
     def format_matrix(matrix, separator=' '):
         """Format matrix for output."""
-        return '\n'.join(StressTestGenerator.format_array(row, separator) for row in matrix)
+        return format_rows(matrix, separator).decode()
     
     @staticmethod
     def format_edges(edges, separator=' '):
         """Format edges for output."""
-        lines = []
-        for edge in edges:
-            if isinstance(edge, tuple) and len(edge) == 2:
-                lines.append(f"{edge[0]}{separator}{edge[1]}")
-            elif isinstance(edge, tuple) and len(edge) == 3:
-                lines.append(f"{edge[0]}{separator}{edge[1]}{separator}{edge[2]}")
-        return '\n'.join(lines)
+        return format_rows(edges, separator).decode()
+    
+    @staticmethod
+    def stream_output(parts, separator=b'\n', filename=None):
+        """Write encoded chunks joined by separator to stdout, or only to filename when given."""
+        if filename:
+            writer = TokenWriter.open(filename)
+        else:
+            sys.stdout.flush()
+            writer = TokenWriter(sys.stdout.fileno())
+        with writer:
+            writer.write_parts(parts, separator)
+        if filename:
+            print(f"✓ Saved to {filename}")
+    
+    @staticmethod
+    def cached(method, *args, seed, backend=None, case_cache=None, **kwargs):
+        """
+        Seeded call of one of the methods above, memoized (pickled) in the on-disk case cache.
+        Unpickling runs code, so only use a cache directory that no one else can write to:
+        entries owned by another user are ignored and regenerated.
+        """
+        import pickle
+        backend = backend or SEEDED_BACKEND
+        case_cache = case_cache or cache.CaseCache()
+        key = cache.case_key('method:' + method, {'args': args, **kwargs}, backend, seed)
+        fd = case_cache.open(key)
+        if fd is not None and hasattr(os, 'getuid') and os.fstat(fd).st_uid != os.getuid():
+            os.close(fd)
+            fd = None
+        if fd is not None:
+            with os.fdopen(fd, 'rb') as f:
+                return pickle.load(f)
+        result = getattr(StressTestGenerator, method)(*args, rng=get_random(backend, seed), **kwargs)
+        with case_cache.store(key) as writer:
+            pickle.dump(result, writer, pickle.HIGHEST_PROTOCOL)
+        case_cache.evict()
+        return result
     
     @staticmethod
     def save_to_file(content, filename):
         """Save generated data to file."""
-        with open(filename, 'w') as f:
-            f.write(content)
+        with TokenWriter.open(filename) as writer:
+            writer.write(content)
         print(f"✓ Saved to {filename}")
     
     @staticmethod
@@ -212,8 +292,12 @@ class StressTestGenerator:
             return f.read()
 
 
-def main():
-    """Command-line interface for stress testing."""
+def build_parser():
+    """Argument parser with one subcommand per generator plus run, batch, bench and serve."""
+    # both modules defer their heavy imports (subprocess, concurrent.futures) to first use
+    from src.batch import DEFAULT_NAME
+    from src.runner import COMPARE_MODES
+    
     parser = argparse.ArgumentParser(
         description='PyStress - Stress Testing Data Generator',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -223,13 +307,32 @@ Examples:
   python stress_testing.py tree --nodes 5
   python stress_testing.py string --length 15
   python stress_testing.py graph --type simple --nodes 6 --edges 10
+  python stress_testing.py array --size 10 --seed 42
+  python stress_testing.py spec problem.json --seed 1
+  python stress_testing.py run --ref ./brute --cand ./sol --cases 1000 -- graph --type tree --nodes 8
+  python stress_testing.py batch --count 500 --out-dir tests --seed 1 -- array --size 100000
+  python stress_testing.py bench --sizes 1e3 1e5 --json bench.json --baseline baseline.json
         '''
     )
     
+    # Options shared by every generator subcommand
+    rng_parser = argparse.ArgumentParser(add_help=False)
+    rng_parser.add_argument('--seed', type=int, help='Seed for a reproducible test case (implies --backend fast)')
+    rng_parser.add_argument('--backend', choices=available_backends(), help='Random backend (default: secure, or fast when seeded)')
+    rng_parser.add_argument('--cache', nargs='?', const='', metavar='DIR',
+                            help='Serve seeded cases from an on-disk cache (default DIR: $CPSTRESS_CACHE_DIR or ~/.cache/cpstress); '
+                                 'anyone who can write to DIR controls the cached cases')
+    rng_parser.add_argument('--cache-size', default='2G', help='Cache size cap, least recently used cases are evicted (default: %(default)s)')
+    rng_parser.add_argument('--binary', action='store_true',
+                            help='Write the binary case format (src/utils/casefile.py) to --output; see the convert subcommand')
+    rng_parser.add_argument('--profile', action='store_true', help='Print RNG usage, retries and generate/format/write times to stderr')
+    rng_parser.add_argument('--profile-json', metavar='FILE', help='Write the profile report as JSON (implies --profile)')
+    rng_parser.add_argument('--profile-dump', metavar='FILE', help='Write cProfile stats for pstats/snakeviz (implies --profile)')
+    
     subparsers = parser.add_subparsers(dest='command', help='Generator type')
     
     # Array subcommand
-    array_parser = subparsers.add_parser('array', help='Generate random array')
+    array_parser = subparsers.add_parser('array', parents=[rng_parser], help='Generate random array')
     array_parser.add_argument('--size', type=int, default=10, help='Array size')
     array_parser.add_argument('--min', type=int, default=1, help='Minimum value')
     array_parser.add_argument('--max', type=int, default=100, help='Maximum value')
@@ -238,81 +341,470 @@ Examples:
     array_parser.add_argument('--output', help='Save to file')
     
     # Number subcommand
-    num_parser = subparsers.add_parser('number', help='Generate random number')
+    num_parser = subparsers.add_parser('number', parents=[rng_parser], help='Generate random number')
     num_parser.add_argument('--min', type=int, default=1, help='Minimum')
     num_parser.add_argument('--max', type=int, default=100, help='Maximum')
     num_parser.add_argument('--count', type=int, default=1, help='Count')
     num_parser.add_argument('--output', help='Save to file')
     
     # String subcommand
-    str_parser = subparsers.add_parser('string', help='Generate random string')
+    str_parser = subparsers.add_parser('string', parents=[rng_parser], help='Generate random string')
     str_parser.add_argument('--length', type=int, default=10, help='String length')
     str_parser.add_argument('--case', choices=['lower', 'upper', 'mixed'], default='mixed')
     str_parser.add_argument('--count', type=int, default=1, help='Number of strings')
     str_parser.add_argument('--output', help='Save to file')
     
     # Graph subcommand
-    graph_parser = subparsers.add_parser('graph', help='Generate random graph')
+    graph_parser = subparsers.add_parser('graph', parents=[rng_parser], help='Generate random graph')
     graph_parser.add_argument('--type', choices=['tree', 'simple', 'weighted', 'directed', 'dag', 'bipartite'], default='simple')
     graph_parser.add_argument('--nodes', type=int, default=5, help='Number of nodes')
     graph_parser.add_argument('--edges', type=int, default=8, help='Number of edges')
     graph_parser.add_argument('--min-weight', type=int, default=1, help='Min edge weight')
     graph_parser.add_argument('--max-weight', type=int, default=10, help='Max edge weight')
+    graph_parser.add_argument('--stream', action='store_true', help='Stream simple graphs in chunks (edges shuffled per chunk only)')
     graph_parser.add_argument('--output', help='Save to file')
     
-    args = parser.parse_args()
-    
-    gen = StressTestGenerator()
-    result = None
-    
+    # Spec subcommand: multi-section input described by a JSON spec
+    spec_parser = subparsers.add_parser('spec', parents=[rng_parser], help='Generate a test case from a JSON spec')
+    spec_parser.add_argument('spec', help='Spec file (see src/spec.py)')
+    spec_parser.add_argument('--output', help='Save to file')
+    
+    # Convert subcommand
+    convert_parser = subparsers.add_parser('convert', help='Convert a binary case (--binary) to the text format')
+    convert_parser.add_argument('input', help='Binary case file')
+    convert_parser.add_argument('--output', help='Text file (default: stdout)')
+    
+    # Run subcommand: differential testing of two programs on generated cases
+    run_parser = subparsers.add_parser('run', help='Compare a reference and a candidate program on generated cases',
+                                       usage='%(prog)s --ref CMD --cand CMD [options] -- GENERATOR [generator options]')
+    run_parser.add_argument('--ref', required=True, help='Reference (brute force) command')
+    run_parser.add_argument('--cand', required=True, help='Candidate command')
+    run_parser.add_argument('--cases', type=int, help='Number of cases (default: until the first mismatch)')
+    run_parser.add_argument('--jobs', type=int, help='Parallel workers (default: all cores)')
+    run_parser.add_argument('--timeout', type=float, default=5.0, help='Time limit per program run in seconds')
+    run_parser.add_argument('--compare', choices=COMPARE_MODES, default='tokens', help='Output comparison')
+    run_parser.add_argument('--eps', type=float, default=1e-6, help='Tolerance for --compare float')
+    run_parser.add_argument('--seed', type=int, help='Master seed; case seeds are derived from it')
+    run_parser.add_argument('--save-dir', default='stress_failure', help='Directory for the failing case')
+    run_parser.add_argument('--shrink', action='store_true', help='Minimize the failing case before saving it')
+    run_parser.add_argument('generator', nargs=argparse.REMAINDER, help='Generator subcommand and its options')
+    
+    # Batch subcommand: many test files at once on a process pool
+    batch_parser = subparsers.add_parser('batch', help='Write many generated cases to a directory in parallel',
+                                         usage='%(prog)s --count N --out-dir DIR [options] -- GENERATOR [generator options]')
+    batch_parser.add_argument('--count', type=int, required=True, help='Number of cases')
+    batch_parser.add_argument('--out-dir', required=True, help='Output directory')
+    batch_parser.add_argument('--name', default=DEFAULT_NAME, help='File name pattern with an {index} field (default: %(default)s)')
+    batch_parser.add_argument('--jobs', type=int, help='Worker processes (default: all cores)')
+    batch_parser.add_argument('--seed', type=int, help='Master seed; the same seed always gives the same files')
+    batch_parser.add_argument('generator', nargs=argparse.REMAINDER, help='Generator subcommand and its options')
+    
+    # Bench subcommand: throughput of every generator and formatter
+    bench_parser = subparsers.add_parser('bench', help='Benchmark the generators')
+    bench_parser.add_argument('--sizes', type=lambda x: int(float(x)), nargs='+',
+                              help='Size tiers, e.g. 1e3 1e5 1e7 (default: 1e3 1e4 1e5)')
+    bench_parser.add_argument('--filter', nargs='+', help='Only benchmarks whose name contains one of these')
+    bench_parser.add_argument('--json', help='Write the results to this JSON file')
+    bench_parser.add_argument('--baseline', help='Compare against a saved JSON report')
+    bench_parser.add_argument('--threshold', type=float,
+                              help='Report a regression below (1 - threshold) x baseline throughput (default: 0.3)')
+    bench_parser.add_argument('--min-time', type=float, help='Repeat each measurement for at least this long (default: 0.1s)')
+    bench_parser.add_argument('--seed', type=int, default=0, help='Seed of the fast backend used by every benchmark')
+    bench_parser.add_argument('--no-isolate', action='store_true', help='Run in-process (peak RSS is then process-wide)')
+
+    # Serve subcommand: warm generator process for stress_client.py
+    serve_parser = subparsers.add_parser('serve', help='Serve generator commands on a Unix socket (see stress_client.py)')
+    serve_parser.add_argument('--socket', help='Socket path (default: $CPSTRESS_SOCKET or a per-user path in /tmp)')
+
+    return parser
+
+
+def generate_case(gen, args, rng, as_buffer=False):
+    """
+    Build the test case described by parsed generator args: (encoded chunks, separator).
+    as_buffer=True returns the unformatted GraphBuffer instead for non-streamed graphs.
+    """
     if args.command == 'array':
-        result = gen.random_array(
-            args.size, args.min, args.max,
-            unique=args.unique, sorted_=args.sorted
-        )
-        output = gen.format_array(result)
+        if args.unique or args.sorted:
+            result = gen.random_array(
+                args.size, args.min, args.max,
+                unique=args.unique, sorted_=args.sorted, rng=rng
+            )
+            return [format_tokens(result)], b'\n'
+        chunks = gen.iter_random_array(args.size, args.min, args.max, rng=rng)
+        return map(format_tokens, chunks), b' '
         
     elif args.command == 'number':
         if args.count == 1:
-            result = gen.random_int(args.min, args.max)
-            output = str(result)
-        else:
-            result = gen.random_numbers(args.min, args.max, args.count)
-            output = gen.format_array(result)
+            result = gen.random_int(args.min, args.max, rng=rng)
+            return [str(result).encode()], b'\n'
+        result = gen.random_numbers(args.min, args.max, args.count, rng=rng)
+        return [format_tokens(result)], b'\n'
             
     elif args.command == 'string':
         case_map = {'lower': CaseType.Lower, 'upper': CaseType.Upper, 'mixed': CaseType.Mixed}
         if args.count == 1:
-            result = gen.random_string(args.length, case_map[args.case])
-            output = result
-        else:
-            result = gen.multiple_strings(args.count, args.length, case_map[args.case])
-            output = '\n'.join(result)
+            result = gen.random_string(args.length, case_map[args.case], rng=rng)
+            return [result.encode()], b'\n'
+        result = gen.multiple_strings(args.count, args.length, case_map[args.case], rng=rng)
+        return [s.encode() for s in result], b'\n'
             
     elif args.command == 'graph':
         if args.type == 'tree':
-            result = gen.tree(args.nodes)
-        elif args.type == 'simple':
-            result = gen.simple_graph(args.nodes, args.edges)
+            return map(format_rows, gen.iter_tree(args.nodes, rng=rng)), b'\n'
+        if args.type == 'simple' and args.stream:
+            return map(format_rows, gen.iter_simple_graph(args.nodes, args.edges, rng=rng)), b'\n'
+        if args.type == 'simple':
+            result = gen.simple_graph(args.nodes, args.edges, rng=rng, as_buffer=True)
         elif args.type == 'weighted':
-            result = gen.weighted_graph(args.nodes, args.edges, args.min_weight, args.max_weight)
+            result = gen.weighted_graph(args.nodes, args.edges, args.min_weight, args.max_weight, rng=rng, as_buffer=True)
         elif args.type == 'directed':
-            result = gen.directed_graph(args.nodes, args.edges)
+            result = gen.directed_graph(args.nodes, args.edges, rng=rng, as_buffer=True)
         elif args.type == 'dag':
-            result = gen.dag(args.nodes, args.edges)
+            result = gen.dag(args.nodes, args.edges, rng=rng, as_buffer=True)
         elif args.type == 'bipartite':
-            result = gen.bipartite_graph(args.nodes // 2, args.nodes - args.nodes // 2, args.edges)
-        
-        output = gen.format_edges(result)
+            result = gen.bipartite_graph(args.nodes // 2, args.nodes - args.nodes // 2, args.edges, rng=rng, as_buffer=True)
+        if as_buffer:
+            return result, None
+        return [format_rows(result)], b'\n'
+    
+    elif args.command == 'spec':
+        return load_plan(args.spec).run(rng, strip_final_newline=True), b''
     
+    raise ValueError(f"Unknown generator: {args.command}")
+
+
+def generate_binary(gen, args, rng, writer):
+    """Write the case described by parsed generator args as sections of a CaseWriter (same values as generate_case)."""
+    from src.utils.casefile import int_typecode
+    if args.command == 'array':
+        if args.unique or args.sorted:
+            writer.array('array', gen.random_array(args.size, args.min, args.max,
+                                                   unique=args.unique, sorted_=args.sorted, rng=rng))
+        else:
+            writer.array_chunks('array', gen.iter_random_array(args.size, args.min, args.max, rng=rng),
+                                int_typecode(args.min, args.max))
+    elif args.command == 'number':
+        if args.count == 1:
+            writer.scalars('number', [gen.random_int(args.min, args.max, rng=rng)])
+        else:
+            writer.array('numbers', gen.random_numbers(args.min, args.max, args.count, rng=rng))
+    elif args.command == 'string':
+        case_map = {'lower': CaseType.Lower, 'upper': CaseType.Upper, 'mixed': CaseType.Mixed}
+        if args.count == 1:
+            writer.strings('strings', [gen.random_string(args.length, case_map[args.case], rng=rng)])
+        else:
+            writer.strings('strings', gen.multiple_strings(args.count, args.length, case_map[args.case], rng=rng))
+    elif args.command == 'graph':
+        node_code = int_typecode(0, args.nodes)
+        if args.type == 'tree':
+            writer.edge_chunks('edges', gen.iter_tree(args.nodes, rng=rng), node_code)
+        elif args.type == 'simple' and args.stream:
+            writer.edge_chunks('edges', gen.iter_simple_graph(args.nodes, args.edges, rng=rng), node_code)
+        else:
+            parts, _ = generate_case(gen, args, rng, as_buffer=True)
+            writer.edges('edges', parts)
     else:
+        raise ValueError(f"--binary is not supported for {args.command}")
+
+
+@lru_cache(maxsize=None)
+def load_plan(path):
+    """Compiled spec, loaded once per process (run/batch generate many cases from it)."""
+    return spec.load_spec(path)
+
+
+def case_bytes(parts, separator=b'\n'):
+    """Join generated chunks into one test case, exactly as stream_output would write it."""
+    return separator.join(parts) + b'\n'
+
+
+def parse_generator_args(parser, args):
+    """Parse the generator subcommand given after -- to run/batch: (argv, namespace)."""
+    gen_argv = args.generator[1:] if args.generator[:1] == ['--'] else args.generator
+    if not gen_argv:
+        parser.error(f'{args.command}: missing generator subcommand after --')
+    gen_args = parser.parse_args(gen_argv)
+    if gen_args.command not in GENERATOR_COMMANDS:
+        parser.error(f'{args.command}: expected a generator subcommand ({", ".join(GENERATOR_COMMANDS)})')
+    if gen_args.seed is not None or gen_args.backend is not None:
+        print(f"{args.command}: generator --seed/--backend are ignored, cases use seeds derived from the master seed", file=sys.stderr)
+    if gen_args.cache is not None:
+        print(f"{args.command}: generator --cache is ignored", file=sys.stderr)
+    if gen_args.binary and args.command == 'run':
+        parser.error('run: programs read text cases, drop --binary')
+    if gen_args.binary and gen_args.command == 'spec':
+        parser.error(f'{args.command}: --binary is not supported for spec')
+    return gen_argv, gen_args
+
+
+# options that do not change the bytes of a case
+_OUTPUT_OPTIONS = frozenset(('command', 'output', 'cache', 'cache_size', 'seed', 'backend',
+                             'profile', 'profile_json', 'profile_dump'))
+
+
+def cached_output(gen, args, rng):
+    """Write the case for args through the cache: copied from disk on a hit, generated and stored on a miss."""
+    options = {k: v for k, v in vars(args).items() if k not in _OUTPUT_OPTIONS}
+    # a spec case depends on the spec's contents, not its file name
+    extra = (Path(options.pop('spec')).read_bytes(),) if args.command == 'spec' else ()
+    key = cache.case_key(args.command, options, args.backend or SEEDED_BACKEND, args.seed, *extra)
+    case_cache = cache.CaseCache(args.cache or None, cache.parse_size(args.cache_size))
+    generate = lambda writer: writer.write_parts(*generate_case(gen, args, rng))
+    if args.output:
+        fd = os.open(args.output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            hit = case_cache.fetch(key, generate, fd)
+        finally:
+            os.close(fd)
+        print(f"✓ Saved to {args.output}" + (" (cached)" if hit else ""))
+    else:
+        sys.stdout.flush()
+        case_cache.fetch(key, generate, sys.stdout.fileno())
+
+
+def binary_case(gen, args, rng, path):
+    """Write the case for parsed generator args to path in the binary format."""
+    from src.utils.casefile import CaseWriter
+    with CaseWriter.open(path) as writer:
+        generate_binary(gen, args, rng, writer)
+    return path
+
+
+def output_case(gen, args, rng):
+    """Generate the case for parsed generator args and write it to --output or stdout."""
+    if args.binary:
+        binary_case(gen, args, rng, args.output)
+        print(f"✓ Saved to {args.output}")
+    elif args.cache is not None:
+        cached_output(gen, args, rng)
+    else:
+        parts, separator = generate_case(gen, args, rng)
+        gen.stream_output(parts, separator, args.output)
+
+
+def profiled_output(gen, args, rng):
+    """output_case under the profiler (src/profiler.py); the report goes to stderr."""
+    from src.profiler import Profiler
+    from src.utils import writer
+    profiler = Profiler(cprofile=args.profile_dump is not None)
+    classes = [(name, getattr(globals()[name], '_resolve', lambda: globals()[name])())
+               for name in ('gen_arrays', 'gen_numbers', 'gen_strings', 'gen_graphs')]
+    namespaces = [globals()]
+    if args.command == 'spec':
+        namespaces.append(vars(importlib.import_module('src.spec')))
+    copiers = [(importlib.import_module('src.cache'), 'copy_fd')] if args.cache is not None else []
+    with profiler.session(rng, classes, namespaces, [writer.TokenWriter], copiers) as timed_rng:
+        output_case(gen, args, timed_rng)
+    sys.stdout.flush()
+    print(profiler.table(), file=sys.stderr)
+    if args.profile_json:
+        profiler.save_json(args.profile_json)
+    if args.profile_dump:
+        profiler.dump_stats(args.profile_dump)
+
+
+def master_seed(args):
+    """The --seed of run/batch, or a fresh random one (reported on stderr either way)."""
+    seed = args.seed if args.seed is not None else get_random().getrandbits(63)
+    print(f"seed: {seed}", file=sys.stderr)
+    return seed
+
+
+def cli_case(gen_args, rng):
+    """Case function for write_batch: generate the case described by gen_args (a path writer for --binary)."""
+    if gen_args.binary:
+        return partial(binary_case, StressTestGenerator(), gen_args, rng)
+    return generate_case(StressTestGenerator(), gen_args, rng)
+
+
+def shrink_case(shrinker, gen_args, data):
+    """Minimize a failing case produced by the generator described by gen_args."""
+    from src.shrink import render_array, render_edges, render_string
+    if gen_args.command == 'spec':
+        # sections of a spec depend on each other (counts, sizes), only whole cases are kept
+        return data
+    if gen_args.command in ('array', 'number'):
+        return render_array(shrinker.shrink_array(data.decode().split()))
+    if gen_args.command == 'string':
+        lines = data.splitlines()
+        if len(lines) == 1:
+            return render_string(shrinker.shrink_string(lines[0]))
+        return b'\n'.join(shrinker.shrink_list(lines, lambda ls: b'\n'.join(ls) + b'\n')) + b'\n'
+    rows = [tuple(map(int, line.split())) for line in data.splitlines() if line.strip()]
+    if gen_args.type == 'tree':
+        return render_edges(*shrinker.shrink_tree(rows))
+    return render_edges(*shrinker.shrink_graph(gen_args.nodes, rows))
+
+
+def run_stress(parser, args):
+    """Handle the run subcommand."""
+    from src.runner import StressRunner, print_progress
+    from src.shrink import Shrinker
+    gen_argv, gen_args = parse_generator_args(parser, args)
+    seed = master_seed(args)
+    gen = StressTestGenerator()
+    
+    def make_case(index):
+        # Case seeds are derived like in batch, so both produce the same cases for a
+        # master seed and "<generator options> --seed <case seed>" regenerates one on its own
+        case_seed = derive_seed(seed, index)
+        return case_bytes(*generate_case(gen, gen_args, get_random('fast', case_seed))), case_seed
+    
+    runner = StressRunner(args.ref, args.cand, make_case, jobs=args.jobs,
+                          timeout=args.timeout, compare=args.compare, eps=args.eps)
+    mismatch = runner.run(args.cases, progress=print_progress)
+    print(file=sys.stderr)
+    print(f"{runner.cases_run} cases in {runner.elapsed:.2f}s ({runner.rate:.1f} cases/s, {runner.jobs} workers)")
+    if mismatch is None:
+        print("✓ All outputs match")
+        return 0
+    print(f"✗ Case {mismatch.index}: {mismatch.reason}")
+    print(f"  regenerate with: {' '.join(gen_argv)} --seed {mismatch.seed}")
+    if args.shrink:
+        shrinker = Shrinker(runner.fails, jobs=runner.jobs)
+        start = time.perf_counter()
+        data = shrink_case(shrinker, gen_args, mismatch.data)
+        shrunk = runner.check(data, mismatch.index, mismatch.seed)
+        if shrunk is not None and shrunk.reference.status == 'ok':
+            print(f"  shrunk {len(mismatch.data)} -> {len(data)} bytes in {time.perf_counter() - start:.2f}s "
+                  f"({shrinker.calls} runs, {shrinker.cache_hits} cached)")
+            mismatch = shrunk
+    path = mismatch.save(args.save_dir)
+    print(f"✓ Saved to {path}")
+    return 1
+
+
+def run_batch(parser, args):
+    """Handle the batch subcommand."""
+    from src.batch import write_batch
+    gen_argv, gen_args = parse_generator_args(parser, args)
+    seed = master_seed(args)
+    start = time.perf_counter()
+    paths = write_batch(partial(cli_case, gen_args), args.count, args.out_dir,
+                        seed=seed, jobs=args.jobs, name=args.name)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Wrote {len(paths)} cases to {args.out_dir} in {elapsed:.2f}s")
+    return 0
+
+
+def run_bench(parser, args):
+    """Handle the bench subcommand."""
+    names = bench.select(args.filter)
+    if not names:
+        parser.error('bench: no benchmark matches --filter')
+    missing = bench.uncovered()
+    if missing and not args.filter:
+        print(f"bench: no benchmark for {', '.join(missing)}", file=sys.stderr)
+    baseline = bench.load_report(args.baseline) if args.baseline else None
+    sizes = args.sizes or bench.DEFAULT_SIZES
+    min_time = bench.MIN_TIME if args.min_time is None else args.min_time
+    threshold = bench.DEFAULT_THRESHOLD if args.threshold is None else args.threshold
+    
+    print(bench.HEADER)
+    report = bench.run_benchmarks(names, sizes, seed=args.seed, min_time=min_time,
+                                  isolate=not args.no_isolate, progress=lambda r: print(bench.format_result(r), flush=True))
+    if args.json:
+        bench.save_report(report, args.json)
+        print(f"✓ Saved to {args.json}")
+    if baseline is None:
+        return 0
+    
+    changes = bench.compare(report, baseline, threshold)
+    regressions = [c for c in changes if c[3]]
+    print(f"\nCompared {len(changes)} results with {args.baseline} (threshold {threshold:.0%})")
+    for name, size, ratio, _ in regressions:
+        print(f"✗ {name} at {size}: {ratio:.2f}x baseline throughput")
+    if not regressions:
+        print("✓ No regressions")
+    return 1 if regressions else 0
+
+
+def serve_request(argv):
+    """Run one generator command received by the server."""
+    if not argv or argv[0] not in GENERATOR_COMMANDS:
+        print(f"serve: only generator commands are accepted ({', '.join(GENERATOR_COMMANDS)})", file=sys.stderr)
+        sys.exit(2)
+    main(argv)
+
+
+def run_serve(parser, args):
+    """Handle the serve subcommand."""
+    from src import server
+    # import everything a request may need once, before the first fork
+    for name in ('gen_arrays', 'gen_numbers', 'gen_graphs', 'spec'):
+        value = globals()[name]
+        if isinstance(value, _LazyImport):
+            value._resolve()
+    build_parser()
+    try:
+        server.serve(serve_request, args.socket,
+                     ready=lambda path: print(f"serving on {path}", file=sys.stderr, flush=True))
+    except OSError as e:
+        parser.error(str(e))
+    return 0
+
+
+def run_convert(parser, args):
+    """Handle the convert subcommand."""
+    from src.utils.casefile import CaseFormatError, CaseReader, to_text, write_text
+    try:
+        if args.output:
+            to_text(args.input, args.output)
+        else:
+            sys.stdout.flush()
+            with CaseReader.open(args.input) as reader, TokenWriter(sys.stdout.fileno()) as writer:
+                write_text(reader, writer)
+    except (CaseFormatError, OSError) as e:
+        parser.error(str(e))
+    return 0
+
+
+def main(argv=None):
+    """Command-line interface for stress testing."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.command is None:
         parser.print_help()
         return
     
-    print(output)
+    if args.command == 'run':
+        sys.exit(run_stress(parser, args))
+    if args.command == 'batch':
+        sys.exit(run_batch(parser, args))
+    if args.command == 'bench':
+        sys.exit(run_bench(parser, args))
+    if args.command == 'serve':
+        sys.exit(run_serve(parser, args))
+    if args.command == 'convert':
+        sys.exit(run_convert(parser, args))
+    if args.binary and (not args.output or args.command == 'spec' or args.cache is not None):
+        parser.error('--binary needs --output and does not support spec or --cache')
+    
+    try:
+        rng = get_random(args.backend, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.seed is None and hasattr(rng, 'seed'):
+        # Unseeded fast runs still report their seed so a failing case can be regenerated
+        print(f"seed: {rng.seed}", file=sys.stderr)
     
-    if hasattr(args, 'output') and args.output:
-        gen.save_to_file(output, args.output)
+    gen = StressTestGenerator()
+    if args.cache is not None and args.seed is None:
+        print("--cache only applies to seeded cases, generating without it", file=sys.stderr)
+        args.cache = None
+    try:
+        if args.profile or args.profile_json or args.profile_dump:
+            profiled_output(gen, args, rng)
+        else:
+            output_case(gen, args, rng)
+    except spec.SpecError as e:
+        parser.error(str(e))
+    except BrokenPipeError:
+        # Output piped into e.g. head: stop quietly, and keep the interpreter from
+        # failing again while flushing stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Hashings.backends import get_random
+
+
+@pytest.fixture
+def rng():
+    """Seeded backend, so a failing draw can be replayed."""
+    return get_random(seed=12345)
@@ -0,0 +1,41 @@
+import os
+
+from generators.generate_arrays import gen_arrays
+from generators.generate_graphs import gen_graphs
+from src.batch import write_batch
+from src.utils.writer import format_rows, format_tokens
+
+
+def array_case(rng):
+    n=rng.randint(1, 2000)
+    return [b'%d' % n, format_tokens(gen_arrays.random(n, -10**9, 10**9, rng))], b'\n'
+
+
+def tree_case(rng):
+    return map(format_rows, gen_graphs.iter_tree(rng.randint(1, 500), rng=rng)), b'\n'
+
+
+def read_dir(path):
+    return {name: (path/name).read_bytes() for name in os.listdir(path)}
+
+
+def test_worker_count_does_not_change_the_cases(tmp_path):
+    for case_fn in (array_case, tree_case):
+        one=write_batch(case_fn, 23, tmp_path/case_fn.__name__/'1', seed=99, jobs=1)
+        three=write_batch(case_fn, 23, tmp_path/case_fn.__name__/'3', seed=99, jobs=3)
+        assert [os.path.basename(p) for p in one]==[os.path.basename(p) for p in three]==[f'{i:04d}.txt' for i in range(23)]
+        files=read_dir(tmp_path/case_fn.__name__/'1')
+        assert files==read_dir(tmp_path/case_fn.__name__/'3')
+        assert len(set(files.values()))==23
+
+
+def test_master_seed_changes_the_cases(tmp_path):
+    write_batch(array_case, 4, tmp_path/'a', seed=1, jobs=1)
+    write_batch(array_case, 4, tmp_path/'b', seed=2, jobs=1)
+    assert read_dir(tmp_path/'a')!=read_dir(tmp_path/'b')
+
+
+def test_name_pattern_and_text_results(tmp_path):
+    paths=write_batch(lambda rng: 'x %d\n' % rng.randint(1, 9), 3, tmp_path, seed=5, jobs=1, name='case{index}.in')
+    assert [os.path.basename(p) for p in paths]==['case0.in', 'case1.in', 'case2.in']
+    assert all(open(p).read().startswith('x ') for p in paths)
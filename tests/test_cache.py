@@ -0,0 +1,184 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.cache import CaseCache, case_key, copy_fd, parse_size
+
+ROOT=Path(__file__).parent.parent
+CLI=str(ROOT/'stress_testing.py')
+
+
+def run_cli(*args, cwd=None):
+    return subprocess.run([sys.executable, CLI, *args], check=True, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, cwd=cwd).stdout
+
+
+def entries(directory):
+    return sorted(os.path.basename(p) for _,_,p in CaseCache(directory).entries())
+
+
+def test_parse_size():
+    assert parse_size('2G')==2<<30
+    assert parse_size('1.5k')==1536
+    assert parse_size('500MB')==500<<20
+    assert parse_size(123)==123
+
+
+def test_case_key_depends_on_every_input():
+    base=case_key('array', {'size': 10, 'min': 1}, 'fast', 1)
+    assert base==case_key('array', {'min': 1, 'size': 10}, 'fast', 1)
+    others=[
+        case_key('array', {'size': 11, 'min': 1}, 'fast', 1),
+        case_key('array', {'size': 10, 'min': 1}, 'fast', 2),
+        case_key('array', {'size': 10, 'min': 1}, 'secure', 1),
+        case_key('number', {'size': 10, 'min': 1}, 'fast', 1),
+        case_key('array', {'size': 10, 'min': 1}, 'fast', 1, b'extra'),
+    ]
+    assert len({base, *others})==6
+
+
+def test_hit_is_byte_identical_to_miss(tmp_path):
+    cache_dir=str(tmp_path/'cache')
+    argv=['array', '--size', '30000', '--min', '-99', '--max', '99', '--seed', '8']
+    plain=run_cli(*argv)
+    miss=run_cli(*argv, '--cache', cache_dir)
+    assert len(entries(cache_dir))==1
+    hit=run_cli(*argv, '--cache', cache_dir)
+    assert plain==miss==hit
+    assert len(entries(cache_dir))==1
+    out=tmp_path/'case.txt'
+    report=run_cli(*argv, '--cache', cache_dir, '--output', str(out))
+    assert b'(cached)' in report and out.read_bytes()==plain
+
+
+def test_options_and_seed_change_the_key(tmp_path):
+    cache_dir=str(tmp_path/'cache')
+    base=['array', '--size', '100', '--seed', '1', '--cache', cache_dir]
+    outputs={run_cli(*base),
+             run_cli('array', '--size', '101', '--seed', '1', '--cache', cache_dir),
+             run_cli('array', '--size', '100', '--seed', '2', '--cache', cache_dir),
+             run_cli('array', '--size', '100', '--seed', '1', '--sorted', '--cache', cache_dir)}
+    assert len(outputs)==4 and len(entries(cache_dir))==4
+    # output-only options reuse the entry
+    run_cli(*base, '--output', str(tmp_path/'x.txt'))
+    run_cli(*base, '--profile')
+    run_cli(*base, '--profile-json', str(tmp_path/'p.json'))
+    assert len(entries(cache_dir))==4
+
+
+def test_spec_contents_change_the_key(tmp_path):
+    cache_dir=str(tmp_path/'cache')
+    spec={'body': [{'array': {'size': 50, 'min': 1, 'max': 9}}]}
+    first=tmp_path/'a.json'
+    first.write_text(json.dumps(spec))
+    out1=run_cli('spec', str(first), '--seed', '3', '--cache', cache_dir)
+    # same contents under another name: a hit
+    second=tmp_path/'b.json'
+    second.write_text(json.dumps(spec))
+    assert run_cli('spec', str(second), '--seed', '3', '--cache', cache_dir)==out1
+    assert len(entries(cache_dir))==1
+    spec['body'][0]['array']['max']=99
+    first.write_text(json.dumps(spec))
+    out2=run_cli('spec', str(first), '--seed', '3', '--cache', cache_dir)
+    assert out2!=out1 and len(entries(cache_dir))==2
+
+
+def test_unseeded_runs_skip_the_cache(tmp_path):
+    cache_dir=str(tmp_path/'cache')
+    subprocess.run([sys.executable, CLI, 'array', '--size', '5', '--cache', cache_dir],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    assert entries(cache_dir)==[]
+
+
+def store(case_cache, key, data):
+    with case_cache.store(key) as writer:
+        writer.write(data)
+
+
+def test_lru_eviction(tmp_path):
+    case_cache=CaseCache(tmp_path, max_bytes=250)
+    keys=[f'{i:02x}'*20 for i in range(4)]
+    for t,key in enumerate(keys):
+        store(case_cache, key, b'x'*100)
+        os.utime(case_cache.path(key), (1000+t, 1000+t))
+    # using the oldest entry makes it the most recent one
+    fd=case_cache.open(keys[0])
+    os.close(fd)
+    assert case_cache.size()==400
+    assert case_cache.evict()==200
+    assert sorted(os.path.basename(p)[:40] for _,_,p in case_cache.entries())==sorted([keys[0], keys[3]])
+    assert case_cache.open(keys[1]) is None
+    assert case_cache.clear()==200 and case_cache.size()==0
+
+
+def test_cli_cache_size_cap(tmp_path):
+    cache_dir=str(tmp_path/'cache')
+    for seed in range(5):
+        run_cli('array', '--size', '2000', '--seed', str(seed), '--cache', cache_dir, '--cache-size', '20K')
+    case_cache=CaseCache(cache_dir)
+    assert 0<case_cache.size()<=20<<10
+    assert len(entries(cache_dir))<5
+
+
+def test_failed_store_leaves_nothing(tmp_path):
+    case_cache=CaseCache(tmp_path)
+    with pytest.raises(RuntimeError):
+        with case_cache.store('ab'*20) as writer:
+            writer.write(b'partial')
+            raise RuntimeError('generator failed')
+    assert case_cache.entries()==[]
+    assert not any(name.startswith('.tmp-') for _,_,files in os.walk(tmp_path) for name in files)
+
+
+@pytest.mark.parametrize('target', ['file', 'pipe'])
+def test_copy_fd(tmp_path, target):
+    data=os.urandom(3<<20)
+    src=tmp_path/'src'
+    src.write_bytes(data)
+    fd=os.open(str(src), os.O_RDONLY)
+    try:
+        if target=='file':
+            dst=os.open(str(tmp_path/'dst'), os.O_WRONLY|os.O_CREAT)
+            copy_fd(fd, dst, len(data)-5)
+            os.close(dst)
+            assert (tmp_path/'dst').read_bytes()==data[:-5]
+        else:
+            proc=subprocess.Popen([sys.executable, '-c', 'import sys; sys.stdout.buffer.write(sys.stdin.buffer.read())'],
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+            result=[]
+            reader=threading.Thread(target=lambda: result.append(proc.stdout.read()))
+            reader.start()
+            copy_fd(fd, proc.stdin.fileno(), len(data))
+            proc.stdin.close()
+            reader.join()
+            proc.wait()
+            assert result[0]==data
+    finally:
+        os.close(fd)
+
+
+def test_cached_method(tmp_path):
+    from stress_testing import StressTestGenerator
+    case_cache=CaseCache(tmp_path)
+    first=StressTestGenerator.cached('random_array', 1000, 1, 50, seed=4, case_cache=case_cache)
+    assert len(case_cache.entries())==1
+    assert StressTestGenerator.cached('random_array', 1000, 1, 50, seed=4, case_cache=case_cache)==first
+    assert StressTestGenerator.cached('random_array', 1000, 1, 50, seed=5, case_cache=case_cache)!=first
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid') or os.getuid()!=0, reason='needs root to chown')
+def test_cached_method_ignores_foreign_pickles(tmp_path):
+    from stress_testing import StressTestGenerator
+    case_cache=CaseCache(tmp_path)
+    expected=StressTestGenerator.cached('random_array', 10, 1, 50, seed=4, case_cache=case_cache)
+    _,_,path=case_cache.entries()[0]
+    with open(path, 'wb') as f:
+        pickle.dump('planted', f)
+    os.chown(path, 12345, 12345)
+    assert StressTestGenerator.cached('random_array', 10, 1, 50, seed=4, case_cache=case_cache)==expected
@@ -0,0 +1,120 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from generators.graph_buffer import GraphBuffer
+from src.utils.casefile import CaseFormatError, CaseReader, CaseWriter, ensure_text, int_typecode, is_case_file, to_text
+
+CLI=str(Path(__file__).parent.parent/'stress_testing.py')
+
+
+def write_case(path):
+    with CaseWriter.open(path) as w:
+        w.scalars('nm', [3, -7])
+        w.array('a', [5, -1, 2**40])
+        w.array_chunks('big', ([i, -i] for i in range(1000)), 'h')
+        w.edges('g', [(1, 2), (2, 3), (3, 1)])
+        w.edges('w', GraphBuffer(3, 1, [1, 2], [2, 3], [10, -20]))
+        w.edge_chunks('t', [[(1, 2)], [(1, 3)]], 'b')
+        w.strings('s', ['abc', '', 'xyz'])
+        w.array('empty', [])
+
+
+def test_roundtrip_sections(tmp_path):
+    path=str(tmp_path/'case.bin')
+    write_case(path)
+    assert is_case_file(path)
+    with CaseReader.open(path) as r:
+        assert [s.name for s in r]==['nm', 'a', 'big', 'g', 'w', 't', 's', 'empty']
+        assert 'g' in r and 'h' not in r and len(r)==8
+        assert r['nm'].tolist()==[3, -7]
+        assert r['a'].tolist()==[5, -1, 2**40] and r['a'].typecode=='q'
+        assert r['big'].count==2000 and r['big'][1999]==-999
+        assert r['g'].tolist()==[(1, 2), (2, 3), (3, 1)]
+        assert r['g'].rows()[2, 0]==3 and r['g'].column(1).tolist()==[2, 3, 1]
+        assert r['w'].tolist()==[(1, 2, 10), (2, 3, -20)]
+        assert r['t'].tolist()==[(1, 2), (1, 3)]
+        assert r['s'].tolist()==[b'abc', b'', b'xyz'] and bytes(r['s'][-1])==b'xyz'
+        assert r['empty'].tolist()==[]
+
+
+def test_write_text(tmp_path):
+    path=str(tmp_path/'case.bin')
+    write_case(path)
+    to_text(path, str(tmp_path/'case.txt'))
+    lines=(tmp_path/'case.txt').read_bytes().split(b'\n')
+    assert lines[:6]==[b'3 -7', b'5 -1 1099511627776', b' '.join(b'%d %d' % (i, -i) for i in range(1000)),
+                       b'1 2', b'2 3', b'3 1']
+    assert lines[6:]==[b'1 2 10', b'2 3 -20', b'1 2', b'1 3', b'abc', b'', b'xyz', b'', b'']
+
+
+def test_ensure_text_is_lazy(tmp_path):
+    path=str(tmp_path/'case.bin')
+    write_case(path)
+    txt=ensure_text(path)
+    assert txt==str(tmp_path/'case.txt')
+    os.utime(txt, ns=(os.stat(path).st_mtime_ns+10**9,)*2)
+    Path(txt).write_bytes(b'kept')
+    os.utime(txt, ns=(os.stat(path).st_mtime_ns+10**9,)*2)
+    assert Path(ensure_text(path)).read_bytes()==b'kept'
+    os.utime(txt, ns=(os.stat(path).st_mtime_ns-10**9,)*2)
+    assert Path(ensure_text(path)).read_bytes()!=b'kept'
+
+
+@pytest.mark.parametrize('data', [b'', b'CPSTRESS', b'NOTACASE'+bytes(40)])
+def test_bad_files(tmp_path, data):
+    path=tmp_path/'bad.bin'
+    path.write_bytes(data)
+    before=len(os.listdir('/proc/self/fd')) if os.path.isdir('/proc/self/fd') else None
+    with pytest.raises(CaseFormatError):
+        CaseReader.open(str(path))
+    if before is not None:
+        assert len(os.listdir('/proc/self/fd'))==before
+
+
+def test_views_outlive_close(tmp_path):
+    path=str(tmp_path/'case.bin')
+    write_case(path)
+    with CaseReader.open(path) as r:
+        column=r['g'].column(0)
+    assert column.tolist()==[1, 2, 3]
+
+
+def test_int_typecode():
+    assert int_typecode(-128, 127)=='b'
+    assert int_typecode(0, 128)=='h'
+    assert int_typecode(-2**31, 2**31-1)=='i'
+    assert int_typecode(0, 2**63-1)=='q'
+    with pytest.raises(CaseFormatError):
+        int_typecode(0, 2**63)
+
+
+def run_cli(*args):
+    return subprocess.run([sys.executable, CLI, *args], check=True, stdout=subprocess.PIPE).stdout
+
+
+@pytest.mark.parametrize('generator', [
+    ['array', '--size', '5000', '--min', '-5', '--max', '1000000000'],
+    ['array', '--size', '300', '--min', '0', '--max', '1000', '--unique', '--sorted'],
+    ['number', '--count', '40', '--min', '-3', '--max', '3'],
+    ['string', '--count', '4', '--length', '9', '--case', 'mixed'],
+    ['graph', '--type', 'tree', '--nodes', '3000'],
+    ['graph', '--type', 'simple', '--nodes', '200', '--edges', '900', '--stream'],
+    ['graph', '--type', 'weighted', '--nodes', '50', '--edges', '120'],
+])
+def test_cli_binary_matches_text(tmp_path, generator):
+    binary=str(tmp_path/'case.bin')
+    text=run_cli(*generator, '--seed', '11')
+    run_cli(*generator, '--seed', '11', '--binary', '--output', binary)
+    assert run_cli('convert', binary)==text
+
+
+def test_cli_convert_rejects_empty_file(tmp_path):
+    path=tmp_path/'empty.bin'
+    path.write_bytes(b'')
+    result=subprocess.run([sys.executable, CLI, 'convert', str(path)], stderr=subprocess.PIPE)
+    assert result.returncode==2
+    assert b'too short' in result.stderr and b'Traceback' not in result.stderr
@@ -0,0 +1,46 @@
+from collections import Counter
+from itertools import product
+
+import pytest
+
+from generators.generate_arrays import EXACT_PARTS, gen_arrays
+
+
+# (sum, parts, min, max) covering stars and bars (bound cannot bind), the exact
+# bounded sampler (k <= EXACT_PARTS) and the tilted sampler for many parts
+SHAPES=[
+    (10, 4, 0, 10), (0, 5, 0, 3), (15, 5, 0, 3), (7, 3, -2, 5), (-6, 3, -4, 1),
+    (40, EXACT_PARTS, 0, 3), (30, EXACT_PARTS+1, 0, 3), (1000, 400, 0, 5), (1900, 400, 0, 5),
+    (10**6, 1000, 500, 1500), (5, 1, 0, 9), (0, 0, 0, 0),
+]
+
+
+def with_sum(sum_, k, lo, hi, rng, uniform):
+    return gen_arrays.random_with_sum(k, sum_, lo, hi, rng, uniform=uniform)
+
+
+@pytest.mark.parametrize('sum_,k,lo,hi', SHAPES)
+@pytest.mark.parametrize('fn', [gen_arrays.partition, with_sum])
+def test_sum_and_bounds(rng, fn, sum_, k, lo, hi):
+    for _ in range(20):
+        parts=fn(sum_, k, lo, hi, rng, uniform=True)
+        assert len(parts)==k
+        assert sum(parts)==sum_
+        assert all(lo<=x<=hi for x in parts)
+
+
+@pytest.mark.parametrize('fn', [gen_arrays.partition, with_sum])
+def test_sum_out_of_range(rng, fn):
+    with pytest.raises(ValueError):
+        fn(13, 3, 0, 4, rng, True)
+    with pytest.raises(ValueError):
+        fn(-1, 3, 0, 4, rng, True)
+
+
+@pytest.mark.parametrize('sum_,k,lo,hi', [(4, 3, 0, 4), (6, 3, 0, 3), (5, 4, 1, 2), (3, 3, -1, 2)])
+def test_small_cases_uniform(rng, sum_, k, lo, hi):
+    support={p for p in product(range(lo, hi+1), repeat=k) if sum(p)==sum_}
+    trials=600*len(support)
+    counts=Counter(tuple(gen_arrays.partition(sum_, k, lo, hi, rng, uniform=True)) for _ in range(trials))
+    assert set(counts)==support
+    assert all(abs(c-600)<120 for c in counts.values())
@@ -0,0 +1,82 @@
+from collections import Counter
+
+import pytest
+
+from generators.generate_numbers import gen_numbers
+from generators.sampling import ExclusionIndex, RealExclusionIndex
+
+
+def allowed(l, r, exclude=(), ranges=()):
+    banned=set(exclude)
+    for a,b in ranges:
+        banned.update(range(a, b+1))
+    return [x for x in range(l, r+1) if x not in banned]
+
+
+CASES=[
+    (1, 100, [], []),
+    (1, 100, [5], [(10, 20)]),
+    # values inside, next to and on the endpoints of ranges; overlapping and adjacent ranges
+    (1, 100, [1, 9, 10, 20, 21, 35, 36, 100], [(10, 20), (15, 30), (31, 34), (50, 50), (60, 70), (71, 75)]),
+    (-20, 20, [-20, 0, 20, 99, -99], [(-30, -15), (18, 40), (5, 3)]),
+    (0, 50, range(0, 51, 2), [(1, 9)]),
+    (0, 10, [], [(0, 10)]),
+    (5, 4, [5], []),
+]
+
+
+@pytest.mark.parametrize('l,r,exclude,ranges', CASES)
+def test_exclusion_index_matches_brute_force(l, r, exclude, ranges):
+    expected=allowed(l, r, exclude, ranges)
+    index=ExclusionIndex(l, r, exclude, ranges=ranges)
+    assert index.count==len(expected)
+    assert [index.value(k) for k in range(index.count)]==expected
+    assert [x for x in range(l-3, r+4) if x in index]==expected
+
+
+@pytest.mark.parametrize('l,r,exclude,ranges', CASES)
+def test_exclusion_index_draws(rng, l, r, exclude, ranges):
+    expected=set(allowed(l, r, exclude, ranges))
+    index=ExclusionIndex(l, r, exclude, ranges=ranges)
+    if not expected:
+        with pytest.raises(ValueError):
+            index.draw(rng)
+        return
+    assert set(index.sample(3000, rng))<=expected
+    assert index.draw(rng) in expected
+
+
+def test_exclusion_index_uniform(rng):
+    index=ExclusionIndex(0, 99, range(0, 100, 3), ranges=[(40, 59)])
+    counts=Counter(index.sample(100*index.count, rng))
+    assert sorted(counts)==allowed(0, 99, range(0, 100, 3), [(40, 59)])
+    assert all(abs(c-100)<50 for c in counts.values())
+
+
+def test_random_exclude_paths(rng):
+    assert all(gen_numbers.random_exclude(1, 10, {3, 5, 7}, rng) in {1, 2, 4, 6, 8, 9, 10} for _ in range(200))
+    # mostly excluded: goes through the index instead of retrying
+    assert {gen_numbers.random_exclude(1, 1000, set(range(1, 1000)), rng) for _ in range(20)}=={1000}
+    values=gen_numbers.random_range_exclude(1, 50, 500, set(range(2, 50)), rng)
+    assert set(values)<={1, 50}
+
+
+def test_real_exclusion_index(rng):
+    index=RealExclusionIndex(0.0, 10.0, [(2.0, 3.0), (2.5, 4.0), (6.0, 7.0), (-5.0, 0.5), (9.5, 20.0)])
+    assert index.length==pytest.approx(6.0)
+    values=index.sample(20000, rng)
+    assert all(0.5<=x<=2.0 or 4.0<=x<=6.0 or 7.0<=x<=9.5 for x in values)
+    # allowed gaps of length 1.5, 2 and 2.5 get draws in proportion
+    first=sum(x<=2.0 for x in values)/len(values)
+    assert first==pytest.approx(0.25, abs=0.02)
+    assert index.value(0.0)==0.5 and index.value(6.0)==9.5
+
+
+def test_real_exclusion_index_edges(rng):
+    assert RealExclusionIndex(0.0, 1.0).length==1.0
+    empty=RealExclusionIndex(0.0, 1.0, [(-1.0, 2.0)])
+    with pytest.raises(ValueError):
+        empty.draw(rng)
+    with pytest.raises(ValueError):
+        empty.sample(3, rng)
+    assert all(not 0.25<x<0.75 for x in gen_numbers.random_reals_exclude(0.0, 1.0, 1000, [(0.25, 0.75)], rng))
@@ -0,0 +1,130 @@
+import os
+import threading
+
+import pytest
+
+from src.utils import fastio
+from src.utils.fastio import WINDOW, TokenReader
+
+
+def values_around_window(count=3):
+    """Ints laid out so that tokens start, end and straddle every multiple of WINDOW."""
+    out=[]
+    size=0
+    for w in range(1, count+1):
+        boundary=w*WINDOW
+        while size<boundary-7:
+            token=b'%d' % (len(out)*7919%1000003)
+            out.append(token)
+            size+=len(token)+1
+        # pad so that the long token runs across the boundary
+        pad=boundary-3-size
+        if pad>0:
+            out.append(b'9'*pad)
+            size+=pad+1
+        out.append(b'123456789012')
+        size+=13
+    return out
+
+
+def data_of(tokens, sep=b' ', end=b'\n'):
+    return sep.join(tokens)+end
+
+
+def pipe_reader(data):
+    r,w=os.pipe()
+
+    def feed():
+        with os.fdopen(w, 'wb') as f:
+            f.write(data)
+    thread=threading.Thread(target=feed)
+    thread.start()
+    reader=TokenReader(r, closefd=True)
+    thread.join()
+    return reader
+
+
+def file_reader(tmp_path, data):
+    path=tmp_path/'input.txt'
+    path.write_bytes(data)
+    return TokenReader.open(str(path))
+
+
+@pytest.fixture(params=['file', 'pipe'])
+def make_reader(request, tmp_path):
+    if request.param=='file':
+        return lambda data: file_reader(tmp_path, data)
+    return pipe_reader
+
+
+def test_tokens_straddling_windows(make_reader):
+    tokens=values_around_window()
+    data=data_of(tokens, b'\n')
+    # a token crosses every window boundary
+    assert all(data[b-1:b+1].isdigit() for b in range(WINDOW, 4*WINDOW, WINDOW))
+    with make_reader(data) as r:
+        assert r.read_ints(5)==list(map(int, tokens[:5]))
+        got=tokens[:5]
+        while not r.at_eof():
+            got.append(r.read_token())
+        assert got==tokens
+
+
+@pytest.mark.parametrize('window', [1, 2, 3, 5, 16])
+def test_small_windows(make_reader, monkeypatch, window):
+    monkeypatch.setattr(fastio, 'WINDOW', window)
+    tokens=[b'%d' % (i*i-50) for i in range(200)]+[b'x'*40]
+    with make_reader(b'  \n'+data_of(tokens, b' \t ')) as r:
+        assert r.read_token()==tokens[0]
+        assert r.read_ints(3)==[int(t) for t in tokens[1:4]]
+        assert r.read_tokens(150)==tokens[4:154]
+        assert r.read_tokens()==tokens[154:]
+        assert r.at_eof()
+
+
+@pytest.mark.parametrize('k', [0, 1, 999, 1000])
+def test_read_ints_counts(make_reader, k):
+    values=list(range(-500, 500))
+    with make_reader(data_of([b'%d' % x for x in values])) as r:
+        assert r.read_ints(k)==values[:k]
+        assert r.read_ints()==values[k:]
+
+
+def test_eof_errors(make_reader):
+    with make_reader(b'1 2 3\n') as r:
+        with pytest.raises(EOFError):
+            r.read_ints(4)
+    with make_reader(b'1 2 3\n') as r:
+        assert r.read_ints(3)==[1, 2, 3]
+        with pytest.raises(EOFError):
+            r.read_token()
+        with pytest.raises(EOFError):
+            r.read_int()
+        assert r.read_tokens()==[]
+
+
+def test_at_eof_trailing_whitespace(make_reader):
+    with make_reader(b'4 5\n\n \t\r\n   ') as r:
+        assert r.read_ints(2)==[4, 5]
+        assert r.at_eof()
+
+
+def test_at_eof_trailing_garbage(make_reader):
+    with make_reader(b'4 5\n\n junk \n') as r:
+        assert r.read_ints(2)==[4, 5]
+        assert not r.at_eof()
+        assert r.read_token()==b'junk'
+        assert r.at_eof()
+
+
+def test_empty_input(make_reader):
+    with make_reader(b'') as r:
+        assert r.at_eof()
+        assert r.read_tokens()==[]
+        with pytest.raises(EOFError):
+            r.read_token()
+
+
+def test_floats(make_reader):
+    with make_reader(b'1.5 -2e3 7\n') as r:
+        assert r.read_floats()==[1.5, -2000.0, 7.0]
@@ -0,0 +1,130 @@
+from collections import Counter, defaultdict
+
+import pytest
+
+from generators.generate_graphs import gen_graphs
+
+
+def degrees(n, edges, base):
+    deg=[0]*n
+    for u,v in edges:
+        deg[u-base]+=1
+        deg[v-base]+=1
+    return deg
+
+
+def assert_simple(n, edges, base):
+    assert all(base<=u<n+base and base<=v<n+base and u!=v for u,v in edges)
+    keys=[(min(u, v), max(u, v)) for u,v in edges]
+    assert len(set(keys))==len(keys)
+
+
+def assert_tree(n, edges, base):
+    assert len(edges)==max(n-1, 0)
+    assert_simple(n, edges, base)
+    adj=defaultdict(list)
+    for u,v in edges:
+        adj[u].append(v)
+        adj[v].append(u)
+    seen={base}
+    stack=[base]
+    while stack:
+        for w in adj[stack.pop()]:
+            if w not in seen:
+                seen.add(w)
+                stack.append(w)
+    assert len(seen)==n
+
+
+@pytest.mark.parametrize('n,d', [(10, 3), (50, 4), (1000, 5), (7, 6), (20, 19), (30, 25), (200, 2)])
+@pytest.mark.parametrize('zero_based', [False, True])
+def test_regular(rng, n, d, zero_based):
+    edges=gen_graphs.regular(n, d, zero_based, rng)
+    base=0 if zero_based else 1
+    assert_simple(n, edges, base)
+    assert degrees(n, edges, base)==[d]*n
+
+
+@pytest.mark.parametrize('n,d', [(5, 3), (4, 4), (4, 0)])
+def test_regular_impossible_is_empty(rng, n, d):
+    assert gen_graphs.regular(n, d, rng=rng)==[]
+
+
+def test_regular_mixing_rounds(rng):
+    edges=gen_graphs.regular(100, 6, rng=rng, rounds=3)
+    assert_simple(100, edges, 1)
+    assert degrees(100, edges, 1)==[6]*100
+
+
+def test_regular_buffer_matches_list(rng):
+    buf=gen_graphs.regular(40, 3, rng=rng, as_buffer=True)
+    assert degrees(40, list(buf), 1)==[3]*40
+
+
+@pytest.mark.parametrize('seq', [[3, 3, 2, 2, 2, 1, 1], [1]*10, [0, 0, 0], [5, 5, 5, 5, 5, 5], [9, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                                 [50]*60+[2]*40])
+def test_degree_sequence(rng, seq):
+    edges=gen_graphs.degree_sequence(seq, rng=rng)
+    assert_simple(len(seq), edges, 1)
+    assert degrees(len(seq), edges, 1)==seq
+
+
+def test_degree_sequence_fallback(rng, monkeypatch):
+    # switch repair giving up must fall back to Havel-Hakimi plus mixing switches
+    monkeypatch.setattr('generators.generate_graphs._repair', lambda us, vs, N, rng: None)
+    seq=[4, 4, 3, 3, 2, 2, 1, 1]
+    edges=gen_graphs.degree_sequence(seq, rng=rng)
+    assert_simple(len(seq), edges, 1)
+    assert degrees(len(seq), edges, 1)==seq
+    assert degrees(30, gen_graphs.regular(30, 27, rng=rng), 1)==[27]*30
+
+
+@pytest.mark.parametrize('seq', [[1], [3, 3, 1, 1], [4, 1, 1, 1], [2, 2, 2, 2, 1]])
+def test_degree_sequence_not_graphic(rng, seq):
+    with pytest.raises(ValueError):
+        gen_graphs.degree_sequence(seq, rng=rng)
+
+
+def test_regular_small_case_uniform(rng):
+    # the 2-regular graphs on 5 labelled nodes are the 12 five-cycles
+    counts=Counter(frozenset(frozenset(e) for e in gen_graphs.regular(5, 2, rng=rng, rounds=2)) for _ in range(6000))
+    assert len(counts)==12
+    assert all(abs(c-500)<110 for c in counts.values())
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 10, 1000, 50000])
+@pytest.mark.parametrize('zero_based', [False, True])
+def test_uniform_tree(rng, n, zero_based):
+    assert_tree(n, gen_graphs.uniform_tree(n, zero_based, rng), 0 if zero_based else 1)
+
+
+def test_uniform_tree_small_case_uniform(rng):
+    # Cayley: 4^2 labelled trees on 4 nodes, each drawn equally often
+    counts=Counter(frozenset(frozenset(e) for e in gen_graphs.uniform_tree(4, rng=rng)) for _ in range(16000))
+    assert len(counts)==16
+    assert all(abs(c-1000)<160 for c in counts.values())
+
+
+SHAPES=[
+    lambda n, rng: gen_graphs.caterpillar(n, rng=rng),
+    lambda n, rng: gen_graphs.caterpillar(n, spine=3, rng=rng),
+    lambda n, rng: gen_graphs.broom(n, rng=rng),
+    lambda n, rng: gen_graphs.k_ary_tree(n, 3, rng=rng),
+    lambda n, rng: gen_graphs.spider(n, 4, rng=rng),
+    lambda n, rng: gen_graphs.sqrt_killer(n, rng=rng),
+    lambda n, rng: gen_graphs.windowed_tree(n, 5, rng=rng),
+]
+
+
+@pytest.mark.parametrize('shape', SHAPES)
+@pytest.mark.parametrize('n', [1, 2, 5, 101])
+def test_tree_shapes(rng, shape, n):
+    assert_tree(n, shape(n, rng), 1)
+
+
+def test_shape_degrees(rng):
+    n=101
+    broom=Counter(degrees(n, gen_graphs.broom(n, handle=10, rng=rng), 1))
+    assert broom[1]==n-10+1 and max(broom)==n-10+1
+    spider=sorted(degrees(n, gen_graphs.spider(n, 4, rng=rng), 1))
+    assert spider[-1]==4 and spider.count(1)==4
@@ -0,0 +1,74 @@
+from collections import Counter
+
+import pytest
+
+from generators.generate_arrays import gen_arrays
+from generators.sampling import sample_unique
+from Hashings.backends import get_random
+
+
+@pytest.mark.parametrize('backend', ['secure', 'fast'])
+@pytest.mark.parametrize('l,r', [(0, 1), (-5, 5), (0, 255), (0, 256), (-10**12, 10**12), (0, 2**64), (7, 7)])
+def test_randints_bounds(backend, l, r):
+    values=get_random(backend).randints(l, r, 2000)
+    assert len(values)==2000
+    assert all(l<=x<=r for x in values)
+
+
+def test_randints_distribution(rng):
+    # 6 does not divide 256: the rejected words must not bias the low values
+    counts=Counter(rng.randints(1, 6, 60000))
+    assert sorted(counts)==[1, 2, 3, 4, 5, 6]
+    assert all(abs(c-10000)<600 for c in counts.values())
+
+
+def test_randints_empty(rng):
+    assert rng.randints(1, 6, 0)==[]
+    with pytest.raises(ValueError):
+        rng.randints(6, 1, 3)
+
+
+def test_randbelows(rng):
+    bounds=[1, 2, 3, 1000, 2**63+5, 2**64, 2**70]*300
+    values=rng.randbelows(bounds)
+    assert len(values)==len(bounds)
+    assert all(0<=x<b for x,b in zip(values, bounds))
+    assert rng.randbelows([])==[]
+    counts=Counter(rng.randbelows([3]*30000))
+    assert all(abs(c-10000)<500 for c in counts.values())
+
+
+@pytest.mark.parametrize('l,r,k', [(0, 9, 0), (0, 9, 10), (1, 10**9, 50), (-50, 50, 20), (0, 999, 100), (0, 999, 600)])
+@pytest.mark.parametrize('ordered', [True, False])
+def test_sample_unique_bounds(rng, l, r, k, ordered):
+    values=sample_unique(l, r, k, rng, ordered=ordered)
+    assert len(values)==k==len(set(values))
+    assert all(l<=x<=r for x in values)
+
+
+def test_sample_unique_too_many(rng):
+    with pytest.raises(ValueError):
+        sample_unique(1, 5, 6, rng)
+
+
+@pytest.mark.parametrize('k', [1, 2, 3])
+def test_sample_unique_uniform_subsets(rng, k):
+    # every path (Floyd, sparse and dense Fisher-Yates) must give all k-subsets of [0, 4) equal weight
+    trials=24000
+    counts=Counter(tuple(sorted(sample_unique(0, 3, k, rng, ordered=False))) for _ in range(trials))
+    expected=trials/len(counts)
+    assert len(counts)=={1: 4, 2: 6, 3: 4}[k]
+    assert all(abs(c-expected)<0.1*expected for c in counts.values())
+
+
+def test_sample_unique_ordered_is_shuffled(rng):
+    firsts=Counter(sample_unique(0, 3, 2, rng)[0] for _ in range(8000))
+    assert all(abs(c-2000)<250 for c in firsts.values())
+
+
+def test_matrix_shapes(rng):
+    assert gen_arrays.matrix(3, 0, 1, 9, rng)==[[], [], []]
+    assert gen_arrays.matrix(0, 4, 1, 9, rng)==[]
+    m=gen_arrays.matrix(5, 4, -2, 2, rng)
+    assert [len(row) for row in m]==[4]*5
+    assert all(-2<=x<=2 for row in m for x in row)
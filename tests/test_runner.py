@@ -0,0 +1,76 @@
+import sys
+
+import pytest
+
+from src.runner import StressRunner, compare_outputs, run_program
+
+ECHO=[sys.executable, '-c', 'import sys; sys.stdout.write(sys.stdin.read())']
+
+
+def program(code):
+    return [sys.executable, '-c', 'import sys\n'+code]
+
+
+def cases(index):
+    return f'{index}\n'.encode(), 1000+index
+
+
+def test_compare_outputs():
+    assert compare_outputs(b'1 2\n', b'1 2\n', 'exact')
+    assert not compare_outputs(b'1 2\n', b'1  2', 'exact')
+    assert compare_outputs(b'1 2\n', b'1  2', 'tokens')
+    assert not compare_outputs(b'1 2', b'1 2 3', 'tokens')
+    assert compare_outputs(b'0.5 1000000 x', b'0.5000001 1000000.5 x', 'float', 1e-6)
+    assert not compare_outputs(b'0.5', b'0.501', 'float', 1e-6)
+    assert not compare_outputs(b'x', b'y', 'float')
+    with pytest.raises(ValueError):
+        compare_outputs(b'', b'', 'fuzzy')
+
+
+def test_exact_match():
+    runner=StressRunner(ECHO, ECHO, cases, jobs=3, compare='exact')
+    assert runner.run(12) is None
+    assert runner.cases_run==12
+
+
+def test_float_tolerance_match():
+    ref=program('print(int(sys.stdin.read()) / 3)')
+    cand=program('x = int(sys.stdin.read()) / 3\nprint("%.9f" % x, end="  \\n\\n")')
+    assert StressRunner(ref, cand, cases, jobs=2, compare='float', eps=1e-6).run(6) is None
+    assert StressRunner(ref, cand, cases, jobs=2, compare='tokens').run(6) is not None
+
+
+@pytest.mark.parametrize('jobs', [1, 4])
+def test_first_mismatch_in_case_order(tmp_path, jobs):
+    # wrong on cases 5 and 9; case 9 finishes first because case 5 is slow
+    cand=program('import time\nx = int(sys.stdin.read())\n'
+                 'if x == 5: time.sleep(0.5)\n'
+                 'print(x + (x in (5, 9)))')
+    runner=StressRunner(ECHO, cand, cases, jobs=jobs)
+    mismatch=runner.run(20)
+    assert mismatch.index==5 and mismatch.seed==1005
+    assert mismatch.reason=='wrong answer'
+    path=mismatch.save(tmp_path/'failure')
+    assert (path/'input.txt').read_bytes()==b'5\n'
+    assert (path/'expected.txt').read_bytes()==b'5\n'
+    assert (path/'actual.txt').read_bytes()==b'6\n'
+    assert (path/'seed.txt').read_text()=='1005\n'
+
+
+def test_candidate_crash():
+    mismatch=StressRunner(ECHO, program('sys.exit(3)'), cases, jobs=2).run(5)
+    assert mismatch.index==0 and mismatch.reason=='candidate error (exit code 3)'
+
+
+def test_timeout():
+    slow=program('import time\ntime.sleep(5)')
+    result=run_program(slow, b'', timeout=0.3)
+    assert result.status=='timeout' and result.elapsed<4
+    mismatch=StressRunner(ECHO, slow, cases, jobs=1, timeout=0.3).run(3)
+    assert mismatch.index==0 and mismatch.reason=='candidate timeout'
+
+
+def test_fails_predicate():
+    runner=StressRunner(ECHO, program('print(sys.stdin.read().count("7"))'), cases)
+    assert runner.fails(b'1 2\n')
+    assert runner.check(b'0\n') is None
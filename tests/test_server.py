@@ -0,0 +1,81 @@
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+if not hasattr(socket, 'AF_UNIX') or not hasattr(os, 'fork'):
+    pytest.skip('the server needs Unix sockets and fork', allow_module_level=True)
+
+ROOT=Path(__file__).parent.parent
+CLI=str(ROOT/'stress_testing.py')
+CLIENT=str(ROOT/'stress_client.py')
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 bytes, tmp_path can be longer
+    directory=tempfile.mkdtemp(prefix='cps-')
+    yield os.path.join(directory, 's.sock')
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def server(socket_path):
+    proc=subprocess.Popen([sys.executable, CLI, 'serve', '--socket', socket_path], stderr=subprocess.PIPE)
+    try:
+        line=proc.stderr.readline()
+        assert line.startswith(b'serving on'), line
+        yield socket_path
+    finally:
+        proc.terminate()
+        proc.wait(10)
+        proc.stderr.close()
+
+
+def run(script, *args, socket_path):
+    env=dict(os.environ, CPSTRESS_SOCKET=socket_path)
+    return subprocess.run([sys.executable, script, *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          env=env, cwd=str(ROOT), timeout=60)
+
+
+GENERATORS=[
+    ['array', '--size', '20000', '--min', '-9', '--max', '9', '--seed', '5'],
+    ['graph', '--type', 'tree', '--nodes', '500', '--seed', '5'],
+]
+
+
+@pytest.mark.parametrize('argv', GENERATORS)
+def test_client_matches_in_process_run(server, argv):
+    local=run(CLI, *argv, socket_path=server)
+    remote=run(CLIENT, *argv, socket_path=server)
+    assert remote.returncode==local.returncode==0
+    assert remote.stdout==local.stdout and local.stdout
+
+
+def test_exit_status_and_stderr_are_forwarded(server):
+    local=run(CLI, 'array', '--size', 'x', socket_path=server)
+    remote=run(CLIENT, 'array', '--size', 'x', socket_path=server)
+    assert remote.returncode==local.returncode==2
+    assert b'invalid int value' in remote.stderr
+
+
+def test_output_file_uses_client_cwd(server, tmp_path):
+    env=dict(os.environ, CPSTRESS_SOCKET=server)
+    subprocess.run([sys.executable, CLIENT, 'array', '--size', '10', '--seed', '1', '--output', 'case.txt'],
+                   cwd=str(tmp_path), env=env, check=True, stdout=subprocess.DEVNULL, timeout=60)
+    local=run(CLI, 'array', '--size', '10', '--seed', '1', socket_path=server)
+    assert (tmp_path/'case.txt').read_bytes()==local.stdout
+
+
+def test_client_falls_back_without_server(socket_path):
+    argv=GENERATORS[0]
+    assert not os.path.exists(socket_path)
+    local=run(CLI, *argv, socket_path=socket_path)
+    fallback=run(CLIENT, *argv, socket_path=socket_path)
+    assert fallback.returncode==0
+    assert fallback.stdout==local.stdout
@@ -0,0 +1,92 @@
+from collections import Counter
+
+from generators.generate_graphs import gen_graphs
+from src.shrink import Shrinker, relabel_edges
+
+
+def tokens(data):
+    return list(map(int, data.split()))
+
+
+def edges_of(data):
+    return [tuple(map(int, line.split())) for line in data.decode().splitlines() if line.strip()]
+
+
+def is_connected_tree(k, edges, base=1):
+    if len(edges)!=k-1:
+        return False
+    nodes={x for e in edges for x in e[:2]}
+    if k>1 and nodes!=set(range(base, base+k)):
+        return False
+    adj={}
+    for u,v in edges:
+        adj.setdefault(u, []).append(v)
+        adj.setdefault(v, []).append(u)
+    seen={base}
+    stack=[base]
+    while stack:
+        for y in adj.get(stack.pop(), ()):
+            if y not in seen:
+                seen.add(y)
+                stack.append(y)
+    return len(seen)==k
+
+
+def test_list_shrinks_to_the_failing_element(rng):
+    arr=rng.randints(-1000, 1000, 500)
+    arr[317]=4242
+    shrinker=Shrinker(lambda data: 4242 in tokens(data), jobs=4)
+    assert shrinker.shrink_array(arr)==[4242]
+
+
+def test_list_keeps_interacting_elements(rng):
+    arr=rng.randints(100, 1000, 300)
+    arr[40],arr[250]=7, 3
+    shrinker=Shrinker(lambda data: {3, 7}<=set(tokens(data)), jobs=3)
+    assert shrinker.shrink_array(arr)==[7, 3]
+    # every verdict is cached by input bytes, so no input is run twice
+    assert shrinker.calls==len(shrinker._cache)
+
+
+def test_string_shrinks():
+    shrinker=Shrinker(lambda data: data.count(b'a')>=2 and data.count(b'b')>=2, jobs=2)
+    assert shrinker.shrink_string('xxaxxbyyabzz')=='abab'
+
+
+def test_tree_stays_connected_with_compact_labels(rng):
+    edges=gen_graphs.tree(300, rng=rng)
+    seen=[]
+
+    def fails(data):
+        es=edges_of(data)
+        seen.append(es)
+        return bool(es) and max(Counter(x for e in es for x in e).values())>=3
+    k,shrunk=Shrinker(fails, jobs=4).shrink_tree(edges)
+    assert k==4 and is_connected_tree(k, shrunk)
+    assert sorted(Counter(x for e in shrunk for x in e).values())==[1, 1, 1, 3]
+    # every candidate handed to the predicate was a tree with compact labels too
+    assert all(is_connected_tree(len(es)+1, es) for es in seen if es)
+
+
+def has_triangle(edges):
+    adj={}
+    for u,v in edges:
+        adj.setdefault(u, set()).add(v)
+        adj.setdefault(v, set()).add(u)
+    return any(adj[u]&adj[v] for u,v in edges)
+
+
+def test_graph_loses_irrelevant_edges(rng):
+    n=60
+    edges=gen_graphs.bipartite(30, 30, 150, rng=rng)
+    # a bipartite graph has no triangle: the only one is planted
+    edges=edges[:70]+[(5, 40), (40, 33), (33, 5)]+edges[70:]
+    assert not has_triangle(edges[:70]+edges[73:])
+    k,shrunk=Shrinker(lambda data: has_triangle(edges_of(data)), jobs=4).shrink_graph(n, edges)
+    assert k==3
+    assert sorted(tuple(sorted(e)) for e in shrunk)==[(1, 2), (1, 3), (2, 3)]
+
+
+def test_relabel_edges():
+    assert relabel_edges([(10, 4, 7), (4, 2, 1)])==(3, [(1, 2, 7), (2, 3, 1)])
+    assert relabel_edges([(10, 4)], base=0)==(2, [(0, 1)])
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from Hashings.backends import get_random
+from src.spec import SpecError, _split_values, compile_spec, load_spec
+
+SPEC={
+    'vars': {'TOTAL': 3000},
+    'body': [
+        {'let': {'T': {'int': [2, 6]}}},
+        {'line': ['T']},
+        {'repeat': 'T',
+         'split': {'n': {'total': 'TOTAL', 'min': 2, 'max': 1000}},
+         'body': [
+             {'let': {'q': {'int': [1, 'n']}}},
+             {'line': ['n', 'q']},
+             {'array': {'size': 'n', 'min': -5, 'max': 5}},
+             {'pairs': {'count': 'q', 'min': 1, 'max': 'n', 'ordered': True}},
+             {'graph': {'type': 'tree', 'nodes': 'n'}},
+         ]},
+    ],
+}
+
+
+def parse(data):
+    return [list(map(int, line.split())) for line in data.decode().split('\n')]
+
+
+def test_run_shape(rng):
+    lines=parse(compile_spec(SPEC).generate(rng))
+    assert lines.pop()==[]
+    t,=lines.pop(0)
+    assert 2<=t<=6
+    total=0
+    for _ in range(t):
+        n,q=lines.pop(0)
+        total+=n
+        assert 2<=n<=1000 and 1<=q<=n
+        array=lines.pop(0)
+        assert len(array)==n and all(-5<=x<=5 for x in array)
+        for _ in range(q):
+            a,b=lines.pop(0)
+            assert 1<=a<=b<=n
+        edges=[lines.pop(0) for _ in range(n-1)]
+        assert all(len(e)==2 and 1<=min(e) and max(e)<=n for e in edges)
+    assert lines==[]
+    assert total<=3000
+
+
+def test_seeded_runs_repeat(tmp_path):
+    path=tmp_path/'spec.json'
+    path.write_text(json.dumps(SPEC))
+    plan=load_spec(path)
+    assert plan.generate(get_random(seed=4))==plan.generate(get_random(seed=4))
+    data=b''.join(plan.run(get_random(seed=4), strip_final_newline=True))
+    assert data+b'\n'==plan.generate(get_random(seed=4))
+
+
+@pytest.mark.parametrize('spec,message', [
+    ({'body': [], 'extra': 1}, 'spec: unknown key(s) extra'),
+    ({'body': [{'arary': {}}]}, "body[0]: unknown item 'arary'"),
+    ({'body': [{'array': {'size': 3, 'min': 1}}]}, 'body[0].array: missing parameter(s) max'),
+    ({'body': [{'array': {'size': 3, 'min': 1, 'max': 2, 'step': 1}}]}, 'body[0].array: unknown parameter(s) step'),
+    ({'body': [{'repeat': 2, 'times': 1}]}, 'body[0]: unknown key(s) times'),
+    ({'body': [{'line': ['n +']}]}, 'body[0].line[0]: invalid expression'),
+    ({'body': [{'line': ['__import__("os")']}]}, 'body[0].line[0]: only min, max, abs can be called'),
+    ({'body': [{'graph': {'type': 'cycle', 'nodes': 3}}]}, 'body[0].graph.type: expected one of'),
+])
+def test_compile_errors(spec, message):
+    with pytest.raises(SpecError) as e:
+        compile_spec(spec)
+    assert str(e.value).startswith(message)
+
+
+@pytest.mark.parametrize('split,message', [
+    ({'total': 100, 'min': 5, 'max': 3}, 'body[0].split.n: min 5 > max 3'),
+    ({'total': 100, 'min': 30}, 'body[0].split.n: 5 repetitions need at least 150 > total 100'),
+    ({'total': 100, 'min': 1, 'max': 10, 'exact': True}, 'body[0].split.n: 5 repetitions reach at most 50 < exact total 100'),
+])
+def test_split_errors(rng, split, message):
+    plan=compile_spec({'body': [{'repeat': 5, 'split': {'n': split}, 'body': [{'line': ['n']}]}]})
+    with pytest.raises(SpecError) as e:
+        plan.generate(rng)
+    assert str(e.value)==message
+
+
+def test_undefined_variable(rng):
+    plan=compile_spec({'body': [{'line': ['m']}]})
+    with pytest.raises(SpecError, match=r"body\[0\].line\[0\]: name 'm' is not defined"):
+        plan.generate(rng)
+
+
+@pytest.mark.parametrize('total,count,lo,hi', [(100, 5, 1, 40), (100, 5, 20, 20), (7, 7, 1, None), (10**6, 300, 0, 10**4)])
+def test_split_sums(rng, total, count, lo, hi):
+    for _ in range(30):
+        values=_split_values(total, count, lo, hi, True, rng)
+        assert len(values)==count and sum(values)==total
+        assert all(lo<=x<=(hi if hi is not None else total) for x in values)
+        values=_split_values(total, count, lo, hi, False, rng)
+        assert len(values)==count and lo*count<=sum(values)<=total
+        assert all(lo<=x<=(hi if hi is not None else total) for x in values)
+
+
+def test_split_non_exact_is_capped_by_max(rng):
+    # hi*count below total is fine without exact: the sum just stays under the cap
+    values=_split_values(100, 5, 1, 10, False, rng)
+    assert sum(values)<=50
+    assert _split_values(100, 0, 1, 10, True, rng)==[]
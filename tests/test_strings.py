@@ -0,0 +1,131 @@
+import string
+from collections import Counter
+
+import pytest
+
+from generators.generate_strings import CaseType, gen_strings
+
+ALPHABETS={
+    CaseType.Lower: set(string.ascii_lowercase),
+    CaseType.Upper: set(string.ascii_uppercase),
+    CaseType.Mixed: set(string.ascii_letters),
+}
+
+
+def chi_square(counts, symbols, total):
+    expected=total/len(symbols)
+    return sum((counts.get(s, 0)-expected)**2/expected for s in symbols)
+
+
+@pytest.mark.parametrize('case', list(CaseType))
+def test_case_types_stay_in_their_alphabet(rng, case):
+    alphabet=ALPHABETS[case]
+    assert set(gen_strings.random(20000, case, rng))==alphabet
+    assert set(''.join(gen_strings.random_strings(50, 40, case, rng)))<=alphabet
+    assert set(''.join(gen_strings.palindromes(50, 41, case, rng)))<=alphabet
+    assert gen_strings.random_char(case, rng) in alphabet
+    assert set(gen_strings.random_alphanum(5000, True, False, case, rng))<=alphabet
+
+
+def test_upper_is_uppercase(rng):
+    s=gen_strings.random(1000, CaseType.Upper, rng)
+    assert s.isupper() and s.isalpha()
+    assert gen_strings.random(50, CaseType.Upper, rng, 'c', 'e').strip('CDE')==''
+    assert gen_strings.palindrome(31, CaseType.Upper, rng).isupper()
+
+
+def test_letter_ranges(rng):
+    assert set(gen_strings.random(3000, CaseType.Lower, rng, 'x', 'z'))=={'x', 'y', 'z'}
+    assert set(gen_strings.random(3000, CaseType.Mixed, rng, 'a', 'b'))==set('abAB')
+    with pytest.raises(ValueError):
+        gen_strings.random(5, CaseType.Lower, rng, 'z', 'a')
+
+
+@pytest.mark.parametrize('alphabet', ['abcdefg', 'xyz', string.ascii_letters+string.digits, 'ab'])
+def test_uniform_over_alphabet(rng, alphabet):
+    # 7, 3 and 62 do not divide 256: bytes past the largest multiple must be rejected
+    total=200000
+    counts=Counter(gen_strings.random_custom(total, alphabet, rng))
+    assert set(counts)==set(alphabet)
+    # 99.9% quantile of chi-square with k-1 degrees of freedom stays below k-1 + 5*sqrt(2(k-1))
+    k=len(alphabet)
+    assert chi_square(counts, alphabet, total)<k-1+5*(2*(k-1))**0.5
+
+
+def test_alphanum_mixes_letters_and_digits(rng):
+    s=gen_strings.random_alphanum(40000, True, True, CaseType.Lower, rng)
+    digits=sum(c.isdigit() for c in s)
+    assert abs(digits-20000)<600
+    assert set(s)<=set(string.ascii_lowercase+string.digits)
+    assert set(gen_strings.random_alphanum(1000, False, True, CaseType.Lower, rng))<=set(string.digits)
+
+
+def test_palindromes(rng):
+    for n in (0, 1, 2, 7, 10):
+        p=gen_strings.palindrome(n, CaseType.Mixed, rng)
+        assert len(p)==n and p==p[::-1]
+    assert all(s==s[::-1] and len(s)==9 for s in gen_strings.palindromes(20, 9, CaseType.Lower, rng))
+
+
+def test_wide_custom_alphabet(rng):
+    alphabet='αβγδ'
+    assert set(gen_strings.random_custom(2000, alphabet, rng))==set(alphabet)
+
+
+def test_lengths(rng):
+    assert gen_strings.random(0, CaseType.Lower, rng)==''
+    assert gen_strings.random_strings(3, 0, CaseType.Lower, rng)==['', '', '']
+    assert [len(s) for s in gen_strings.random_strings(4, 5, CaseType.Lower, rng)]==[5]*4
+
+
+# ==================== ADVERSARIAL STRINGS ====================
+
+M61=(1<<61)-1
+
+
+def collides(a, b, pairs):
+    return all(gen_strings.poly_hash(a, base, mod)==gen_strings.poly_hash(b, base, mod) for base,mod in pairs)
+
+
+@pytest.mark.parametrize('pairs', [
+    [(31, 10**9+7)],
+    [(131, 998244353)],
+    # coprime moduli attacked together through the CRT
+    [(31, 10**9+7), (37, 998244353)],
+    [(911382323, 10**9+9), (972663749, 10**9+7)],
+    [(1_000_003, M61)],
+    [(31, 2**32), (37, 2**16)],
+])
+def test_hash_collision(rng, pairs):
+    a,b=gen_strings.hash_collision(pairs, rng=rng)
+    assert a!=b and len(a)==len(b)
+    assert set(a+b)<={'a', 'b'}
+    assert collides(a, b, pairs)
+    # 'a'=1, 'b'=2 character codes collide too (the difference is the same)
+    shift=str.maketrans('ab', '\x01\x02')
+    assert collides(a.translate(shift), b.translate(shift), pairs)
+
+
+def test_hash_collision_padding(rng):
+    pairs=[(31, 10**9+7)]
+    a,b=gen_strings.hash_collision(pairs, 5000, rng)
+    assert len(a)==len(b)==5000 and a!=b
+    assert collides(a, b, pairs)
+    with pytest.raises(ValueError):
+        gen_strings.hash_collision(pairs, 1, rng)
+    with pytest.raises(ValueError):
+        gen_strings.hash_collision([], rng=rng)
+
+
+@pytest.mark.parametrize('base', [3, 31, 131, 1_000_003, 2**61+1, 0xdeadbeef])
+def test_thue_morse_collides_mod_2_64(base):
+    a=gen_strings.thue_morse(2**11)
+    b=gen_strings.thue_morse(2**11, 'b', 'a')
+    assert a!=b
+    assert gen_strings.poly_hash(a, base, 2**64)==gen_strings.poly_hash(b, base, 2**64)
+
+
+def test_thue_morse_prefix():
+    assert gen_strings.thue_morse(16)=='abbabaabbaababba'
+    assert gen_strings.thue_morse(5, 'x', 'y')=='xyyxy'
+    assert gen_strings.thue_morse(0)==''
@@ -0,0 +1,40 @@
+import pytest
+
+np=pytest.importorskip('numpy')
+
+from generators.generate_vectorized import _np_rng, gen_vectorized
+from Hashings.backends import get_random
+
+
+def test_seeded_backend_is_reproducible():
+    a=gen_vectorized.random(1000, -50, 50, rng=get_random(seed=3), as_list=True)
+    b=gen_vectorized.random(1000, -50, 50, rng=get_random(seed=3), as_list=True)
+    assert a==b
+    assert all(-50<=x<=50 for x in a)
+
+
+def test_default_seed_comes_from_secure_random(monkeypatch):
+    drawn=[]
+
+    class Recorder:
+        def getrandbits(self, k):
+            drawn.append(k)
+            return 42
+    monkeypatch.setattr('generators.generate_vectorized.get_secure_random', Recorder)
+    assert isinstance(_np_rng(None), np.random.Generator)
+    assert drawn==[128]
+
+
+def test_shapes_and_bounds(rng):
+    m=gen_vectorized.matrix(4, 6, 0, 9, rng, unique_rows=True, sorted_rows=True)
+    assert m.shape==(4, 6)
+    assert all(len(set(row))==6 and list(row)==sorted(row) for row in m.tolist())
+    p=gen_vectorized.pairs(500, 1, 10, 1, 10, rng, ordered=True)
+    assert p.shape==(500, 2) and (p[:, 0]<=p[:, 1]).all()
+    v=gen_vectorized.strictly_increasing(100, 5, 1, 3, rng, as_list=True)
+    assert v[0]==5 and all(1<=b-a<=3 for a,b in zip(v, v[1:]))
+
+
+def test_int64_overflow_falls_back(rng):
+    values=gen_vectorized.random(100, 0, 1<<80, rng)
+    assert isinstance(values, list) and all(0<=x<=1<<80 for x in values)
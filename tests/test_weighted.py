@@ -0,0 +1,84 @@
+from collections import Counter
+
+import pytest
+
+from generators.generate_arrays import gen_arrays
+from generators.generate_numbers import gen_numbers
+from generators.sampling import WeightedSampler
+
+
+class EveryOutcome:
+    """Stands in for an rng: the k integers of a bulk draw are every value of the range, once."""
+
+    def randints(self, l, r, k):
+        assert k==r-l+1
+        return list(range(l, r+1))
+
+
+def exact_counts(sampler):
+    """How many of the n*total equally likely random integers select each value."""
+    return Counter(sampler.sample(sampler.n*sampler.total, EveryOutcome()))
+
+
+@pytest.mark.parametrize('weights', [[1, 2, 3, 4], [5], [7, 1], [1]*9, [3, 0, 0, 2, 0, 11], [1, 10**6, 3], [2, 2, 2, 9, 1, 1, 4]])
+def test_integer_weights_are_exact(weights):
+    sampler=WeightedSampler(weights)
+    assert sampler.exact
+    n=len(weights)
+    # index i is selected by exactly n*w_i of the n*sum(w) outcomes, i.e. with probability w_i/sum(w)
+    assert exact_counts(sampler)=={i: n*w for i,w in enumerate(weights) if w}
+
+
+def test_zero_weights_are_never_drawn(rng):
+    sampler=WeightedSampler([0, 4, 0, 1, 0], 'abcde')
+    assert exact_counts(sampler)==Counter({'b': 20, 'd': 5})
+    assert set(sampler.sample(5000, rng))=={'b', 'd'}
+    assert {sampler.draw(rng) for _ in range(500)}<={'b', 'd'}
+
+
+@pytest.mark.parametrize('weights', [[0, 0, 7, 0], [0.0, 2.5, 0.0], [9]])
+def test_single_nonzero_weight(rng, weights):
+    sampler=WeightedSampler(weights)
+    i=next(i for i,w in enumerate(weights) if w)
+    assert sampler.sample(1000, rng)==[i]*1000
+    assert all(sampler.draw(rng)==i for _ in range(100))
+
+
+def test_draw_matches_sample_distribution(rng):
+    sampler=WeightedSampler([1, 2, 3, 4])
+    counts=Counter(sampler.draw(rng) for _ in range(40000))
+    assert all(abs(counts[i]-4000*(i+1))<400 for i in range(4))
+
+
+@pytest.mark.parametrize('weights', [[0.1, 0.2, 0.3, 0.4], [1e-3, 1.0, 2.5, 0.0, 7.25], [1/3]*6, [0.5, 1e6, 2.0]])
+def test_float_weights_chi_square(rng, weights):
+    sampler=WeightedSampler(weights)
+    assert not sampler.exact
+    k=200000
+    counts=Counter(sampler.sample(k, rng))
+    total=sum(weights)
+    expected={i: k*w/total for i,w in enumerate(weights) if w}
+    assert set(counts)<=set(expected)
+    # skip cells with tiny expectations, they are checked by the membership test above
+    cells=[i for i,e in expected.items() if e>=5]
+    chi2=sum((counts[i]-expected[i])**2/expected[i] for i in cells)
+    df=max(len(cells)-1, 1)
+    assert chi2<df+5*(2*df)**0.5
+
+
+@pytest.mark.parametrize('weights,error', [([], 'at least one'), ([0, 0], 'all be zero'), ([1, -1], 'non-negative'),
+                                           ([1.0, float('inf')], 'finite'), ([1.0, float('nan')], 'finite')])
+def test_invalid_weights(weights, error):
+    with pytest.raises(ValueError, match=error):
+        WeightedSampler(weights)
+
+
+def test_values_length_mismatch():
+    with pytest.raises(ValueError, match='differ in length'):
+        WeightedSampler([1, 2], ['a'])
+
+
+def test_generator_wrappers(rng):
+    assert set(gen_arrays.weighted(2000, ['x', 'y', 'z'], [1, 0, 3], rng))=={'x', 'z'}
+    assert set(gen_numbers.random_weighted_range([10, 20], [0, 5], 100, rng))=={20}
+    assert gen_numbers.random_weighted([1, 2], [0, 1], rng)==2
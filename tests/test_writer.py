@@ -0,0 +1,102 @@
+import os
+from array import array
+
+import pytest
+
+from generators.graph_buffer import GraphBuffer
+from src.utils.writer import BATCH, TokenWriter, format_columns, format_rows, format_tokens
+
+
+def joined(values, sep=' '):
+    return sep.join(map(str, values)).encode()
+
+
+def lines(rows):
+    return '\n'.join(' '.join(map(str, row)) for row in rows).encode()
+
+
+TOKENS=[
+    [],
+    [0],
+    [1, -2, 3],
+    [1.5, -0.25, 1e300, 2**70, 'ab%s', '%'],
+    list(range(-BATCH, BATCH+17)),
+]
+
+
+@pytest.mark.parametrize('values', TOKENS)
+def test_format_tokens(values):
+    assert format_tokens(values)==joined(values)
+    assert format_tokens(values, sep=b'%d')==joined(values, '%d')
+
+
+def test_format_tokens_iterables():
+    assert format_tokens(x*x for x in range(5))==b'0 1 4 9 16'
+    assert format_tokens(array('q', [3, -4]))==b'3 -4'
+
+
+ROWS=[
+    [],
+    [(1, 2)],
+    [(1, 2), (3, 4, 5), (6,)],
+    [(i, -i, i*i) for i in range(BATCH+5)],
+]
+
+
+@pytest.mark.parametrize('rows', ROWS)
+def test_format_rows(rows):
+    assert format_rows(rows)==lines(rows)
+
+
+@pytest.mark.parametrize('rows', ROWS[1:2]+ROWS[3:])
+def test_format_columns(rows):
+    columns=[list(col) for col in zip(*rows)]
+    assert format_columns(columns)==lines(rows)
+    assert format_columns(columns, sep=',', end=';')==';'.join(','.join(map(str, r)) for r in rows).encode()
+
+
+def test_format_columns_empty():
+    assert format_columns([])==b''
+    assert format_columns([[], []])==b''
+
+
+def test_format_rows_graph_buffer():
+    buf=GraphBuffer(4, 1, [1, 2, 3], [2, 3, 4], [7, 8, 9])
+    assert format_rows(buf)==b'1 2 7\n2 3 8\n3 4 9'
+
+
+def read_all(fd):
+    chunks=[]
+    while True:
+        data=os.read(fd, 1<<16)
+        if not data:
+            return b''.join(chunks)
+        chunks.append(data)
+
+
+@pytest.mark.parametrize('block_size', [1, 7, 1<<20])
+def test_token_writer(tmp_path, block_size):
+    path=str(tmp_path/'out.txt')
+    big=list(range(BATCH*2+3))
+    with TokenWriter.open(path, block_size) as w:
+        w.write('x')
+        w.write(b'y\n')
+        w.write_tokens([])
+        w.write_tokens(big)
+        w.write_rows([])
+        w.write_rows([(1, 2), (3, 4)])
+        w.write_parts(iter([b'a', b'b', b'c']), separator=b' ')
+    expected=b'xy\n\n'+joined(big)+b'\n1 2\n3 4\na b c\n'
+    with open(path, 'rb') as f:
+        assert f.read()==expected
+    assert w.bytes_written==len(expected)
+
+
+def test_token_writer_pipe():
+    r,wfd=os.pipe()
+    # the output stays below the pipe buffer, so writing does not need a concurrent reader
+    with TokenWriter(wfd, block_size=4) as w:
+        w.write_tokens(range(1000))
+    os.close(wfd)
+    assert read_all(r)==joined(range(1000))+b'\n'
+    os.close(r)